@@ -0,0 +1,41 @@
+"""
+Benchmark: construction time of MIMOSA objects with and without
+re-using the cached AbstractModel.
+
+Usage: python benchmarks/abstract_model_cache.py [number of runs]
+"""
+
+import sys
+import time
+
+from mimosa import MIMOSA, load_params
+
+
+def time_construction(num_runs, cache_abstract_model):
+    durations = []
+    durations_abstract = []
+    for _ in range(num_runs):
+        params = load_params()
+        time1 = time.perf_counter()
+        model = MIMOSA(params, cache_abstract_model=cache_abstract_model)
+        durations.append(time.perf_counter() - time1)
+
+        time1 = time.perf_counter()
+        model.get_abstract_model(cache_abstract_model)
+        durations_abstract.append(time.perf_counter() - time1)
+    return sum(durations) / num_runs, sum(durations_abstract) / num_runs
+
+
+if __name__ == "__main__":
+    num_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    # First run fills the data store and abstract model caches
+    time_construction(1, True)
+
+    total_without, abstract_without = time_construction(num_runs, False)
+    total_with, abstract_with = time_construction(num_runs, True)
+
+    print(f"Abstract model without cache: {abstract_without:.4f} s per run")
+    print(f"Abstract model with cache:    {abstract_with:.4f} s per run")
+    print(f"Total construction without cache: {total_without:.3f} s per run")
+    print(f"Total construction with cache:    {total_with:.3f} s per run")
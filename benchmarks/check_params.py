@@ -0,0 +1,41 @@
+"""
+Benchmark: validating the parameters with `check_params`, the first call (which reads
+config_default.yaml and creates the parser tree), later calls, and incremental calls
+which only parse the values that differ from previously validated base parameters.
+
+Usage: python benchmarks/check_params.py [number of runs]
+"""
+
+import copy
+import sys
+import time
+
+from mimosa.common import quant
+from mimosa.common.config.parseconfig import check_params
+
+
+def time_check_params(num_runs, params, base_params=None):
+    time1 = time.perf_counter()
+    for _ in range(num_runs):
+        check_params(params, base_params=base_params)
+    return (time.perf_counter() - time1) / num_runs
+
+
+if __name__ == "__main__":
+    num_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    time1 = time.perf_counter()
+    base_params = check_params({})
+    print(f"First call: {time.perf_counter() - time1:.3f} s")
+
+    params = copy.deepcopy(base_params)
+    params["economics"]["PRTP"] = 0.001
+    params["emissions"]["carbonbudget"] = "500 GtCO2"
+
+    for use_cache in [True, False]:
+        quant.use_cache = use_cache
+        label = "with quantity cache" if use_cache else "without quantity cache"
+        full = time_check_params(num_runs, params)
+        incremental = time_check_params(num_runs, params, base_params)
+        print(f"Full ({label}): {full * 1e3:.2f} ms per call")
+        print(f"Incremental ({label}): {incremental * 1e3:.2f} ms per call")
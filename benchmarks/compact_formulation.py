@@ -0,0 +1,63 @@
+"""
+Benchmark: size of the problem sent to IPOPT (variables, constraints and nonzeros of the
+Jacobian, read from the NL file) and IPOPT time per iteration, for the full and the
+compact formulation (`params["model"]["compact formulation"]`). IPOPT is only run if it
+is available.
+
+Usage: python benchmarks/compact_formulation.py
+"""
+
+import os
+import tempfile
+import time
+
+from mimosa import MIMOSA, load_params
+from mimosa.common import SolverFactory
+
+
+def problem_size(model):
+    """Number of variables, constraints and nonzeros of the Jacobian in the NL file"""
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, "model.nl")
+        model.concrete_model.write(filename, format="nl")
+        with open(filename) as fh:
+            header = [next(fh) for _ in range(8)]
+    num_variables, num_constraints = [int(x) for x in header[1].split()[:2]]
+    nonzeros = int(header[7].split()[0])
+    return num_variables, num_constraints, nonzeros
+
+
+def time_per_iteration(model):
+    with tempfile.TemporaryDirectory() as folder:
+        time1 = time.perf_counter()
+        model.solve(
+            verbose=False,
+            ipopt_output_file=os.path.join(folder, "ipopt.out"),
+            visualise_output=False,
+        )
+        duration = time.perf_counter() - time1
+    return model.iterations, duration / model.iterations
+
+
+if __name__ == "__main__":
+    run_ipopt = SolverFactory("ipopt").available(exception_flag=False)
+
+    for compact in [False, True]:
+        params = load_params()
+        params["model"]["compact formulation"] = compact
+        model = MIMOSA(params)
+
+        name = "compact" if compact else "full"
+        num_variables, num_constraints, nonzeros = problem_size(model)
+        print(
+            f"{name:>7}: {num_variables} variables, {num_constraints} constraints, "
+            f"{nonzeros} nonzeros in the Jacobian"
+        )
+        if run_ipopt:
+            iterations, duration = time_per_iteration(model)
+            print(
+                f"{'':>7}  {iterations} IPOPT iterations, {duration * 1000:.1f} ms per iteration"
+            )
+
+    if not run_ipopt:
+        print("IPOPT is not available: only the problem size is compared")
@@ -0,0 +1,54 @@
+"""
+Benchmark: forward simulation (`MIMOSA.simulate`) of a run with imposed relative abatement.
+Also checks that the simulated values satisfy all equality constraints of the model, by
+evaluating them on a new (not pre-processed) instance.
+
+Usage: python benchmarks/forward_simulation.py [number of runs]
+"""
+
+import sys
+import time
+
+from mimosa import MIMOSA, load_params
+from mimosa.common import Constraint, value
+
+
+def get_params():
+    params = load_params()
+    params["simulation"]["simulationmode"] = True
+    params["simulation"]["fixing_method"] = "fix"
+    params["simulation"]["constraint_variables"] = {
+        "relative_abatement": {
+            year: {region: 0.0 if year == 2020 else 0.3 for region in params["regions"]}
+            for year in range(2020, 2151, 5)
+        },
+    }
+    return params
+
+
+def max_residual(model):
+    """Largest absolute violation of the equality constraints for the simulated values"""
+    m = model.create_instance()
+    for name, var_values in model.get_variable_values().items():
+        var = m.component(name)
+        for index, var_value in var_values.items():
+            if var_value is not None:
+                var[index].set_value(var_value, skip_validation=True)
+    return max(
+        abs(value(constraint.body) - value(constraint.upper))
+        for constraint in m.component_data_objects(Constraint, active=True)
+        if constraint.equality
+    )
+
+
+if __name__ == "__main__":
+    num_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    model = MIMOSA(get_params())
+    time1 = time.perf_counter()
+    for _ in range(num_runs):
+        model.simulate()
+    duration = (time.perf_counter() - time1) / num_runs
+
+    print(f"simulate: {duration * 1000:.1f} ms per run (including output DataFrame)")
+    print(f"max. residual of the equality constraints: {max_residual(model):.2e}")
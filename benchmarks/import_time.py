@@ -0,0 +1,42 @@
+"""
+Benchmark: time of `import mimosa` in a fresh Python process,
+and time until the first quantity is parsed (which loads the unit registry).
+
+Usage: python benchmarks/import_time.py [number of runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_FOLDER = os.path.join(os.path.dirname(__file__), "..")
+
+STATEMENTS = {
+    "import mimosa": "import mimosa",
+    "import mimosa + first quantity": "import mimosa; from mimosa.common import quant; quant('1 GtCO2', 'emissions_unit')",
+}
+
+
+def time_statement(statement, num_runs):
+    durations = []
+    for _ in range(num_runs):
+        time1 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], cwd=REPO_FOLDER, check=True)
+        durations.append(time.perf_counter() - time1)
+    return statistics.median(durations)
+
+
+def time_python_startup(num_runs):
+    return time_statement("pass", num_runs)
+
+
+if __name__ == "__main__":
+    num_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    startup = time_python_startup(num_runs)
+    print(f"Python startup: {startup:.3f} s")
+    for name, statement in STATEMENTS.items():
+        duration = time_statement(statement, num_runs)
+        print(f"{name}: {duration:.3f} s ({duration - startup:.3f} s without startup)")
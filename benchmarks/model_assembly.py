@@ -0,0 +1,71 @@
+"""
+Benchmark: assembly time of the model (AbstractModel and concrete instance) and time to add
+extra unnamed constraints with `add_constraint`, like custom components or the constraints of
+the simulation mode. This is done for a 5-region model (the first five IMAGE26 regions, the
+size of the R5 region set) and for the full IMAGE26 region set.
+
+Usage: python benchmarks/model_assembly.py [number of extra constraints] [number of runs]
+"""
+
+import sys
+import time
+
+from mimosa import MIMOSA, load_params
+from mimosa.common import Constraint, GlobalConstraint, add_constraint
+
+
+def get_params(num_regions=None):
+    params = load_params()
+    if num_regions is not None:
+        params["regions"] = dict(list(params["regions"].items())[:num_regions])
+    return params
+
+
+def time_assembly(model):
+    """Time to create the AbstractModel (without cache) and its concrete instance"""
+    time1 = time.perf_counter()
+    model.get_abstract_model(use_cache=False)
+    time2 = time.perf_counter()
+    model.create_instance()
+    time3 = time.perf_counter()
+    return time2 - time1, time3 - time2
+
+
+def time_extra_constraints(m, num_constraints):
+    """Time to add `num_constraints` unnamed (global) constraints to the concrete model `m`"""
+    constraints = [
+        GlobalConstraint(lambda m, t: m.temperature[t] <= 10)
+        for _ in range(num_constraints)
+    ]
+    time1 = time.perf_counter()
+    for constraint in constraints:
+        add_constraint(m, constraint.to_pyomo_constraint(m), constraint.name)
+    return time.perf_counter() - time1
+
+
+if __name__ == "__main__":
+    num_extra = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    num_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    for label, num_regions in [("R5-sized", 5), ("IMAGE26", None)]:
+        model = MIMOSA(get_params(num_regions))
+        durations = [time_assembly(model) for _ in range(num_runs)]
+        abstract = min(duration[0] for duration in durations)
+        instance = min(duration[1] for duration in durations)
+        extra = min(
+            time_extra_constraints(model.create_instance(), num_extra)
+            for _ in range(num_runs)
+        )
+        m = model.concrete_model
+        num_components = len(list(m.component_objects()))
+        num_constraints = len(list(m.component_objects(Constraint)))
+        print(
+            f"{label:>8} ({len(m.regions)} regions, {num_components} components, "
+            f"{num_constraints} constraint components):"
+        )
+        print(f"{'':>8}  abstract model:     {abstract * 1000:.1f} ms")
+        print(f"{'':>8}  concrete instance:  {instance * 1000:.1f} ms")
+        print(
+            f"{'':>8}  {num_extra} extra constraints: {extra * 1000:.1f} ms "
+            f"({extra / num_extra * 1e6:.0f} us per constraint)"
+        )
@@ -0,0 +1,56 @@
+"""
+Benchmark: parsing the parameters and instantiating the model data
+(`check_params` + regional parameters + data store + instance data)
+with and without the cache of unit conversions in `quant`.
+
+Usage: python benchmarks/quantity_cache.py [number of runs]
+"""
+
+import sys
+import time
+
+from mimosa import MIMOSA, load_params
+from mimosa.common import quant, regional_params, data
+from mimosa.common.config.parseconfig import check_params
+from mimosa.concrete_model.instantiate_params import InstantiatedModel
+
+
+def parse_and_instantiate(params, abstract_model):
+    params, parser_tree = check_params(params, True)
+    regional_param_store = regional_params.RegionalParamStore(params, parser_tree)
+    data_store = data.DataStore(params, regional_param_store)
+    InstantiatedModel(
+        abstract_model, regional_param_store, data_store, create_concrete_model=False
+    )
+
+
+def time_cycles(num_runs, use_cache):
+    quant.use_cache = use_cache
+    quant.cache_clear()
+    params = load_params()
+    abstract_model = MIMOSA(params).abstract_model
+    time1 = time.perf_counter()
+    for _ in range(num_runs):
+        parse_and_instantiate(params, abstract_model)
+    return (time.perf_counter() - time1) / num_runs
+
+
+def time_quant_calls(num_runs, use_cache):
+    quant.use_cache = use_cache
+    time1 = time.perf_counter()
+    for _ in range(num_runs):
+        quant("1000 GtCO2", "emissions_unit")
+        quant(20, "GtCO2/yr", "emissionsrate_unit")
+        quant("0.62 delta_degC/(TtCO2)", "temperature_unit/emissions_unit")
+    return (time.perf_counter() - time1) / num_runs / 3
+
+
+if __name__ == "__main__":
+    num_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    for use_cache in [False, True]:
+        label = "with cache:   " if use_cache else "without cache:"
+        cycle = time_cycles(num_runs, use_cache)
+        call = time_quant_calls(100 * num_runs, use_cache)
+        print(f"quant call {label} {call * 1e6:.1f} us")
+        print(f"check_params + instantiate {label} {cycle:.3f} s per run")
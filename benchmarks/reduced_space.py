@@ -0,0 +1,50 @@
+"""
+Benchmark: reduced-space optimisation (`MIMOSA.solve_reduced_space`) of the default
+cost-benefit run. Also checks that the solution satisfies all constraints of the model,
+by evaluating them on a new (not pre-processed) instance.
+
+Usage: python benchmarks/reduced_space.py [number of runs]
+"""
+
+import sys
+import time
+
+from mimosa import MIMOSA, load_params
+from mimosa.common import Constraint, value
+
+
+def max_violation(model):
+    """Largest absolute violation of the constraints for the optimised values"""
+    m = model.create_instance()
+    for name, var_values in model.get_variable_values().items():
+        var = m.component(name)
+        for index, var_value in var_values.items():
+            if var_value is not None:
+                var[index].set_value(var_value, skip_validation=True)
+    violation = 0.0
+    for constraint in m.component_data_objects(Constraint, active=True):
+        body = value(constraint.body)
+        if constraint.has_lb():
+            violation = max(violation, value(constraint.lower) - body)
+        if constraint.has_ub():
+            violation = max(violation, body - value(constraint.upper))
+    return violation
+
+
+if __name__ == "__main__":
+    num_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    durations = []
+    for _ in range(num_runs):
+        model = MIMOSA(load_params())
+        time1 = time.perf_counter()
+        model.solve_reduced_space()
+        durations.append(time.perf_counter() - time1)
+
+    m = model.concrete_model
+    print(f"solve_reduced_space: {min(durations):.2f} s (best of {num_runs} runs)")
+    print(
+        f"L-BFGS-B iterations: {model.iterations}, status {model.results.solver.status}"
+    )
+    print(f"NPV: {value(m.NPV[m.tf]):.6f}")
+    print(f"max. violation of the constraints: {max_violation(model):.2e}")
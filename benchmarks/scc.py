@@ -0,0 +1,44 @@
+"""
+Benchmark: social cost of carbon for a sample of TCRE draws, in one batched call
+compared to one call per draw.
+
+Usage: python benchmarks/scc.py [number of draws]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from mimosa import load_params
+from mimosa.socialcostofcarbon.scc import SCC
+
+if __name__ == "__main__":
+    num_draws = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    pulse_years = [2025, 2030, 2050]
+
+    time1 = time.perf_counter()
+    scc = SCC(load_params())
+    print(f"setup: {time.perf_counter() - time1:.2f} s")
+
+    # The AbstractModel is shared with MIMOSA objects and earlier SCC objects
+    time1 = time.perf_counter()
+    scc = SCC(load_params())
+    print(f"setup (cached abstract model): {time.perf_counter() - time1:.2f} s")
+
+    draws = scc.data.TCRE * np.random.default_rng(0).lognormal(0, 0.2, num_draws)
+
+    time1 = time.perf_counter()
+    batched = scc.scc(pulse_years, TCRE=draws)
+    duration_batched = time.perf_counter() - time1
+
+    time1 = time.perf_counter()
+    looped = np.array([scc.scc(pulse_years, TCRE=draw) for draw in draws])
+    duration_looped = time.perf_counter() - time1
+
+    print(f"batched: {duration_batched * 1000:.1f} ms for {num_draws} draws")
+    print(f"loop:    {duration_looped * 1000:.1f} ms for {num_draws} draws")
+    print(f"max. difference: {np.abs(batched - looped).max():.2e}")
+    for year, values in zip(pulse_years, batched.T):
+        low, median, high = np.percentile(values, [5, 50, 95])
+        print(f"SCC {year}: {median:.3f} (5-95%: {low:.3f}-{high:.3f})")
@@ -1,3 +1,6 @@
+# Keep in sync with the version in setup.py
+__version__ = "0.1.5"
+
 # Include some shortcuts
 
 from .mimosa import MIMOSA
@@ -4,8 +4,15 @@ Abstract representation of the model
 Contains all model equations and constraints
 """
 
-import numpy as np
-from mimosa.common import Param, AbstractModel, Set, add_constraint
+from mimosa.common import (
+    Param,
+    AbstractModel,
+    Set,
+    Var,
+    GeneralDefinition,
+    add_constraint,
+    add_expression,
+)
 from mimosa.components import (
     effortsharing,
     emissions,
@@ -19,7 +26,6 @@ from mimosa.components import (
     welfare,
 )
 
-
 ######################
 # Create model
 ######################
@@ -31,6 +37,7 @@ def create_abstract_model(
     financialtransfer_module: str,
     welfare_module: str,
     objective_module: str,
+    compact: bool = False,
 ) -> AbstractModel:
     """
     ## Building the abstract model
@@ -44,6 +51,10 @@ def create_abstract_model(
     - `welfare_module`: The welfare module to use
     - `objective_module`: The objective module to use
 
+    With `compact`, the variables which are only defined by an equation (see `GeneralDefinition`,
+    like consumption and utility) are replaced by Pyomo Expressions, which removes these
+    variables and their equality constraints from the problem sent to the solver.
+
     """
     m = AbstractModel()
 
@@ -72,15 +83,8 @@ def create_abstract_model(
     m.TFP = lambda year, region: None
     m.GDP = lambda year, region: None
     m.carbon_intensity = lambda year, region: None
-
-    def baseline_cumulative(year_start, year_end, region):
-        years = np.linspace(year_start, year_end, 100)
-        return np.trapz(m.baseline_emissions(years, region), x=years)
-
-    m.baseline_cumulative = baseline_cumulative
-    m.baseline_cumulative_global = lambda m, year_start, year_end: sum(
-        baseline_cumulative(year_start, year_end, r) for r in m.regions
-    )
+    m.baseline_cumulative = lambda year_start, year_end, region: None
+    m.baseline_cumulative_global = lambda m, year_start, year_end: None
 
     ######################
     # Components
@@ -161,8 +165,29 @@ def create_abstract_model(
     # Add constraints to abstract model
     ######################
 
+    # Keep track of where each Pyomo constraint is defined, for profiling
+    m.constraint_sources = {}
+
+    if compact:
+        # Keep the order of the variables in the output
+        m.variable_names = [var.name for var in m.component_objects(Var)]
+        # The Expressions are added before all constraints, which can refer to them
+        for definition in constraints:
+            if isinstance(definition, GeneralDefinition):
+                add_expression(m, definition)
+        constraints = [
+            constraint
+            for constraint in constraints
+            if not isinstance(constraint, GeneralDefinition)
+        ]
+
     for constraint in constraints:
-        add_constraint(m, constraint.to_pyomo_constraint(m), constraint.name)
+        pyomo_constraints = constraint.to_pyomo_constraint(m)
+        add_constraint(m, pyomo_constraints, constraint.name)
+        if not isinstance(pyomo_constraints, list):
+            pyomo_constraints = [pyomo_constraints]
+        for pyomo_constraint in pyomo_constraints:
+            m.constraint_sources[pyomo_constraint.local_name] = constraint.source
 
     m.obj = objective_rule
 
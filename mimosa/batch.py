@@ -0,0 +1,501 @@
+"""
+Runs a sweep over multiple parameter values in parallel.
+
+Every combination of the values in the grid is a separate scenario. The scenarios are
+solved in a pool of worker processes, and each solved scenario is saved with `save_output`.
+The input database is read once and shared with every worker through the worker initializer,
+such that the CSV file doesn't have to be parsed again in every process.
+
+Usage from Python:
+
+    from mimosa import load_params
+    from mimosa.batch import run_sweep
+
+    summary = run_sweep(
+        load_params(),
+        {
+            "economics.PRTP": [0.001, 0.015],
+            "emissions.carbonbudget": ["500 GtCO2", "1000 GtCO2"],
+        },
+    )
+
+Usage from the command line:
+
+    python -m mimosa.batch --grid economics.PRTP=0.001,0.015 --workers 4
+
+Alternatively, `run_continuation` solves the scenarios one after the other, ordered by their
+parameter values. Every scenario then starts from the solution of the closest scenario
+solved before, instead of from the midpoint of the variable bounds.
+"""
+
+import argparse
+import copy
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import yaml
+
+from mimosa.common import logger, quant
+from mimosa.common.data import DataStore
+from mimosa.common.config.parseconfig import (
+    check_params,
+    load_params,
+    get_nested,
+    set_nested,
+)
+from mimosa.export import (
+    OUTPUT_FORMATS,
+    ResultsCache,
+    ResultsStore,
+    output_dataframe,
+    write_output,
+)
+from mimosa.mimosa import MIMOSA, SolverException
+
+
+def run_sweep(
+    base_params: dict,
+    grid: dict,
+    experiment: str = "sweep",
+    folder: str = "output",
+    max_workers: int = None,
+    output_format: str = "csv",
+    results_store: str = None,
+    results_cache: str = None,
+    **solve_kwargs,
+) -> pd.DataFrame:
+    """Solves every combination of parameter values in `grid` in parallel.
+
+    Args:
+        base_params (dict): parameters shared by all scenarios
+        grid (dict): dictionary with as keys the parameter names, with the levels
+            separated by dots (e.g. "economics.PRTP"), and as values a list of values
+        experiment (str, optional): prefix of the output filenames. Defaults to "sweep".
+        folder (str, optional): output folder. Defaults to "output".
+        max_workers (int, optional): number of worker processes. Defaults to the number of CPUs.
+        output_format (str, optional): format of the output files, see `save_output`. Defaults to "csv".
+        results_store (str, optional): filename of a `ResultsStore`. If given, the output of all
+            scenarios is added to this store instead of saved as separate files. Defaults to None.
+        results_cache (str, optional): folder of a `ResultsCache`. Scenarios which were solved
+            before with the same inputs are taken from the cache instead of solved again, such
+            that an interrupted sweep can be continued. Defaults to None.
+        **solve_kwargs: passed on to `MIMOSA.solve`
+
+    Returns:
+        pd.DataFrame: one row per scenario, with the parameter values, solver status,
+            timing and output filename (or hash in the results store)
+    """
+    solve_kwargs.setdefault("verbose", False)
+    solve_kwargs["results_cache"] = results_cache
+    # Validate the base parameters once, the scenarios are then only parsed where they differ
+    base_params = check_params(base_params)
+    scenarios = create_scenarios(base_params, grid)
+
+    # Read each input database only once, and share it with the workers
+    databases = {}
+    for params in scenarios:
+        filename = DataStore.database_filename(params)
+        databases[filename] = DataStore.load_database(filename)
+
+    # The store is only written to by this process, the workers return their output
+    store = ResultsStore(results_store) if results_store is not None else None
+    cache = ResultsCache(results_cache) if results_cache is not None else None
+
+    rows = []
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(databases,)
+    ) as executor:
+        futures = {}
+        for index, params in enumerate(scenarios):
+            time1 = time.perf_counter()
+            parsed_params, entry = _cached_run(cache, params, base_params)
+            if entry is not None:
+                row = _save_cached_run(
+                    entry,
+                    parsed_params,
+                    f"{experiment}_{index}",
+                    folder,
+                    output_format,
+                    store,
+                )
+                row["time_total"] = time.perf_counter() - time1
+                rows.append({"scenario": index, **_grid_values(params, grid), **row})
+                continue
+            future = executor.submit(
+                _run_scenario,
+                params,
+                base_params,
+                f"{experiment}_{index}",
+                folder,
+                output_format if store is None else None,
+                solve_kwargs,
+            )
+            futures[future] = index
+        if len(rows) > 0:
+            logger.info(f"{len(rows)} scenarios were taken from the results cache")
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                row = future.result()
+            except Exception as exc:  # pylint: disable=broad-except
+                row = {"status": "failed", "message": repr(exc)}
+            if "output" in row:
+                params, dataframe = row.pop("output")
+                row["hash"] = store.add(params, dataframe, f"{experiment}_{index}")
+            row = {"scenario": index, **_grid_values(scenarios[index], grid), **row}
+            logger.info(
+                "Scenario {} finished with status {} in {:.3g} seconds".format(
+                    index, row["status"], row.get("time_total", float("nan"))
+                )
+            )
+            rows.append(row)
+
+    return pd.DataFrame(rows).sort_values("scenario").reset_index(drop=True)
+
+
+def run_continuation(
+    base_params: dict,
+    grid: dict,
+    experiment: str = "continuation",
+    folder: str = "output",
+    compare_cold_start: bool = False,
+    output_format: str = "csv",
+    results_store: str = None,
+    results_cache: str = None,
+    **solve_kwargs,
+) -> pd.DataFrame:
+    """Solves every combination of parameter values in `grid` one after the other.
+    The scenarios are ordered by their parameter values, and the variables of each
+    scenario are initialised with the solution of the closest scenario solved before.
+
+    Args:
+        base_params (dict): parameters shared by all scenarios
+        grid (dict): dictionary with as keys the parameter names, with the levels
+            separated by dots (e.g. "emissions.carbonbudget"), and as values a list of values
+        experiment (str, optional): prefix of the output filenames. Defaults to "continuation".
+        folder (str, optional): output folder. Defaults to "output".
+        compare_cold_start (bool, optional): also solves every scenario from the default
+            initialisation, to report the number of IPOPT iterations saved. Defaults to False.
+        output_format (str, optional): format of the output files, see `save_output`. Defaults to "csv".
+        results_store (str, optional): filename of a `ResultsStore`. If given, the output of all
+            scenarios is added to this store instead of saved as separate files. Defaults to None.
+        results_cache (str, optional): folder of a `ResultsCache`. Scenarios which were solved
+            before with the same inputs are taken from the cache instead of solved again, such
+            that an interrupted sweep can be continued. Defaults to None.
+        **solve_kwargs: passed on to `MIMOSA.solve`. Without an `ipopt_output_file`, the
+            IPOPT output (needed for the number of iterations) is written to a temporary file.
+
+    Returns:
+        pd.DataFrame: one row per scenario, with the parameter values, the scenario used
+            as starting point, solver status, number of IPOPT iterations, timing and output
+            filename (or hash in the results store). Scenarios which raised another error
+            than a `SolverException` get the status "failed".
+    """
+    solve_kwargs.setdefault("verbose", False)
+    # Validate the base parameters once, the scenarios are then only parsed where they differ
+    base_params = check_params(base_params)
+    scenarios = create_scenarios(base_params, grid)
+    coordinates = _scenario_coordinates(base_params, scenarios, grid)
+    order = sorted(
+        range(len(scenarios)),
+        key=lambda index: [_sort_key(value) for value in coordinates[index]],
+    )
+
+    store = ResultsStore(results_store) if results_store is not None else None
+    cache = ResultsCache(results_cache) if results_cache is not None else None
+
+    solutions = {}
+    rows = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # The IPOPT output is needed for the number of iterations
+        solve_kwargs.setdefault("ipopt_output_file", os.path.join(tmpdir, "ipopt.out"))
+        solve_kwargs.setdefault("visualise_output", False)
+
+        for index in order:
+            neighbour = _closest_scenario(index, solutions, coordinates)
+            row = {
+                "scenario": index,
+                **_grid_values(scenarios[index], grid),
+                "start_from": neighbour,
+            }
+
+            time1 = time.perf_counter()
+            parsed_params, entry = _cached_run(cache, scenarios[index], base_params)
+            if entry is not None:
+                solutions[index] = entry["variable_values"]
+                row["start_from"] = None
+                row["iterations"] = entry["iterations"]
+                row.update(
+                    _save_cached_run(
+                        entry,
+                        parsed_params,
+                        f"{experiment}_{index}",
+                        folder,
+                        output_format,
+                        store,
+                    )
+                )
+                row["time_total"] = time.perf_counter() - time1
+                rows.append(row)
+                continue
+
+            try:
+                model = MIMOSA(
+                    scenarios[index],
+                    initial_values=solutions.get(neighbour),
+                    base_params=base_params,
+                )
+                model.solve(results_cache=cache, **solve_kwargs)
+                row["status"] = str(model.results.solver.status)
+                row["iterations"] = model.iterations
+                solutions[index] = model.get_variable_values()
+                if store is not None:
+                    row["hash"] = model.save_to_store(store, f"{experiment}_{index}")
+                else:
+                    row["filename"] = model.save(
+                        f"{experiment}_{index}",
+                        folder=folder,
+                        output_format=output_format,
+                    )
+            except SolverException as exc:
+                row["status"] = "error"
+                row["message"] = str(exc)
+            except Exception as exc:  # pylint: disable=broad-except
+                row["status"] = "failed"
+                row["message"] = repr(exc)
+            row["time_total"] = time.perf_counter() - time1
+
+            if compare_cold_start:
+                try:
+                    cold_model = MIMOSA(scenarios[index], base_params=base_params)
+                    cold_model.solve(**solve_kwargs)
+                    row["iterations_cold"] = cold_model.iterations
+                except Exception:  # pylint: disable=broad-except
+                    row["iterations_cold"] = None
+
+            rows.append(row)
+
+    summary = pd.DataFrame(rows)
+    if compare_cold_start:
+        logger.info(
+            "Continuation used {} IPOPT iterations, cold starts used {}".format(
+                summary["iterations"].sum(), summary["iterations_cold"].sum()
+            )
+        )
+    return summary
+
+
+def create_scenarios(base_params: dict, grid: dict) -> list:
+    """Returns a list of parameter dictionaries, one for every combination in `grid`"""
+    scenarios = []
+    for values in itertools.product(*grid.values()):
+        params = copy.deepcopy(base_params)
+        for key, value in zip(grid.keys(), values):
+            set_nested(params, key.split("."), value)
+        scenarios.append(params)
+    return scenarios
+
+
+####### Private functions #######
+
+
+def _grid_values(params, grid):
+    return {key: get_nested(params, key.split(".")) for key in grid}
+
+
+def _scenario_coordinates(base_params, scenarios, grid):
+    """Converts the grid values of each scenario to numbers where possible
+    (quantities are converted to their default unit), such that distances between
+    scenarios can be calculated. Other values (strings, booleans) are kept as is."""
+    _, parser_tree = check_params(base_params, True, base_params=base_params)
+    coordinates = []
+    for params in scenarios:
+        scenario_coordinates = []
+        for key, value in _grid_values(params, grid).items():
+            parser = get_nested(parser_tree, key.split("."))
+            if parser.type == "quantity" and isinstance(value, str):
+                value = quant(value, parser.unit)
+            scenario_coordinates.append(value)
+        coordinates.append(scenario_coordinates)
+    return coordinates
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _sort_key(value):
+    return (0, value, "") if _is_number(value) else (1, 0, str(value))
+
+
+def _closest_scenario(index, solutions, coordinates):
+    """Returns the index of the solved scenario closest to scenario `index`,
+    with each parameter scaled by the range of its values in the grid"""
+    if len(solutions) == 0:
+        return None
+
+    num_params = len(coordinates[index])
+    ranges = []
+    for i in range(num_params):
+        values = [c[i] for c in coordinates if _is_number(c[i])]
+        ranges.append(max(values) - min(values) if len(values) > 1 else 0)
+
+    def distance(other):
+        total = 0
+        for i in range(num_params):
+            value1, value2 = coordinates[index][i], coordinates[other][i]
+            if _is_number(value1) and _is_number(value2):
+                total += (abs(value1 - value2) / ranges[i]) if ranges[i] > 0 else 0
+            else:
+                total += 0 if value1 == value2 else 1
+        return total
+
+    return min(solutions, key=distance)
+
+
+def _cached_run(cache, params, base_params):
+    """Returns the parsed parameters and the cache entry of the scenario with `params`
+    (None if it is not in the cache)"""
+    if cache is None:
+        return params, None
+    parsed_params = check_params(params, base_params=base_params)
+    return parsed_params, cache.get(cache.key(parsed_params))
+
+
+def _save_cached_run(entry, params, experiment, folder, output_format, store):
+    """Saves the output of a scenario taken from the cache, and returns its summary row"""
+    row = {
+        "status": entry["status"],
+        "message": entry["termination_condition"],
+        "cached": True,
+    }
+    if store is not None:
+        row["hash"] = store.add(params, entry["output"], experiment)
+    else:
+        row["filename"] = write_output(
+            params,
+            entry["output"],
+            experiment,
+            folder=folder,
+            output_format=output_format,
+        )
+    return row
+
+
+def _init_worker(databases):
+    for filename, database in databases.items():
+        DataStore.databases[filename] = database
+        DataStore.cached_data.setdefault(filename, {})
+
+
+def _run_scenario(params, base_params, experiment, folder, output_format, solve_kwargs):
+    row = {}
+    time1 = time.perf_counter()
+    model = MIMOSA(params, base_params=base_params)
+    time2 = time.perf_counter()
+    row["time_create"] = time2 - time1
+    try:
+        model.solve(**solve_kwargs)
+        row["time_solve"] = time.perf_counter() - time2
+        row["status"] = str(model.results.solver.status)
+        row["message"] = str(model.results.solver.termination_condition)
+        if output_format is None:
+            # Returned to the main process, which adds it to the results store
+            row["output"] = (model.params, output_dataframe(model.concrete_model))
+        else:
+            row["filename"] = model.save(
+                experiment, folder=folder, output_format=output_format
+            )
+    except SolverException as exc:
+        row["time_solve"] = time.perf_counter() - time2
+        row["status"] = "error"
+        row["message"] = str(exc)
+    row["time_total"] = time.perf_counter() - time1
+    return row
+
+
+####### Command line interface #######
+
+
+def _parse_grid_argument(argument):
+    key, values = argument.split("=", 1)
+    return key, [yaml.safe_load(value) for value in values.split(",")]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run a MIMOSA parameter sweep")
+    parser.add_argument(
+        "--config",
+        default=None,
+        help="User config file (in mimosa/inputdata/config) with the base parameters",
+    )
+    parser.add_argument(
+        "--grid",
+        action="append",
+        type=_parse_grid_argument,
+        required=True,
+        help="Parameter values to sweep over, e.g. economics.PRTP=0.001,0.015",
+    )
+    parser.add_argument("--experiment", default="sweep")
+    parser.add_argument("--folder", default="output")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--output-format",
+        default="csv",
+        choices=list(OUTPUT_FORMATS.keys()),
+        help="Format of the output files (parquet and feather require pyarrow)",
+    )
+    parser.add_argument(
+        "--results-store",
+        default=None,
+        help="Add the output of all scenarios to this SQLite file instead of separate files",
+    )
+    parser.add_argument(
+        "--results-cache",
+        default=None,
+        help="Folder with previously solved scenarios, which are not solved again",
+    )
+    parser.add_argument(
+        "--continuation",
+        action="store_true",
+        help="Solve the scenarios one after the other, each starting from the closest solved scenario",
+    )
+    parser.add_argument(
+        "--compare-cold-start",
+        action="store_true",
+        help="With --continuation: also solve every scenario from the default initialisation",
+    )
+    arguments = parser.parse_args(args)
+
+    if arguments.continuation:
+        summary = run_continuation(
+            load_params(arguments.config),
+            dict(arguments.grid),
+            experiment=arguments.experiment,
+            folder=arguments.folder,
+            compare_cold_start=arguments.compare_cold_start,
+            output_format=arguments.output_format,
+            results_store=arguments.results_store,
+            results_cache=arguments.results_cache,
+        )
+    else:
+        summary = run_sweep(
+            load_params(arguments.config),
+            dict(arguments.grid),
+            experiment=arguments.experiment,
+            folder=arguments.folder,
+            max_workers=arguments.workers,
+            output_format=arguments.output_format,
+            results_store=arguments.results_store,
+            results_cache=arguments.results_cache,
+        )
+    print(summary.to_string(index=False))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
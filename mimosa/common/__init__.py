@@ -19,9 +19,12 @@ from pyomo.environ import (
     SolverFactory,
     SolverStatus,
     SolverManagerFactory,
+    TerminationCondition,
     Objective,
     Param,
+    Suffix,
     Var,
+    Expression,
     log,
     sqrt,
     tanh,
@@ -33,6 +36,7 @@ from pyomo.environ import (
     units as u,
 )
 from pyomo.opt.base.solvers import OptSolver
+from pyomo.opt import SolverResults
 
 # Pyomo utils
 from .pyomo_utils import (
@@ -44,12 +48,20 @@ from .pyomo_utils import (
     RegionalInitConstraint,
     GlobalSoftEqualityConstraint,
     RegionalSoftEqualityConstraint,
+    GeneralDefinition,
+    GlobalDefinition,
+    RegionalDefinition,
     UsefulVar,
     soft_switch,
     soft_min,
     soft_max,
     get_all_variables,
     add_constraint,
+    add_expression,
+    ReportingVariable,
+    add_reporting_variable,
+    get_reporting_variables,
+    get_reporting_values,
     is_regional,
     get_indices,
     atan,
@@ -2,14 +2,15 @@
 Parses the config.yaml file and checks for consistency with the default config template.
 """
 
+import copy
+
 from mimosa.common.utils import load_yaml
 from mimosa.common import quant
 
 from .utils import PARSER_FACTORY, set_nested, get_nested, flatten
 
 
-def parse_params(default_yaml, user_yaml, return_parser_tree=False):
-    parsed_dict = {}
+def create_parser_tree(default_yaml):
     parser_tree = {}
 
     def _recursive_traverse(curr_keys, subset):
@@ -18,15 +19,51 @@ def parse_params(default_yaml, user_yaml, return_parser_tree=False):
             if isinstance(node, dict) and "type" not in node:
                 _recursive_traverse(keys, node)
             else:
-                parser = PARSER_FACTORY.create_parser(node, quant)
+                set_nested(parser_tree, keys, PARSER_FACTORY.create_parser(node, quant))
 
-                # Save the parser instance for possible later use
-                set_nested(parser_tree, keys, parser)
+    _recursive_traverse([], default_yaml)
+    return parser_tree
+
+
+def parse_params(
+    default_yaml,
+    user_yaml,
+    return_parser_tree=False,
+    parser_tree=None,
+    base_params=None,
+):
+    """Parses the user config with the parsers defined in the default config.
+
+    Args:
+        default_yaml (dict): the default config template
+        user_yaml (dict): the user config
+        return_parser_tree (bool, optional): also return the parser tree. Defaults to False.
+        parser_tree (dict, optional): parser tree of `default_yaml`, as returned by
+            `create_parser_tree`. Created if not given. Defaults to None.
+        base_params (dict, optional): previously parsed config. Values of the user config
+            which are equal to the value in `base_params` are not parsed again. Defaults to None.
+    """
+    if parser_tree is None:
+        parser_tree = create_parser_tree(default_yaml)
+    parsed_dict = {}
 
-                # Save the parsed value
+    def _recursive_traverse(curr_keys, subset):
+        for key, parser in subset.items():
+            keys = list(curr_keys) + [key]
+            if isinstance(parser, dict):
+                _recursive_traverse(keys, parser)
+            elif base_params is not None and _is_unchanged(
+                user_yaml, base_params, keys
+            ):
+                # Parsing is idempotent, so an already parsed value can be reused
+                value = get_nested(base_params, keys)
+                if isinstance(value, (dict, list)):
+                    value = copy.deepcopy(value)
+                set_nested(parsed_dict, keys, value)
+            else:
                 set_nested(parsed_dict, keys, parser.get(user_yaml, keys))
 
-    _recursive_traverse([], default_yaml)
+    _recursive_traverse([], parser_tree)
 
     if return_parser_tree:
         return parsed_dict, parser_tree
@@ -34,6 +71,16 @@ def parse_params(default_yaml, user_yaml, return_parser_tree=False):
     return parsed_dict
 
 
+def _is_unchanged(user_yaml, base_params, keys):
+    try:
+        value = get_nested(user_yaml, keys)
+        base_value = get_nested(base_params, keys)
+    except KeyError:
+        return False
+    # Compare the types as well, since for example True == 1
+    return type(value) is type(base_value) and value == base_value
+
+
 def check_obsolete_params(user_yaml, parsed_params, parser_tree):
     def leaf_criterium(keys, node):
         try:
@@ -57,11 +104,39 @@ def check_obsolete_params(user_yaml, parsed_params, parser_tree):
         raise RuntimeWarning("Some config parameters are obsolete.")
 
 
-def check_params(input_params, return_parser_tree=False):
-    default_yaml = load_yaml("config_default.yaml")
+# Default config template and parser tree, see `get_default_config`
+_DEFAULT_CONFIG = {}
+
+
+def get_default_config():
+    """Returns the default config template and its parser tree. Both are
+    only read and created once, and should therefore not be modified."""
+    if _DEFAULT_CONFIG.get("yaml") is None:
+        default_yaml = load_yaml("config_default.yaml")
+        _DEFAULT_CONFIG["parser_tree"] = create_parser_tree(default_yaml)
+        _DEFAULT_CONFIG["yaml"] = default_yaml
+    return _DEFAULT_CONFIG["yaml"], _DEFAULT_CONFIG["parser_tree"]
+
+
+def check_params(input_params, return_parser_tree=False, base_params=None):
+    """Parses the input parameters and checks them for obsolete keys.
+
+    Args:
+        input_params (dict): the (possibly incomplete) parameters
+        return_parser_tree (bool, optional): also return the parser tree. Defaults to False.
+        base_params (dict, optional): parameters previously returned by `check_params`.
+            Only the values of `input_params` which differ from `base_params` are parsed
+            again, which is faster when many parameter sets are created from the same
+            base parameters. Defaults to None.
+    """
+    default_yaml, parser_tree = get_default_config()
 
     parsed_params, params_parser_tree = parse_params(
-        default_yaml, input_params, return_parser_tree=True
+        default_yaml,
+        input_params,
+        return_parser_tree=True,
+        parser_tree=parser_tree,
+        base_params=base_params,
     )
 
     check_obsolete_params(input_params, parsed_params, params_parser_tree)
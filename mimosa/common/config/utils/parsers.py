@@ -21,12 +21,6 @@ associated parser type name (e.g. "str" for StringParser).
 
 import numpy as np
 from abc import ABC, abstractmethod, abstractproperty
-from pint import (
-    DimensionalityError,
-    OffsetUnitCalculusError,
-    UndefinedUnitError,
-    DefinitionSyntaxError,
-)
 from mimosa.common.units import Quantity
 from . import get_nested
 
@@ -214,6 +208,14 @@ class QuantityParser(GeneralParser):
         self.quant = quant
 
     def parse(self, value):
+        # Pint is only imported once the first quantity is parsed, as it is slow to import
+        from pint import (
+            DimensionalityError,
+            OffsetUnitCalculusError,
+            UndefinedUnitError,
+            DefinitionSyntaxError,
+        )
+
         if self.check_false(value):
             return False
         # Try to parse the quantity
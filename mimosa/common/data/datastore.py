@@ -7,9 +7,8 @@ import os
 from typing import Callable, Dict
 import numpy as np
 import pandas as pd
-from scipy.interpolate import interp1d
 
-from mimosa.common import economics, quant
+from mimosa.common import economics, quant, logger
 from .utils import UnitValues, extrapolate
 
 
@@ -24,7 +23,7 @@ class DataStore:
     to the right units as specified in the config file.
 
     Usage: once the data store is initialised, only the method `DataStore.data_object` will
-    be used.
+    be used. For arrays of years, use `DataStore.data_values`.
     """
 
     # Class property and not instance property to reduce redundancy
@@ -54,21 +53,44 @@ class DataStore:
                 for r in params["regions"]
             },
         }
+        self._create_lookup_tables()
+        self._cumulative_tables = {}
 
-    def _select_database(self):
-        """Makes sure the file doesn't need to be read multiple times"""
-        filename = os.path.join(
+    @staticmethod
+    def database_filename(params) -> str:
+        """Returns the full path of the input database used with `params`"""
+        return os.path.join(
             os.path.dirname(__file__),
             "../../",
-            self.params["input"]["db_filename"],
+            params["input"]["db_filename"],
         )
-        if filename not in DataStore.databases:
-            database = pd.read_csv(filename)
-            database.columns = database.columns.str.lower()
-            DataStore.databases[filename] = database
-            self.cached_data[filename] = {}
 
-        self.database = DataStore.databases[filename]
+    @classmethod
+    def load_database(cls, filename) -> pd.DataFrame:
+        """Reads the database, unless it was already read before.
+
+        The database is indexed by (model, scenario, region, variable). After reading
+        a CSV file for the first time, a binary copy is saved next to it (uncompressed
+        .npy arrays in the folder `.<filename>.cache`), which is memory-mapped instead
+        of reading the CSV file as long as the CSV file doesn't change.
+        """
+        if filename not in cls.databases:
+            database = _read_binary_cache(filename)
+            if database is None:
+                database = pd.read_csv(filename)
+                database.columns = database.columns.str.lower()
+                database = database.set_index(DATABASE_INDEX).sort_index()
+                _write_binary_cache(filename, database)
+            cls.databases[filename] = database
+        if filename not in cls.cached_data:
+            cls.cached_data[filename] = {}
+        return cls.databases[filename]
+
+    def _select_database(self):
+        """Makes sure the file doesn't need to be read multiple times"""
+        filename = self.database_filename(self.params)
+
+        self.database = self.load_database(filename)
         self.cache = self.cached_data[filename]
         self.filename = filename
 
@@ -101,12 +123,11 @@ class DataStore:
         key = (model, scenario, region, variablename)
         if key not in self.cache:
             database = self.database
-            selection = database.loc[
-                (database["model"] == model)
-                & (database["scenario"] == scenario)
-                & (database["region"] == (region[:-1] if region[-1] == "#" else region))
-                & (database["variable"] == variablename)
-            ]
+            region_name = region[:-1] if region[-1] == "#" else region
+            index_key = (model, scenario, region_name, variablename)
+            # The index is sorted, so this is a binary search
+            start, stop = database.index.slice_locs(index_key, index_key)
+            selection = database.iloc[start:stop]
 
             if len(selection) != 1:
                 raise Exception(
@@ -136,14 +157,39 @@ class DataStore:
         extended_data = extrapolate(values, years, extra_years, [variable, region])
         extended_years = np.concatenate([years, extra_years])
 
-        # 3. Interpolate the combined data
+        # 3. Interpolate the combined data (scipy is only imported when needed, as it is slow)
+        from scipy.interpolate import interp1d
+
         interp_fct = interp1d(extended_years, extended_data, kind="cubic")
         return UnitValues(output_years, interp_fct(output_years), unit)
 
+    def _create_lookup_tables(self):
+        """The model years are a subset of the data years, so the values on the model time
+        grid can be looked up directly instead of being interpolated on every call"""
+        self._lookup_tables = {
+            variable: {
+                region: dict(
+                    zip(
+                        np.asarray(values.xvalues).tolist(),
+                        np.asarray(values.yvalues, dtype=float).tolist(),
+                    )
+                )
+                for region, values in regional_values.items()
+            }
+            for variable, regional_values in self._data_values.items()
+        }
+
     def _interp_data(self, year, region, variable):
         values = self._data_values[variable][region]
         return np.interp(year, values.xvalues, values.yvalues)
 
+    def _lookup_data(self, year, region, variable):
+        try:
+            return self._lookup_tables[variable][region][year]
+        except (KeyError, TypeError):
+            # Year not on the data grid (or an array of years)
+            return self._interp_data(year, region, variable)
+
     def data_object(self, variable: str) -> Callable[[int, str], float]:
         """Creates a function giving the value of `variable` at a given year and regions.
 
@@ -153,7 +199,81 @@ class DataStore:
         Returns:
             Callable[[int, str], float]: interpolating function of type f(year, region)
         """
-        return lambda year, region: self._interp_data(year, region, variable)
+        return lambda year, region: self._lookup_data(year, region, variable)
+
+    def data_values(self, variable: str, years, regions=None) -> np.ndarray:
+        """Returns the values of `variable` for an array of years and regions at once.
+
+        Args:
+            variable (str): any of the keys of self._data_values
+            years (array-like): the years
+            regions (list, optional): the regions. Defaults to all regions.
+
+        Returns:
+            np.ndarray: array of shape (len(years), len(regions))
+        """
+        if regions is None:
+            regions = list(self.params["regions"].keys())
+        years = np.asarray(years, dtype=float)
+        return np.column_stack(
+            [self._interp_data(years, region, variable) for region in regions]
+        )
+
+    def _cumulative_table(self, variable):
+        """For each region, the integral of `variable` from the first data year to each
+        data year. As the values are interpolated linearly, the trapezoidal rule on the
+        data years is exact. Only calculated once per variable."""
+        if variable not in self._cumulative_tables:
+            tables = {}
+            for region, values in self._data_values[variable].items():
+                years = np.asarray(values.xvalues, dtype=float)
+                yvalues = np.asarray(values.yvalues, dtype=float)
+                cumulative = np.concatenate(
+                    [
+                        [0.0],
+                        np.cumsum(np.diff(years) * (yvalues[1:] + yvalues[:-1]) / 2),
+                    ]
+                )
+                tables[region] = (
+                    years,
+                    yvalues,
+                    cumulative,
+                    dict(zip(years.tolist(), cumulative.tolist())),
+                )
+            self._cumulative_tables[variable] = tables
+        return self._cumulative_tables[variable]
+
+    def _cumulative_data_since_start(self, year, region, variable):
+        years, yvalues, cumulative, lookup = self._cumulative_table(variable)[region]
+        try:
+            return lookup[year]
+        except (KeyError, TypeError):
+            # Year not on the data grid: add the integral from the previous data year.
+            # Outside of the data years, the values are constant (as with np.interp)
+            year = np.asarray(year, dtype=float)
+            i = np.clip(np.searchsorted(years, year, side="right") - 1, 0, None)
+            value_year = np.interp(year, years, yvalues)
+            return cumulative[i] + (year - years[i]) * (yvalues[i] + value_year) / 2
+
+    def _cumulative_data(self, year_start, year_end, region, variable):
+        return self._cumulative_data_since_start(
+            year_end, region, variable
+        ) - self._cumulative_data_since_start(year_start, region, variable)
+
+    def cumulative_data_object(
+        self, variable: str
+    ) -> Callable[[float, float, str], float]:
+        """Creates a function giving the integral of `variable` between two years for a region.
+
+        Args:
+            variable (str): any of the keys of self._data_values
+
+        Returns:
+            Callable[[float, float, str], float]: function of type f(year_start, year_end, region)
+        """
+        return lambda year_start, year_end, region: self._cumulative_data(
+            year_start, year_end, region, variable
+        )
 
     def __repr__(self):
         return "DataStore with data values {} calculated on the years {}-{} from input file {} for the regions {} and {}".format(
@@ -164,3 +284,84 @@ class DataStore:
             list(self.params["regions"].keys()),
             self.params["SSP"],
         )
+
+
+####### Binary cache of the databases #######
+
+DATABASE_INDEX = ["model", "scenario", "region", "variable"]
+
+# Increase when the format of the binary cache changes
+_BINARY_CACHE_VERSION = 2
+
+# Arrays of the binary cache, each stored as uncompressed .npy file. The key is written last,
+# such that the cache is only used once all other arrays are complete.
+_BINARY_CACHE_ARRAYS = ["index", "unit", "columns", "values", "key"]
+
+
+def _binary_cache_folder(filename):
+    folder, basename = os.path.split(filename)
+    return os.path.join(folder, f".{basename}.cache")
+
+
+def _file_key(filename):
+    """The binary cache is only valid for the CSV file with this size and modification time"""
+    stat = os.stat(filename)
+    return np.array([_BINARY_CACHE_VERSION, stat.st_size, stat.st_mtime_ns])
+
+
+def _read_binary_cache(filename):
+    cache_folder = _binary_cache_folder(filename)
+    if not os.path.exists(os.path.join(cache_folder, "key.npy")):
+        return None
+    try:
+        # Memory-mapped: the values are only read from disk when they are used
+        cache = {
+            name: np.load(
+                os.path.join(cache_folder, f"{name}.npy"),
+                mmap_mode="r",
+                allow_pickle=False,
+            )
+            for name in _BINARY_CACHE_ARRAYS
+        }
+        if not np.array_equal(cache["key"], _file_key(filename)):
+            return None
+        index = pd.MultiIndex.from_arrays(
+            list(cache["index"].T.astype(object)), names=DATABASE_INDEX
+        )
+        database = pd.DataFrame(
+            cache["values"], index=index, columns=cache["columns"].astype(object)
+        )
+        database.insert(0, "unit", cache["unit"].astype(object))
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Could not read binary cache {cache_folder}: {exc}")
+        return None
+    return database
+
+
+def _write_binary_cache(filename, database):
+    value_columns = database.columns.drop("unit")
+    if not all(pd.api.types.is_numeric_dtype(database[c]) for c in value_columns):
+        # Only databases with year columns can be cached
+        return
+    cache_folder = _binary_cache_folder(filename)
+    arrays = {
+        "index": np.array(database.index.to_list(), dtype=str),
+        "unit": database["unit"].to_numpy(dtype=str),
+        "columns": value_columns.to_numpy(dtype=str),
+        "values": database[value_columns].to_numpy(dtype=float),
+        "key": _file_key(filename),
+    }
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        key_filename = os.path.join(cache_folder, "key.npy")
+        if os.path.exists(key_filename):
+            os.remove(key_filename)
+        for name in _BINARY_CACHE_ARRAYS:
+            # Write to a temporary file first, such that other processes never read a partial file
+            array_filename = os.path.join(cache_folder, f"{name}.npy")
+            tmp_filename = f"{array_filename}.{os.getpid()}.tmp"
+            with open(tmp_filename, "wb") as file:
+                np.save(file, arrays[name], allow_pickle=False)
+            os.replace(tmp_filename, array_filename)
+    except OSError as exc:
+        logger.debug(f"Could not write binary cache {cache_folder}: {exc}")
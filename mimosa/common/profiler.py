@@ -0,0 +1,224 @@
+"""
+Records the duration of the different phases of a MIMOSA run
+(parsing the config, creating the instance, preprocessing, solving, saving)
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+from pyomo.environ import Constraint
+from pyomo.core.expr.visitor import sizeof_expression
+
+
+class Profiler:
+    """Collects the durations of the phases of a MIMOSA run.
+
+    Phases can be nested: every record contains the name of the phase, the path of
+    the phases it is part of ("" for top-level phases), its start time in seconds
+    (relative to the creation of the profiler) and its duration in seconds.
+
+    Usage:
+
+        with profiler.phase("Data store"):
+            ...
+
+        profiler.durations()  # Top-level phases
+        profiler.durations("Concrete model creation")  # Phases within a phase
+        profiler.save_trace("trace.json")
+    """
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._time0 = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str, **info):
+        """Context manager which records the duration of the code block as phase `name`.
+        Extra keyword arguments are stored in the record."""
+        parent = self.current_path
+        self._stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self._stack.pop()
+            self.add(name, duration, start=start, parent=parent, **info)
+
+    def add(
+        self, name: str, duration: float, start: float = None, parent=None, **info
+    ) -> None:
+        """Adds a record for a phase that was timed elsewhere.
+        By default, it is nested in the phase that is currently running."""
+        if start is None:
+            start = time.perf_counter() - duration
+        if parent is None:
+            parent = self.current_path
+        self.records.append(
+            {
+                "phase": name,
+                "parent": parent,
+                "start": start - self._time0,
+                "duration": duration,
+                **info,
+            }
+        )
+
+    @property
+    def current_path(self) -> str:
+        return "/".join(self._stack)
+
+    @contextmanager
+    def pyomo_construction(self):
+        """Records the construction time of every Pyomo component constructed
+        within this context (for example during `create_instance`)"""
+        pyomo_logger = logging.getLogger("pyomo.common.timing.construction")
+        handler = _ConstructionTimerHandler(self)
+        old_level, old_propagate = pyomo_logger.level, pyomo_logger.propagate
+        pyomo_logger.setLevel(logging.INFO)
+        pyomo_logger.propagate = False
+        pyomo_logger.addHandler(handler)
+        try:
+            yield
+        finally:
+            pyomo_logger.removeHandler(handler)
+            pyomo_logger.setLevel(old_level)
+            pyomo_logger.propagate = old_propagate
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Returns all records, ordered by start time"""
+        if len(self.records) == 0:
+            return pd.DataFrame(columns=["phase", "parent", "start", "duration"])
+        return pd.DataFrame(self.records).sort_values("start").reset_index(drop=True)
+
+    def durations(self, parent: str = "") -> pd.DataFrame:
+        """Returns the total duration and number of calls of each phase in `parent`.
+
+        Args:
+            parent (str, optional): path of the parent phase, with nested phases separated
+                by "/". Use "" for the top-level phases and None for all phases. Defaults to "".
+        """
+        records = self.to_dataframe()
+        if parent is not None:
+            records = records[records["parent"] == parent]
+        return (
+            records.groupby(["parent", "phase"], sort=False)["duration"]
+            .agg(duration="sum", calls="count")
+            .reset_index()
+        )
+
+    def total(self, name: str) -> float:
+        """Returns the total duration of all records of phase `name`"""
+        return sum(
+            record["duration"] for record in self.records if record["phase"] == name
+        )
+
+    def save_trace(self, filename: str) -> None:
+        """Saves the records as JSON trace (Trace Event Format), which can be opened
+        in chrome://tracing or https://ui.perfetto.dev"""
+        events = []
+        for record in self.records:
+            extra = {
+                key: value
+                for key, value in record.items()
+                if key not in ["phase", "parent", "start", "duration"]
+            }
+            events.append(
+                {
+                    "name": record["phase"],
+                    "cat": record["parent"].split("/")[0] or record["phase"],
+                    "ph": "X",
+                    "ts": record["start"] * 1e6,
+                    "dur": record["duration"] * 1e6,
+                    "pid": 0,
+                    "tid": 0,
+                    "args": {"parent": record["parent"], **extra},
+                }
+            )
+        with open(filename, "w", encoding="utf8") as file:
+            json.dump({"traceEvents": events}, file, default=str)
+
+
+def count_expression_nodes(m) -> dict:
+    """Returns the total number of expression nodes of each Constraint component of `m`"""
+    return {
+        constraint.local_name: sum(
+            sizeof_expression(constraint_data.expr)
+            for constraint_data in constraint.values()
+        )
+        for constraint in m.component_objects(Constraint)
+    }
+
+
+def constraint_report(
+    profiler: Profiler, m, expression_nodes: dict = None, by: str = "constraint"
+) -> pd.DataFrame:
+    """Ranks the constraints of concrete model `m` by the time needed to construct
+    them (generating the expressions of all indices) during `create_instance`.
+
+    Args:
+        profiler (Profiler): profiler which recorded the construction of `m`
+        m (ConcreteModel): the concrete model
+        expression_nodes (dict, optional): number of expression nodes per constraint,
+            as returned by `count_expression_nodes`. Defaults to None.
+        by (str, optional): "constraint" gives one row per constraint, "module" one row per
+            module in which the constraints are defined. Defaults to "constraint".
+
+    Returns:
+        pd.DataFrame: construction time, share of the total construction time of all
+            constraints, number of indices and (if available) number of expression nodes
+    """
+    if by not in ["constraint", "module"]:
+        raise ValueError(f"Cannot group constraint report by `{by}`")
+
+    sources = getattr(m, "constraint_sources", {})
+    construction_times = {
+        record["phase"]: record["duration"]
+        for record in profiler.records
+        if record.get("component_type") == "Constraint"
+    }
+
+    rows = []
+    for constraint in m.component_objects(Constraint):
+        name = constraint.local_name
+        source = sources.get(name, "")
+        row = {
+            "constraint": name,
+            "source": source,
+            "module": source.split(":")[0],
+            "time": construction_times.get(name, 0.0),
+            "indices": len(constraint),
+        }
+        if expression_nodes is not None:
+            row["expression_nodes"] = expression_nodes.get(name, 0)
+        rows.append(row)
+    report = pd.DataFrame(rows)
+
+    if by == "module":
+        report = report.drop(columns=["constraint", "source"])
+        report = report.groupby("module", as_index=False).sum()
+
+    report["share"] = report["time"] / report["time"].sum()
+    return report.sort_values("time", ascending=False).reset_index(drop=True)
+
+
+class _ConstructionTimerHandler(logging.Handler):
+    """Pyomo logs a ConstructionTimer object after constructing each component"""
+
+    def __init__(self, profiler: Profiler):
+        super().__init__(logging.INFO)
+        self.profiler = profiler
+
+    def emit(self, record):
+        construction_timer = record.msg
+        try:
+            name = construction_timer.name
+            duration = construction_timer.timer
+            component_type = construction_timer.obj.ctype.__name__
+        except AttributeError:
+            return
+        self.profiler.add(name, duration, component_type=component_type)
@@ -1,10 +1,11 @@
 import typing
 import re
+import weakref
 from abc import ABC, abstractmethod
 import numpy as np
 from pyomo.core.base.units_container import PintUnitExtractionVisitor
 
-from pyomo.environ import Var, Constraint
+from pyomo.environ import Var, Constraint, Expression, value
 import pyomo.environ
 
 # Monkey patch to make sure that the unit stays the same after calling a arctan-function.
@@ -81,42 +82,97 @@ def soft_max(x, maxval, scale=1.0):
 
 
 class GeneralConstraint(ABC):
-    def __init__(self, rule: typing.Callable, name: str = None, doc: str = None):
+    def __init__(
+        self,
+        rule: typing.Callable,
+        name: str = None,
+        doc: str = None,
+        active_if: typing.Callable = None,
+    ):
         """Adds a constraint to the Pyomo mimosa.
 
         Args:
             rule (typing.Callable): function with parameters m, [t], [r]
             name (str, optional): name of the constraint, useful for debugging. Defaults to None.
             doc (str, optional): documentation of the constraint. Defaults to None.
+            active_if (typing.Callable, optional): function with parameter m that returns False
+                when the constraint is not used for this model (for example, depending on the
+                value of a parameter). It is evaluated once per concrete model, when the constraint
+                is constructed: if it returns False, every index is skipped without calling the
+                rule. The (empty) constraint component is still created, as the AbstractModel is
+                shared by all parameter values. Defaults to None (always active).
         """
 
         self.name = name
         self.rule = rule
         self.doc = doc
+        self.active_if = active_if
 
     @abstractmethod
     def to_pyomo_constraint(self, m):
         pass
 
+    def index_sets(self, m) -> tuple:
+        """Sets over which the constraint is indexed"""
+        return ()
+
+    def pyomo_rule(self, rule):
+        """Rule of the Pyomo constraint, which skips every index if `active_if` returns False.
+        `active_if` is only evaluated once per model, instead of once per index"""
+        if self.active_if is None:
+            return rule
+        is_active = weakref.WeakKeyDictionary()
+
+        def active_rule(m, *index):
+            if m not in is_active:
+                is_active[m] = bool(self.active_if(m))
+            return rule(m, *index) if is_active[m] else Constraint.Skip
+
+        return active_rule
+
+    @property
+    def source(self) -> str:
+        """Module and line number where the rule of this constraint is defined"""
+        code = getattr(self.rule, "__code__", None)
+        module = getattr(self.rule, "__module__", None)
+        if code is None:
+            return str(module)
+        return f"{module}:{code.co_firstlineno}"
+
 
 class GlobalConstraint(GeneralConstraint):
+    def index_sets(self, m):
+        return (m.t,)
+
     def to_pyomo_constraint(self, m):
-        return Constraint(m.t, rule=self.rule, doc=self.doc)
+        return Constraint(
+            *self.index_sets(m), rule=self.pyomo_rule(self.rule), doc=self.doc
+        )
 
 
 class GlobalInitConstraint(GeneralConstraint):
     def to_pyomo_constraint(self, m):
-        return Constraint(rule=self.rule, doc=self.doc)
+        return Constraint(rule=self.pyomo_rule(self.rule), doc=self.doc)
 
 
 class RegionalConstraint(GeneralConstraint):
+    def index_sets(self, m):
+        return (m.t, m.regions)
+
     def to_pyomo_constraint(self, m):
-        return Constraint(m.t, m.regions, rule=self.rule, doc=self.doc)
+        return Constraint(
+            *self.index_sets(m), rule=self.pyomo_rule(self.rule), doc=self.doc
+        )
 
 
 class RegionalInitConstraint(GeneralConstraint):
+    def index_sets(self, m):
+        return (m.regions,)
+
     def to_pyomo_constraint(self, m):
-        return Constraint(m.regions, rule=self.rule, doc=self.doc)
+        return Constraint(
+            *self.index_sets(m), rule=self.pyomo_rule(self.rule), doc=self.doc
+        )
 
 
 class GeneralSoftEqualityConstraint(GeneralConstraint):
@@ -128,6 +184,7 @@ class GeneralSoftEqualityConstraint(GeneralConstraint):
         epsilon: float = 0.005,
         absolute_epsilon: float = None,
         ignore_if: typing.Callable = None,
+        active_if: typing.Callable = None,
     ):
         """Creates a constraint of the type:
             rule_lhs(x) <= (1 + eps) * rule_rhs(x) && rule_lhs(x) >= (1 - eps) * rule_rhs(x)
@@ -139,15 +196,21 @@ class GeneralSoftEqualityConstraint(GeneralConstraint):
             name (str, optional): name of the constraint, useful for debugging. Defaults to None.
             epsilon (float, optional): tolerance for upper/lower bounds. Defaults to 0.005.
             ignore_if (typing.Callable): function with parameters m that returns True when constraint should be ignored
+            active_if (typing.Callable, optional): function with parameter m, evaluated once per
+                constraint, see `GeneralConstraint`. Defaults to None (always active).
         """
-        super().__init__(rule_lhs, [f"{name}_upperbound", f"{name}_lowerbound"])
+        super().__init__(
+            rule_lhs,
+            [f"{name}_upperbound", f"{name}_lowerbound"],
+            active_if=active_if,
+        )
 
         self.rule_rhs = rule_rhs
         self.epsilon = epsilon
         self.absolute_epsilon = absolute_epsilon
 
         if ignore_if is None:
-            ignore_if = lambda m: False  # Never ignore when ignore_if is None
+            ignore_if = lambda m, *index: False  # Never ignore when ignore_if is None
         self.ignore_if = ignore_if
 
     def rhs_eps(self, rule_rhs, is_upper: bool, *args):
@@ -158,6 +221,9 @@ class GeneralSoftEqualityConstraint(GeneralConstraint):
 
 
 class GlobalSoftEqualityConstraint(GeneralSoftEqualityConstraint):
+    def index_sets(self, m):
+        return (m.t,)
+
     def to_pyomo_constraint(self, m):
         eps = self.epsilon
         rule_lhs = self.rule
@@ -174,12 +240,15 @@ class GlobalSoftEqualityConstraint(GeneralSoftEqualityConstraint):
             else Constraint.Skip
         )
         return [
-            Constraint(m.t, rule=upperbound),
-            Constraint(m.t, rule=lowerbound),
+            Constraint(*self.index_sets(m), rule=self.pyomo_rule(upperbound)),
+            Constraint(*self.index_sets(m), rule=self.pyomo_rule(lowerbound)),
         ]
 
 
 class RegionalSoftEqualityConstraint(GeneralSoftEqualityConstraint):
+    def index_sets(self, m):
+        return (m.t, m.regions)
+
     def to_pyomo_constraint(self, m):
         eps = self.epsilon
         rule_lhs = self.rule
@@ -196,16 +265,116 @@ class RegionalSoftEqualityConstraint(GeneralSoftEqualityConstraint):
             else Constraint.Skip
         )
         return [
-            Constraint(m.t, m.regions, rule=upperbound),
-            Constraint(m.t, m.regions, rule=lowerbound),
+            Constraint(*self.index_sets(m), rule=self.pyomo_rule(upperbound)),
+            Constraint(*self.index_sets(m), rule=self.pyomo_rule(lowerbound)),
         ]
 
 
+####### Definitions of variables
+
+
+class GeneralDefinition(GeneralConstraint):
+    def __init__(
+        self,
+        variable: str,
+        rule: typing.Callable,
+        name: str = None,
+        doc: str = None,
+        init_rule: typing.Callable = None,
+    ):
+        """Defines a variable by an equation: variable[t, (r)] == rule(m, t, (r)).
+
+        In the full formulation, this is an equality constraint. In the compact formulation
+        (see `create_abstract_model`), the variable is replaced by a Pyomo Expression with
+        the same name: the solver then sees neither the variable nor the constraint.
+
+        Args:
+            variable (str): name of the defined variable
+            rule (typing.Callable): function with parameters m, t, [r] returning the value of the
+                variable, or `Constraint.Skip` if the variable is not defined for this index
+            name (str, optional): name of the constraint. Defaults to the name of the variable.
+            doc (str, optional): documentation of the constraint. Defaults to None.
+            init_rule (typing.Callable, optional): function with parameters m, [r] returning the
+                value in the first time step, added as separate constraint `{name}_init` in the
+                full formulation. Defaults to None (`rule` is used for all time steps).
+        """
+        name = variable if name is None else name
+        if init_rule is not None:
+            name = [name, f"{name}_init"]
+        super().__init__(rule, name, doc)
+        self.variable = variable
+        self.init_rule = init_rule
+
+    @abstractmethod
+    def index_sets(self, m) -> tuple:
+        pass
+
+    @abstractmethod
+    def to_pyomo_init_constraint(self, m):
+        pass
+
+    def to_pyomo_constraint(self, m):
+        def equality(m, t, *region):
+            rhs = self.rule(m, t, *region)
+            if rhs is Constraint.Skip or (self.init_rule is not None and t == 0):
+                return Constraint.Skip
+            return m.component(self.variable)[(t, *region)] == rhs
+
+        constraint = Constraint(*self.index_sets(m), rule=equality, doc=self.doc)
+        if self.init_rule is None:
+            return constraint
+        init_constraint = self.to_pyomo_init_constraint(m)
+        return [constraint, init_constraint]
+
+    def to_pyomo_expression(self, m):
+        def expression(m, t, *region):
+            if self.init_rule is not None and t == 0:
+                return self.init_rule(m, *region)
+            rhs = self.rule(m, t, *region)
+            return None if rhs is Constraint.Skip else rhs
+
+        return Expression(*self.index_sets(m), rule=expression, doc=self.doc)
+
+
+class GlobalDefinition(GeneralDefinition):
+    def index_sets(self, m):
+        return (m.t,)
+
+    def to_pyomo_init_constraint(self, m):
+        return Constraint(
+            rule=lambda m: m.component(self.variable)[0] == self.init_rule(m)
+        )
+
+
+class RegionalDefinition(GeneralDefinition):
+    def index_sets(self, m):
+        return (m.t, m.regions)
+
+    def to_pyomo_init_constraint(self, m):
+        return Constraint(
+            m.regions,
+            rule=lambda m, r: m.component(self.variable)[0, r] == self.init_rule(m, r),
+        )
+
+
+def add_expression(m, definition):
+    """Replaces the variable defined by `definition` by an Expression with the same name.
+    The unit of the variable is kept in `m.expression_units`, for the output."""
+    var = m.component(definition.variable)
+    if not hasattr(m, "expression_units"):
+        m.expression_units = {}
+    m.expression_units[definition.variable] = get_unit(var)
+    m.del_component(var)
+    m.add_component(definition.variable, definition.to_pyomo_expression(m))
+
+
 def add_constraint(m, constraints, names=None):
     """Adds a constraint to the model
 
     It first generates a unique name, then adds
-    the constraint using this new name
+    the constraint using this new name. Constraints without
+    name are numbered in the order in which they are added:
+    `constraint_0`, `constraint_1`, ...
     """
     if not isinstance(constraints, list):
         constraints = [constraints]
@@ -213,12 +382,21 @@ def add_constraint(m, constraints, names=None):
 
     name = None
     for constraint, name in zip(constraints, names):
-        n = len(list(m.component_objects()))
-        name = f"constraint_{n}" if name is None else f"constraint_{name}"
+        name = unnamed_constraint_name(m) if name is None else f"constraint_{name}"
         m.add_component(name, constraint)
     return name
 
 
+def unnamed_constraint_name(m):
+    """Returns the next free name `constraint_{n}`, using the counter
+    `m.num_unnamed_constraints` instead of counting all components of `m`"""
+    n = getattr(m, "num_unnamed_constraints", 0)
+    while m.component(f"constraint_{n}") is not None:
+        n += 1
+    m.num_unnamed_constraints = n + 1
+    return f"constraint_{n}"
+
+
 ####### Get all variables of a model
 
 
@@ -229,18 +407,29 @@ class UsefulVar:
 
         self.name = name
         self.is_regional = is_regional(self.var)
-        self.unit = get_unit(self.var)
+        expression_units = getattr(m, "expression_units", {})
+        if name in expression_units:
+            self.unit = expression_units[name]
+        else:
+            self.unit = get_unit(self.var)
         self.indices = get_indices(self.var)
 
         self.index_values = {index: list(getattr(m, index)) for index in self.indices}
 
 
 def get_all_variables(m):
-    return [
-        UsefulVar(m, var.name)
-        for var in m.component_objects(Var)
-        if not var.name.startswith("_")
+    """Returns all variables of `m`, including the variables replaced by Expressions in the
+    compact formulation (in the order in which the variables were declared)"""
+    expression_units = getattr(m, "expression_units", {})
+    names = [
+        component.name
+        for component in m.component_objects((Var, Expression))
+        if component.ctype is Var or component.name in expression_units
     ]
+    if expression_units:
+        order = {name: i for i, name in enumerate(m.variable_names)}
+        names.sort(key=lambda name: order.get(name, len(order)))
+    return [UsefulVar(m, name) for name in names if not name.startswith("_")]
 
 
 def is_regional(var):
@@ -255,9 +444,108 @@ def get_indices(var):
 
 
 def get_unit(var):
-    pyomo_unit = units.get_units(var)
+    return unit_to_str(units.get_units(var))
+
+
+def unit_to_str(pyomo_unit):
     pyomo_unit_str = str(pyomo_unit) if pyomo_unit is not None else ""
 
     # Bugfix replace "/a" to "/yr" ("annum" is less clear than year)
     # Note that we should not replace e.g. "/atm", hence the negative lookahead
     return re.sub("/a(?![a-zA-Z])", "/yr", pyomo_unit_str)
+
+
+####### Reporting variables
+
+
+class ReportingVariable:
+    """Quantity which is only reported in the output. Instead of being a variable with
+    a constraint which the solver has to satisfy, it is calculated with NumPy from the
+    values of the solved model (see `get_reporting_values`).
+
+    Args:
+        name (str): name of the quantity in the output
+        rule (callable): function of type f(v), where `v.<name>` returns the values of any
+            variable, parameter, expression or (earlier) reporting variable of the model as
+            array of shape (time steps, regions) or (time steps,). Returns the values of
+            the quantity as array of the same shape
+        is_regional (bool, optional): Defaults to True.
+        units (optional): Pyomo unit of the quantity. Defaults to None.
+        skip_init (bool, optional): the quantity is not defined for t=0 (like a
+            constraint which is skipped for t=0). Defaults to False.
+    """
+
+    def __init__(self, name, rule, is_regional=True, units=None, skip_init=False):
+        self.name = name
+        self.rule = rule
+        self.is_regional = is_regional
+        self.unit = unit_to_str(units)
+        self.skip_init = skip_init
+
+
+def add_reporting_variable(m, *args, **kwargs):
+    """Registers a `ReportingVariable` (with the same arguments) in the model. The
+    reporting variables are kept in `m.reporting_variables` and calculated in the order
+    in which they were added."""
+    if not hasattr(m, "reporting_variables"):
+        m.reporting_variables = []
+    m.reporting_variables.append(ReportingVariable(*args, **kwargs))
+
+
+def get_reporting_variables(m):
+    return getattr(m, "reporting_variables", [])
+
+
+class ModelValues:
+    """Values of the components of a concrete model `m` as NumPy arrays, read when they
+    are first used. Values which are not set (None) become NaN."""
+
+    def __init__(self, m):
+        self._m = m
+        self._num_years = len(m.t)
+        self._num_regions = len(m.regions)
+
+    def __getattr__(self, name):
+        component = self._m.component(name)
+        if component is None:
+            raise AttributeError(f"Model has no component `{name}`")
+        component_values = _component_values(component)
+        if component.is_indexed():
+            shape = (self._num_years, self._num_regions)
+            if component.index_set().dimen == 1:
+                shape = shape[:1]
+            component_values = component_values.reshape(shape)
+        else:
+            component_values = component_values[0]
+        setattr(self, name, component_values)
+        return component_values
+
+
+def _component_values(component):
+    # Indices (t, r) or t are read in order, which gives the values in the order of an
+    # array of shape (time steps, regions)
+    component_values = (
+        value(component[index], exception=False) for index in component.index_set()
+    )
+    return np.fromiter(
+        (np.nan if x is None else x for x in component_values), dtype=float
+    )
+
+
+def get_reporting_values(m):
+    """Calculates the reporting variables of the (solved) concrete model `m`
+
+    Returns:
+        dict: name of the reporting variable -> array of shape (time steps, regions) for
+        regional and (time steps,) for global reporting variables
+    """
+    v = ModelValues(m)
+    reporting_values = {}
+    for reporting_var in get_reporting_variables(m):
+        shape = (len(m.t), len(m.regions)) if reporting_var.is_regional else (len(m.t),)
+        values = np.array(np.broadcast_to(reporting_var.rule(v), shape), dtype=float)
+        if reporting_var.skip_init:
+            values[0] = np.nan
+        setattr(v, reporting_var.name, values)
+        reporting_values[reporting_var.name] = values
+    return reporting_values
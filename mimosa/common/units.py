@@ -3,13 +3,14 @@ Uses the Pint package to parse quantities with units.
 The custom units are loaded from a text file.
 """
 import os
+from functools import lru_cache
 from pyomo.environ import units as pyomo_units
 
 from .utils import load_yaml
 
 
-pyomo_units.load_definitions_from_file(
-    os.path.join(os.path.dirname(__file__), "../inputdata/config", "extra_units.txt")
+EXTRA_UNITS_FILENAME = os.path.join(
+    os.path.dirname(__file__), "../inputdata/config", "extra_units.txt"
 )
 
 DEFAULT_UNITS = load_yaml("default_units.yaml")
@@ -20,6 +21,10 @@ class Quantity:
     The Quantity object creates a callable object which parses quantities
     with units (see __call__ usage).
 
+    Parsed units, conversion factors between two units and parsed quantity strings
+    are cached, such that repeated conversions don't need to be parsed by Pint again.
+    Set `use_cache` to False to always parse with Pint.
+
     Args:
         params (dict): contains all Param values
 
@@ -27,8 +32,40 @@ class Quantity:
 
     def __init__(self):
         self.default_units = DEFAULT_UNITS
-        self._pint_registry = pyomo_units.pint_registry
-        self._pyomo_units_container = pyomo_units
+        self._registry = None
+        self.use_cache = True
+
+        # Caches of the parsing and conversion functions
+        self._cached_target_unit = lru_cache(maxsize=1024)(self._target_unit)
+        self._cached_conversion_factor = lru_cache(maxsize=1024)(
+            self._conversion_factor
+        )
+        self._cached_string_magnitude = lru_cache(maxsize=4096)(
+            self._string_magnitude
+        )
+        self._cached_unit = lru_cache(maxsize=1024)(self._unit)
+
+    def cache_clear(self) -> None:
+        """Empties the caches of parsed units and conversion factors"""
+        self._cached_target_unit.cache_clear()
+        self._cached_conversion_factor.cache_clear()
+        self._cached_string_magnitude.cache_clear()
+        self._cached_unit.cache_clear()
+
+    @property
+    def _pint_registry(self):
+        # Creating the Pint registry (which imports Pint) takes most of the import time
+        # of MIMOSA, so it is only done when the first quantity is parsed
+        if self._registry is None:
+            pyomo_units.load_definitions_from_file(EXTRA_UNITS_FILENAME)
+            self._registry = pyomo_units.pint_registry
+        return self._registry
+
+    @property
+    def _pyomo_units_container(self):
+        # Accessing the Pint registry makes sure the custom units are loaded
+        _ = self._pint_registry
+        return pyomo_units
 
     def __call__(self, *args, only_magnitude=True, can_be_false=True):
         """Usage:
@@ -43,22 +80,24 @@ class Quantity:
             # Sometimes a quantity (like carbon budget) can be skipped by setting to False
             return False
 
+        if not self.use_cache:
+            return self._parse_uncached(*args, only_magnitude=only_magnitude)
+
         # First parse target units with default units
-        target_unit = self._parse_default_units(self._custom_replace(args[-1]))
+        target_unit = self._cached_target_unit(args[-1])
 
         if len(args) == 2:
-            string = self._custom_replace(str(args[0]))
-            quantity = self._pint_registry.Quantity(string)
-        elif len(args) == 3:
-            value = args[0]
-            unit = self._custom_replace(str(args[1]))
-            quantity = self._pint_registry.Quantity(value, unit)
+            magnitude = self._cached_string_magnitude(str(args[0]), target_unit)
         else:
-            raise Exception("Wrong usage of Quant function")
+            factor = self._cached_conversion_factor(str(args[1]), target_unit)
+            if factor is None:
+                # Conversion is not a multiplication (e.g. degC to K)
+                return self._parse_uncached(*args, only_magnitude=only_magnitude)
+            magnitude = args[0] * factor
 
         if only_magnitude:
-            return quantity.to(target_unit).magnitude
-        return quantity.to(target_unit)
+            return magnitude
+        return self._pint_registry.Quantity(magnitude, target_unit)
 
     def __repr__(self):
         units = ", ".join(
@@ -81,14 +120,51 @@ class Quantity:
         (which is also stored in this object as `self.default_units`)
         """
 
+        if self.use_cache:
+            return self._cached_unit(unit_str, pyomo)
+        return self._unit(unit_str, pyomo)
+
+    ####### Private functions #######
+
+    def _parse_uncached(self, *args, only_magnitude=True):
+        target_unit = self._target_unit(args[-1])
+
+        if len(args) == 2:
+            string = self._custom_replace(str(args[0]))
+            quantity = self._pint_registry.Quantity(string)
+        elif len(args) == 3:
+            value = args[0]
+            unit = self._custom_replace(str(args[1]))
+            quantity = self._pint_registry.Quantity(value, unit)
+        else:
+            raise Exception("Wrong usage of Quant function")
+
+        if only_magnitude:
+            return quantity.to(target_unit).magnitude
+        return quantity.to(target_unit)
+
+    def _target_unit(self, unit_str):
+        return self._parse_default_units(self._custom_replace(unit_str))
+
+    def _string_magnitude(self, string, target_unit):
+        quantity = self._pint_registry.Quantity(self._custom_replace(string))
+        return quantity.to(target_unit).magnitude
+
+    def _conversion_factor(self, unit_str, target_unit):
+        """Returns the factor to convert a value from `unit_str` to `target_unit`,
+        or None if the conversion is not a multiplication (units with an offset)"""
+        unit = self._custom_replace(unit_str)
+        if self._pint_registry.Quantity(0.0, unit).to(target_unit).magnitude != 0:
+            return None
+        return self._pint_registry.Quantity(1.0, unit).to(target_unit).magnitude
+
+    def _unit(self, unit_str, pyomo):
         default_units_replaced = self._parse_default_units(unit_str)
         if pyomo:
             return getattr(self._pyomo_units_container, default_units_replaced)
 
         return self._pint_registry.Unit(default_units_replaced)
 
-    ####### Private functions #######
-
     def _parse_default_units(self, units):
         for key, value in self.default_units.items():
             # Add brackets () to avoid order of operation problems with compound units
@@ -4,6 +4,7 @@ Common functions and utilities
 
 import os
 import time
+from contextlib import nullcontext
 import yaml
 from mimosa.common import logger
 
@@ -20,7 +21,9 @@ def first(dictionary):
 
 
 def timer(name, log=False):
-    """Decorator which times functions
+    """Decorator which times functions. For methods of objects with a `profiler`
+    attribute (see `mimosa.common.profiler.Profiler`), the duration is also recorded
+    as phase `name`.
 
     Arguments:
         name {str} -- Description of the function
@@ -28,8 +31,10 @@ def timer(name, log=False):
 
     def decorator(fct):
         def wrapper(*args, **kwargs):
+            profiler = getattr(args[0], "profiler", None) if len(args) > 0 else None
             time1 = time.time()
-            result = fct(*args, **kwargs)
+            with profiler.phase(name) if profiler is not None else nullcontext():
+                result = fct(*args, **kwargs)
             time2 = time.time()
             message = "{} took {:.3g} seconds.".format(name, time2 - time1)
             if log:
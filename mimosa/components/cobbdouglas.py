@@ -11,6 +11,7 @@ from mimosa.common import (
     GeneralConstraint,
     RegionalConstraint,
     RegionalInitConstraint,
+    RegionalDefinition,
     Constraint,
     value,
     soft_min,
@@ -139,13 +140,9 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
                 - m.financial_transfer[t, r],
                 "GDP_net",
             ),
-            RegionalConstraint(
-                lambda m, t, r: m.investments[t, r] == m.sr * m.GDP_net[t, r],
-                "investments",
-            ),
-            RegionalConstraint(
-                lambda m, t, r: m.consumption[t, r] == (1 - m.sr) * m.GDP_net[t, r],
-                "consumption",
+            RegionalDefinition("investments", lambda m, t, r: m.sr * m.GDP_net[t, r]),
+            RegionalDefinition(
+                "consumption", lambda m, t, r: (1 - m.sr) * m.GDP_net[t, r]
             ),
             RegionalConstraint(
                 lambda m, t, r: (
@@ -45,7 +45,7 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     m.damage_a1 = Param(m.regions, doc="regional::ADRICE2010.a1")
     m.damage_a2 = Param(m.regions, doc="regional::ADRICE2010.a2")
     m.damage_a3 = Param(m.regions, doc="regional::ADRICE2010.a3")
-    m.damage_scale_factor = Param()
+    m.damage_scale_factor = Param(doc="::economics.damages.scale factor", mutable=True)
     m.adapt_g1 = Param(m.regions, doc="regional::ADRICE2010.g1")
     m.adapt_g2 = Param(m.regions, doc="regional::ADRICE2010.g2")
     m.adapt_curr_level = Param()
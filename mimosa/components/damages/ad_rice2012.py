@@ -41,7 +41,7 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     m.damage_a1 = Param(m.regions, doc="regional::ADRICE2012.a1")
     m.damage_a2 = Param(m.regions, doc="regional::ADRICE2012.a2")
     m.damage_a3 = Param(m.regions, doc="regional::ADRICE2012.a3")
-    m.damage_scale_factor = Param()
+    m.damage_scale_factor = Param(doc="::economics.damages.scale factor", mutable=True)
 
     m.adapt_level = Var(m.t, m.regions, within=NonNegativeReals)
     m.adapt_costs = Var(m.t, m.regions)
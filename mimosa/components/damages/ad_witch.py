@@ -49,7 +49,7 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
 
     m.adapt_eps = Param(m.regions)
 
-    m.damage_scale_factor = Param()
+    m.damage_scale_factor = Param(doc="::economics.damages.scale factor", mutable=True)
 
     constraints.extend(
         [
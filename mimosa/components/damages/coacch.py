@@ -3,7 +3,9 @@ Model equations and constraints:
 Damage and adaptation costs, RICE specification
 """
 
+from types import SimpleNamespace
 from typing import Sequence
+import numpy as np
 from mimosa.common import (
     AbstractModel,
     Param,
@@ -36,7 +38,7 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     constraints = []
 
     m.damage_costs = Var(m.t, m.regions, units=quant.unit("fraction_of_GDP"))
-    m.damage_scale_factor = Param(doc="::economics.damages.scale factor")
+    m.damage_scale_factor = Param(doc="::economics.damages.scale factor", mutable=True)
 
     # Damages not related to SLR (dependent on temperature)
     m.damage_costs_non_slr = Var(m.t, m.regions, units=quant.unit("fraction_of_GDP"))
@@ -168,6 +170,37 @@ def damage_fct(x, x0, m, r, is_slr):
     return damage
 
 
+def damage_groups(m, is_slr):
+    """Groups the regions with the same functional form, such that `damage_fct` can be
+    evaluated with NumPy arrays for all regions of a group at once.
+
+    Args:
+        m: namespace with the damage parameters as arrays (or lists) indexed by region
+            number, like the values returned by `simulation_mode.forward.model_values`
+        is_slr (bool): groups for the SLR damages or for the non-SLR damages
+
+    Returns:
+        list of (region numbers, parameters): the parameters of a group are lists with
+            one element, the values of all regions in the group. They can be used as `m`
+            in `damage_fct` with region index 0.
+    """
+    prefix = "damage_slr" if is_slr else "damage_noslr"
+    forms = getattr(m, f"{prefix}_form")
+    groups = []
+    for form in dict.fromkeys(forms):
+        regions = [i for i, region_form in enumerate(forms) if region_form == form]
+        group = SimpleNamespace(**{f"{prefix}_form": [form]})
+        for coefficient in ["b1", "b2", "b3", "a"]:
+            values = getattr(m, f"{prefix}_{coefficient}")
+            setattr(
+                group,
+                f"{prefix}_{coefficient}",
+                [np.array([values[i] for i in regions])],
+            )
+        groups.append((np.array(regions), group))
+    return groups
+
+
 def logistic(x, b1, b2, b3):
     exponent = soft_max(-b3 * x, 10, scale=0.1)  # Avoid exponential overflow
     return b1 / (1 + b2 * exp(exponent)) - b1 / (1 + b2)
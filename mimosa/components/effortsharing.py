@@ -45,18 +45,18 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
                 + m.rel_financial_transfer[t, r],
                 lambda m, t, r: m.effort_sharing_common_level[t],
                 "effort_sharing_regime_total_costs",
-                ignore_if=lambda m, t, r: value(m.effort_sharing_regime)
-                != "equal_total_costs"
-                or m.year(t) > 2100,
+                ignore_if=lambda m, t, r: m.year(t) > 2100,
+                active_if=lambda m: value(m.effort_sharing_regime)
+                == "equal_total_costs",
             ),
             # Mitigation costs: mitigation costs should be equal among regions as % GDP
             RegionalSoftEqualityConstraint(
                 lambda m, t, r: m.rel_mitigation_costs[t, r],
                 lambda m, t, r: m.effort_sharing_common_level[t],
                 "effort_sharing_regime_mitigation_costs",
-                ignore_if=lambda m, t, r: value(m.effort_sharing_regime)
-                != "equal_mitigation_costs",
-                # or m.year(t) > 2125,
+                active_if=lambda m: value(m.effort_sharing_regime)
+                == "equal_mitigation_costs",
+                # ignore_if=lambda m, t, r: m.year(t) > 2125,
             ),
         ]
     )
@@ -82,12 +82,13 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
         [
             RegionalSoftEqualityConstraint(
                 lambda m, t, r: percapconv_share_rule(m, t, r) * m.global_emissions[t],
-                lambda m, t, r: m.baseline[t, r] - m.paid_for_emission_reductions[t, r],
+                lambda m, t, r: m.baseline[t, r]
+                - m.paid_for_emission_reductions_rule(m, t, r),
                 epsilon=None,
                 absolute_epsilon=0.01,
-                ignore_if=lambda m, t, r: value(m.effort_sharing_regime)
-                != "per_cap_convergence"
-                or t == 0,
+                ignore_if=lambda m, t, r: t == 0,
+                active_if=lambda m: value(m.effort_sharing_regime)
+                == "per_cap_convergence",
                 name="percapconv_rule",
             ),
         ]
@@ -13,6 +13,8 @@ from mimosa.common import (
     GlobalInitConstraint,
     RegionalConstraint,
     RegionalInitConstraint,
+    GlobalDefinition,
+    RegionalDefinition,
     Constraint,
     value,
     quant,
@@ -185,25 +187,17 @@ def _get_emissions_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
                 lambda m, r: m.regional_emissions[0, r]
                 == m.baseline_emissions(m.year(0), r)
             ),
-            RegionalConstraint(
-                lambda m, t, r: m.regional_emission_reduction[t, r]
-                == m.baseline[t, r] - m.regional_emissions[t, r],
+            RegionalDefinition(
                 "regional_emission_reduction",
+                lambda m, t, r: m.baseline[t, r] - m.regional_emissions[t, r],
             ),
             # Global emissions (sum from regional emissions)
-            GlobalConstraint(
-                lambda m, t: (
-                    m.global_emissions[t]
-                    == sum(m.regional_emissions[t, r] for r in m.regions)
-                    if t > 0
-                    else Constraint.Skip
-                ),
+            GlobalDefinition(
                 "global_emissions",
-            ),
-            GlobalInitConstraint(
-                lambda m: m.global_emissions[0]
-                == sum(m.baseline_emissions(m.year(0), r) for r in m.regions),
-                "global_emissions_init",
+                lambda m, t: sum(m.regional_emissions[t, r] for r in m.regions),
+                init_rule=lambda m: sum(
+                    m.baseline_emissions(m.year(0), r) for r in m.regions
+                ),
             ),
             # Cumulative global emissions
             GlobalConstraint(
@@ -318,8 +312,8 @@ def _get_temperature_constraints(m: AbstractModel) -> Sequence[GeneralConstraint
     m.temperature = Var(
         m.t, initialize=lambda m, t: m.T0, units=quant.unit("degC_above_PI")
     )
-    m.TCRE = Param(doc="::temperature.TCRE")
-    m.temperature_target = Param(doc="::temperature.target")
+    m.TCRE = Param(doc="::temperature.TCRE", mutable=True)
+    m.temperature_target = Param(doc="::temperature.target", mutable=True)
     constraints.extend(
         [
             GlobalConstraint(
@@ -331,10 +325,11 @@ def _get_temperature_constraints(m: AbstractModel) -> Sequence[GeneralConstraint
             GlobalConstraint(
                 lambda m, t: (
                     m.temperature[t] <= m.temperature_target
-                    if (m.year(t) >= 2100 and value(m.temperature_target) is not False)
+                    if m.year(t) >= 2100
                     else Constraint.Skip
                 ),
                 name="temperature_target",
+                active_if=lambda m: value(m.temperature_target) is not False,
             ),
         ]
     )
@@ -470,7 +465,7 @@ def _get_inertia_and_budget_constraints(
 
     constraints = []
 
-    m.budget = Param(doc="::emissions.carbonbudget")
+    m.budget = Param(doc="::emissions.carbonbudget", mutable=True)
     m.inertia_global = Param(doc="::emissions.inertia.global")
     m.inertia_regional = Param(doc="::emissions.inertia.regional")
     m.global_min_level = Param(doc="::emissions.global min level")
@@ -496,10 +491,11 @@ def _get_inertia_and_budget_constraints(
                         )
                     )
                     <= 0
-                    if (m.year(t) >= 2100 and value(m.budget) is not False)
+                    if m.year(t) >= 2100
                     else Constraint.Skip
                 ),
                 name="carbon_budget",
+                active_if=lambda m: value(m.budget) is not False,
             ),
             GlobalConstraint(lambda m, t: m.cumulative_emissions[t] >= 0),
             # Global and regional inertia constraints:
@@ -509,56 +505,48 @@ def _get_inertia_and_budget_constraints(
                     >= m.dt
                     * m.inertia_global
                     * sum(m.baseline_emissions(m.year(0), r) for r in m.regions)
-                    if value(m.inertia_global) is not False and t > 0
+                    if t > 0
                     else Constraint.Skip
                 ),
                 name="global_inertia",
+                active_if=lambda m: value(m.inertia_global) is not False,
             ),
             RegionalConstraint(
                 lambda m, t, r: (
                     m.regional_emissions[t, r] - m.regional_emissions[t - 1, r]
                     >= m.dt * m.inertia_regional * m.baseline_emissions(m.year(0), r)
-                    if value(m.inertia_regional) is not False and t > 0
+                    if t > 0
                     else Constraint.Skip
                 ),
                 name="regional_inertia",
+                active_if=lambda m: value(m.inertia_regional) is not False,
             ),
             GlobalConstraint(
-                lambda m, t: (
-                    m.global_emissions[t] >= m.global_min_level
-                    if value(m.global_min_level) is not False
-                    else Constraint.Skip
-                ),
+                lambda m, t: m.global_emissions[t] >= m.global_min_level,
                 "global_min_level",
+                active_if=lambda m: value(m.global_min_level) is not False,
             ),
             RegionalConstraint(
-                lambda m, t, r: (
-                    m.regional_emissions[t, r] >= m.regional_min_level
-                    if value(m.regional_min_level) is not False
-                    else Constraint.Skip
-                ),
+                lambda m, t, r: m.regional_emissions[t, r] >= m.regional_min_level,
                 "regional_min_level",
+                active_if=lambda m: value(m.regional_min_level) is not False,
             ),
             RegionalConstraint(
                 lambda m, t, r: (
                     m.regional_emissions[t, r] - m.regional_emissions[t - 1, r] <= 0
                     if m.year(t - 1) > 2100
-                    and value(m.non_increasing_emissions_after_2100)
                     else Constraint.Skip
                 ),
                 name="non_increasing_emissions_after_2100",
+                active_if=lambda m: value(m.non_increasing_emissions_after_2100),
             ),
             GlobalConstraint(
                 lambda m, t: (
-                    m.global_emissions[t] <= 0
-                    if (
-                        m.year(t) >= 2100
-                        and value(m.no_pos_emissions_after_budget_year) is True
-                        and value(m.budget) is not False
-                    )
-                    else Constraint.Skip
+                    m.global_emissions[t] <= 0 if m.year(t) >= 2100 else Constraint.Skip
                 ),
                 name="net_zero_after_2100",
+                active_if=lambda m: value(m.no_pos_emissions_after_budget_year) is True
+                and value(m.budget) is not False,
             ),
         ]
     )
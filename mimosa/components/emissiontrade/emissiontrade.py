@@ -18,6 +18,7 @@ from mimosa.common import (
     RegionalSoftEqualityConstraint,
     value,
     soft_min,
+    add_reporting_variable,
 )
 
 from mimosa.components.mitigation import AC
@@ -67,62 +68,50 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
                 / sum(m.population(m.year(t), r) for r in m.regions),
                 "global_carbonprice",
             ),
-        ]
-    )
-
-    ## Extra reporting variables:
-
-    m.paid_for_emission_reductions = Var(
-        m.t, m.regions, units=quant.unit("emissionsrate_unit")
-    )
-    m.import_export_emission_reduction_balance = Var(
-        m.t, m.regions, units=quant.unit("emissionsrate_unit")
-    )
-    m.import_export_mitigation_cost_balance = Var(
-        m.t, m.regions, units=quant.unit("currency_unit")
-    )
-    constraints.extend(
-        [
             GlobalConstraint(
                 lambda m, t: sum(m.mitigation_costs[t, r] for r in m.regions)
                 == sum(m.area_under_MAC[t, r] for r in m.regions),
                 "sum_mitigation_equals_sum_area_under_mac",
             ),
-            RegionalConstraint(
-                lambda m, t, r: (
-                    m.mitigation_costs[t, r]
-                    == m.area_under_MAC[t, r]
-                    + m.import_export_mitigation_cost_balance[t, r]
-                    if t > 0
-                    else Constraint.Skip
-                ),
-                "mitigation_costs_equals_area_under_mac_plus_import_export_mitigation_cost_balance",
-            ),
-            # Constraint: from import/export mitigation costs to import/export of emissions using the global carbon price
-            RegionalConstraint(
-                lambda m, t, r: (
-                    m.import_export_emission_reduction_balance[t, r]
-                    == m.import_export_mitigation_cost_balance[t, r]
-                    / soft_min(m.global_carbonprice[t])
-                    if t > 0
-                    else Constraint.Skip
-                ),
-                "import_export_emission_reduction_balance",
-            ),
-            # Constraint: paid for emission reductions
-            RegionalConstraint(
-                lambda m, t, r: (
-                    m.paid_for_emission_reductions[t, r]
-                    == (
-                        m.regional_emission_reduction[t, r]
-                        + m.import_export_emission_reduction_balance[t, r]
-                    )
-                    if t > 0
-                    else Constraint.Skip
-                ),
-                "paid_for_emission_reductions",
-            ),
         ]
     )
 
+    ## Extra reporting variables, calculated after solving:
+
+    add_reporting_variable(
+        m,
+        "import_export_mitigation_cost_balance",
+        lambda v: v.mitigation_costs - v.area_under_MAC,
+        units=quant.unit("currency_unit"),
+        skip_init=True,
+    )
+    # From import/export mitigation costs to import/export of emissions using the global carbon price
+    add_reporting_variable(
+        m,
+        "import_export_emission_reduction_balance",
+        lambda v: v.import_export_mitigation_cost_balance
+        / soft_min(v.global_carbonprice)[:, None],
+        units=quant.unit("emissionsrate_unit"),
+        skip_init=True,
+    )
+    add_reporting_variable(
+        m,
+        "paid_for_emission_reductions",
+        lambda v: v.regional_emission_reduction
+        + v.import_export_emission_reduction_balance,
+        units=quant.unit("emissionsrate_unit"),
+        skip_init=True,
+    )
+    # Used in the per capita convergence effort sharing regime
+    m.paid_for_emission_reductions_rule = paid_for_emission_reductions
+
     return constraints
+
+
+def paid_for_emission_reductions(m, t, r):
+    """Emission reductions paid for by region `r`: its own emission reductions plus the
+    balance of imported and exported emission reductions (the import/export mitigation
+    cost balance divided by the global carbon price)"""
+    return m.regional_emission_reduction[t, r] + (
+        m.mitigation_costs[t, r] - m.area_under_MAC[t, r]
+    ) / soft_min(m.global_carbonprice[t])
@@ -15,6 +15,8 @@ from mimosa.common import (
     Constraint,
     NonNegativeReals,
     quant,
+    soft_min,
+    add_reporting_variable,
 )
 
 from mimosa.components.mitigation import AC
@@ -61,47 +63,32 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
         ]
     )
 
-    ## Extra reporting variables:
+    ## Extra reporting variables, calculated after solving:
 
-    m.paid_for_emission_reductions = Var(
-        m.t, m.regions, units=quant.unit("emissionsrate_unit")
+    add_reporting_variable(
+        m,
+        "paid_for_emission_reductions",
+        lambda v: v.mitigation_costs
+        * v.global_emission_reduction_per_cost_unit[:, None],
+        units=quant.unit("emissionsrate_unit"),
+        skip_init=True,
     )
-    m.import_export_emission_reduction_balance = Var(
-        m.t, m.regions, units=quant.unit("emissionsrate_unit")
+    # Import export of emission reduction balance: if positive: , if negative:
+    add_reporting_variable(
+        m,
+        "import_export_emission_reduction_balance",
+        lambda v: v.paid_for_emission_reductions - v.regional_emission_reduction,
+        units=quant.unit("emissionsrate_unit"),
+        skip_init=True,
     )
-    m.import_export_mitigation_cost_balance = Var(
-        m.t, m.regions, units=quant.unit("currency_unit")
-    )
-    constraints.extend(
-        [
-            RegionalConstraint(
-                lambda m, t, r: (
-                    m.paid_for_emission_reductions[t, r]
-                    == m.mitigation_costs[t, r]
-                    * m.global_emission_reduction_per_cost_unit[t]
-                    if t > 0
-                    else Constraint.Skip
-                ),
-                "paid_for_emission_reductions",
-            ),
-            # Import export of emission reduction balance: if positive: , if negative:
-            RegionalConstraint(
-                lambda m, t, r: (
-                    m.import_export_emission_reduction_balance[t, r]
-                    == m.paid_for_emission_reductions[t, r]
-                    - m.regional_emission_reduction[t, r]
-                    if t > 0
-                    else Constraint.Skip
-                ),
-                "import_export_emission_reduction_balance",
-            ),
-            RegionalConstraint(
-                lambda m, t, r: m.import_export_mitigation_cost_balance[t, r]
-                == m.mitigation_costs[t, r] - m.area_under_MAC[t, r],
-                "import_export_mitigation_cost_balance",
-            ),
-        ]
+    add_reporting_variable(
+        m,
+        "import_export_mitigation_cost_balance",
+        lambda v: v.mitigation_costs - v.area_under_MAC,
+        units=quant.unit("currency_unit"),
     )
+    # Used in the per capita convergence effort sharing regime
+    m.paid_for_emission_reductions_rule = paid_for_emission_reductions
 
     # How are mitigation costs distributed over regions?
     m.min_rel_payment_level = Param(
@@ -112,3 +99,13 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     )
 
     return constraints
+
+
+def paid_for_emission_reductions(m, t, r):
+    """Emission reductions paid for by region `r`: its share in the global mitigation
+    costs times the global emission reduction per cost unit"""
+    return (
+        m.mitigation_costs[t, r]
+        * sum(m.regional_emission_reduction[t, s] for s in m.regions)
+        / soft_min(sum(m.mitigation_costs[t, s] for s in m.regions))
+    )
@@ -12,10 +12,13 @@ from mimosa.common import (
     GlobalConstraint,
     RegionalConstraint,
     RegionalInitConstraint,
+    GlobalDefinition,
+    RegionalDefinition,
     Constraint,
     log,
     soft_min,
     quant,
+    add_reporting_variable,
 )
 
 
@@ -87,10 +90,9 @@ def _get_mac_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     )
     constraints.extend(
         [
-            RegionalConstraint(
-                lambda m, t, r: m.rel_mitigation_costs[t, r]
-                == m.mitigation_costs[t, r] / m.GDP_gross[t, r],
+            RegionalDefinition(
                 "rel_mitigation_costs",
+                lambda m, t, r: m.mitigation_costs[t, r] / m.GDP_gross[t, r],
                 doc="$$ \\text{rel_mitigation_costs}_{t,r} = \\frac{\\text{mitigation_costs}_{t,r}}{\\text{GDP_gross}_{t,r}} $$",
             ),
             RegionalConstraint(
@@ -113,49 +115,33 @@ def _get_mac_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     m.global_rel_mitigation_costs = Var(m.t)
     constraints.extend(
         [
-            GlobalConstraint(
-                lambda m, t: m.global_rel_mitigation_costs[t]
-                == sum(m.mitigation_costs[t, r] for r in m.regions)
-                / sum(m.GDP_gross[t, r] for r in m.regions),
+            GlobalDefinition(
                 "global_rel_mitigation_costs",
+                lambda m, t: sum(m.mitigation_costs[t, r] for r in m.regions)
+                / sum(m.GDP_gross[t, r] for r in m.regions),
             )
         ]
     )
 
     # Calculate average global emission reduction per cost unit
-    # and average cost per unit emission reduction
-
-    m.global_emission_reduction_per_cost_unit = Var(
-        m.t, units=quant.unit("emissionsrate_unit / currency_unit")
-    )
-    m.global_cost_per_emission_reduction_unit = Var(
-        m.t, units=quant.unit("currency_unit / emissionsrate_unit")
+    # and average cost per unit emission reduction (only reported, calculated after solving)
+    add_reporting_variable(
+        m,
+        "global_emission_reduction_per_cost_unit",
+        lambda v: v.regional_emission_reduction.sum(axis=1)
+        / soft_min(v.mitigation_costs.sum(axis=1)),
+        is_regional=False,
+        units=quant.unit("emissionsrate_unit / currency_unit"),
+        skip_init=True,
     )
-    constraints.extend(
-        [
-            GlobalConstraint(
-                lambda m, t: (
-                    m.global_emission_reduction_per_cost_unit[t]
-                    == sum(m.regional_emission_reduction[t, r] for r in m.regions)
-                    / soft_min(sum(m.mitigation_costs[t, r] for r in m.regions))
-                    if t > 0
-                    else Constraint.Skip
-                ),
-                "global_emission_reduction_per_cost_unit",
-            ),
-            GlobalConstraint(
-                lambda m, t: (
-                    m.global_cost_per_emission_reduction_unit[t]
-                    == sum(m.mitigation_costs[t, r] for r in m.regions)
-                    / soft_min(
-                        sum(m.regional_emission_reduction[t, r] for r in m.regions)
-                    )
-                    if t > 0
-                    else Constraint.Skip
-                ),
-                "global_cost_per_emission_reduction_unit",
-            ),
-        ]
+    add_reporting_variable(
+        m,
+        "global_cost_per_emission_reduction_unit",
+        lambda v: v.mitigation_costs.sum(axis=1)
+        / soft_min(v.regional_emission_reduction.sum(axis=1)),
+        is_regional=False,
+        units=quant.unit("currency_unit / emissionsrate_unit"),
+        skip_init=True,
     )
 
     return constraints
@@ -199,12 +185,12 @@ def _get_learning_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     m.learning_factor = Var(m.t)
     constraints.extend(
         [
-            GlobalConstraint(
-                lambda m, t: m.LOT_factor[t] == 1 / (1 + m.LOT_rate) ** t, "LOT"
+            GlobalDefinition(
+                "LOT_factor", lambda m, t: 1 / (1 + m.LOT_rate) ** t, "LOT"
             ),
-            GlobalConstraint(
-                lambda m, t: m.learning_factor[t]
-                == (m.LBD_factor[t] * m.LOT_factor[t]),
+            GlobalDefinition(
+                "learning_factor",
+                lambda m, t: (m.LBD_factor[t] * m.LOT_factor[t]),
                 "learning",
             ),
         ]
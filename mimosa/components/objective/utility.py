@@ -37,7 +37,7 @@ def get_constraints(m: AbstractModel) -> Tuple[Objective, Sequence[GeneralConstr
     constraints = []
 
     m.NPV = Var(m.t)
-    m.PRTP = Param(doc="::economics.PRTP")
+    m.PRTP = Param(doc="::economics.PRTP", mutable=True)
     constraints.extend(
         [
             GlobalConstraint(
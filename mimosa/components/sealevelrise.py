@@ -17,6 +17,10 @@ from mimosa.common import (
     quant,
 )
 
+# Initial SLR due to glaciers and small ice caps (GSIC) and the Greenland ice sheet (GIS)
+SLR_GSIC_INIT = 0.015
+SLR_GIS_INIT = 0.006
+
 
 def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     """Emissions and temperature equations and constraints
@@ -80,7 +84,7 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
             ),
             name="SLR_GSIC",
         ),
-        GlobalInitConstraint(lambda m: m.slr_cumgsic[0] == 0.015),
+        GlobalInitConstraint(lambda m: m.slr_cumgsic[0] == SLR_GSIC_INIT),
         # GIS
         GlobalConstraint(
             lambda m, t: (
@@ -90,7 +94,7 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
             ),
             name="SLR_GIS",
         ),
-        GlobalInitConstraint(lambda m: m.slr_cumgis[0] == 0.006),
+        GlobalInitConstraint(lambda m: m.slr_cumgis[0] == SLR_GIS_INIT),
         # Total SLR is sum of each contributing factors
         GlobalConstraint(
             lambda m, t: m.total_SLR[t]
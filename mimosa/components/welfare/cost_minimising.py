@@ -10,8 +10,8 @@ from mimosa.common import (
     Param,
     Var,
     GeneralConstraint,
-    RegionalConstraint,
     GlobalConstraint,
+    RegionalDefinition,
 )
 from .utility_fct import calc_utility
 
@@ -56,17 +56,15 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     constraints = []
 
     # Parameters
-    m.elasmu = Param(doc="::economics.elasmu")
+    m.elasmu = Param(doc="::economics.elasmu", mutable=True)
 
     m.utility = Var(m.t, m.regions, initialize=10)
     m.yearly_welfare = Var(m.t)
 
     constraints.extend(
         [
-            RegionalConstraint(
-                lambda m, t, r: m.utility[t, r]
-                == m.consumption[t, r] / m.L(m.year(t), r),
-                "utility",
+            RegionalDefinition(
+                "utility", lambda m, t, r: m.consumption[t, r] / m.L(m.year(t), r)
             ),
             GlobalConstraint(
                 lambda m, t: m.yearly_welfare[t]
@@ -10,8 +10,8 @@ from mimosa.common import (
     Param,
     Var,
     GeneralConstraint,
-    RegionalConstraint,
     GlobalConstraint,
+    RegionalDefinition,
     soft_min,
 )
 
@@ -30,20 +30,19 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     constraints = []
 
     # Parameters
-    m.elasmu = Param(doc="::economics.elasmu")
-    m.inequal_aversion = Param(doc="::economics.inequal_aversion")
+    m.elasmu = Param(doc="::economics.elasmu", mutable=True)
+    m.inequal_aversion = Param(doc="::economics.inequal_aversion", mutable=True)
 
     m.utility = Var(m.t, m.regions, initialize=10)
     m.yearly_welfare = Var(m.t)
 
     constraints.extend(
         [
-            RegionalConstraint(
-                lambda m, t, r: m.utility[t, r]
-                == calc_regional_utility(
+            RegionalDefinition(
+                "utility",
+                lambda m, t, r: calc_regional_utility(
                     m.consumption[t, r], m.L(m.year(t), r), m.inequal_aversion
                 ),
-                "utility",
             ),
             GlobalConstraint(
                 lambda m, t: m.yearly_welfare[t]
@@ -9,8 +9,8 @@ from mimosa.common import (
     Param,
     Var,
     GeneralConstraint,
-    RegionalConstraint,
     GlobalConstraint,
+    RegionalDefinition,
 )
 from .utility_fct import calc_utility
 
@@ -51,17 +51,18 @@ def get_constraints(m: AbstractModel) -> Sequence[GeneralConstraint]:
     constraints = []
 
     # Parameters
-    m.elasmu = Param(doc="::economics.elasmu")
+    m.elasmu = Param(doc="::economics.elasmu", mutable=True)
 
     m.utility = Var(m.t, m.regions, initialize=0.1)
     m.yearly_welfare = Var(m.t)
 
     constraints.extend(
         [
-            RegionalConstraint(
-                lambda m, t, r: m.utility[t, r]
-                == calc_utility(m.consumption[t, r], m.L(m.year(t), r), m.elasmu),
+            RegionalDefinition(
                 "utility",
+                lambda m, t, r: calc_utility(
+                    m.consumption[t, r], m.L(m.year(t), r), m.elasmu
+                ),
             ),
             GlobalConstraint(
                 lambda m, t: m.yearly_welfare[t]
@@ -9,6 +9,16 @@ from mimosa.common.config.parseconfig import get_nested
 V = lambda val: {None: val}
 
 
+def get_param_value(params, param_parser_tree, keys):
+    """Returns the value of `params` at `keys`, converted to the default units for quantities"""
+    value = get_nested(params, keys)
+    # Check type of parameter
+    parser = get_nested(param_parser_tree, keys)
+    if parser.type == "quantity":
+        value = quant(value, parser.unit)
+    return value
+
+
 class InstantiatedModel:
     def __init__(
         self,
@@ -35,7 +45,10 @@ class InstantiatedModel:
 
     def set_data_functions(self):
         # The data functions need to be changed in the abstract model
-        # before initialization.
+        # before initialization. Note that the abstract model can be shared
+        # between multiple instances: all data functions should therefore only
+        # depend on this data store, and never on the abstract model itself.
+        # The concrete instance keeps its own reference to these functions.
         self.abstract_model.baseline_emissions = self.data_store.data_object("baseline")
         self.abstract_model.population = self.abstract_model.L = (
             self.data_store.data_object("population")
@@ -46,6 +59,14 @@ class InstantiatedModel:
         )
         self.abstract_model.TFP = self.data_store.data_object("TFP")
 
+        baseline_cumulative = self.data_store.cumulative_data_object("baseline")
+        self.abstract_model.baseline_cumulative = baseline_cumulative
+        self.abstract_model.baseline_cumulative_global = (
+            lambda m, year_start, year_end: sum(
+                baseline_cumulative(year_start, year_end, r) for r in m.regions
+            )
+        )
+
     def create_instance(self):
         return self.abstract_model.create_instance(self.instance_data)
 
@@ -103,6 +124,10 @@ class InstantiatedModel:
 
         parameter_mapping = {}
 
+        # Keep track of which parameter belongs to which key in `params`,
+        # such that mutable parameters can be changed later on
+        self.param_keys = {}
+
         # Attempt to set parameter values automatically from their doc value
         for parameter in self.abstract_model.component_objects(Param):
             # First check if the parameter is callable: in this case,
@@ -118,12 +143,9 @@ class InstantiatedModel:
             ### Normal parameter, get directly from parameter dictionary
             if parameter_doc_str.startswith("::"):
                 keys = parameter_doc_str.split("::")[1].split(".")
-                value = get_nested(params, keys)
-                # Check type of parameter
-                parser = get_nested(self.param_parser_tree, keys)
-                if parser.type == "quantity":
-                    value = quant(value, parser.unit)
+                value = get_param_value(params, self.param_parser_tree, keys)
                 parameter_mapping[parameter.name] = V(value)
+                self.param_keys[parameter.name] = keys
 
             ### Regional parameter, get from regional parameter store
             if parameter_doc_str.startswith("regional::"):
@@ -0,0 +1,665 @@
+"""
+Reduced-space optimisation of the relative abatement
+
+In cost-benefit runs without a carbon budget, the only decision variable of the model is the
+relative abatement of every region and time step: all other variables (capital stock, emissions,
+temperature, sea level rise, damages, GDP, welfare, NPV) follow from it. Instead of sending the
+full model with all its equality constraints to IPOPT, `optimise_abatement` optimises the NPV
+directly as a function of the relative abatement:
+
+- the NPV is calculated with the forward simulation (`simulation_mode.forward.simulate`),
+- its gradient is calculated with the adjoint of the time steps of the forward simulation,
+- the relative abatement is optimised with SciPy's L-BFGS-B.
+
+The derivatives of the equations within one time step (w.r.t. the capital stock, cumulative
+emissions, sea level rise and relative abatement) are calculated with the complex step method
+on `step_values`, such that the equations of the components are not copied.
+
+L-BFGS-B only handles bounds. The regional emission constraints (inertia, minimum emission
+level and non-increasing emissions after 2100) only depend on the emissions of the previous
+time step, so they are bounds on the relative abatement once the previous time step is known.
+The optimisation variables are therefore the positions of the relative abatement between these
+bounds (see `AbatementPath`), which makes every path within the bounds of L-BFGS-B feasible.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from mimosa.common import logger
+from mimosa.components import sealevelrise
+from mimosa.concrete_model.simulation_mode.forward import (
+    SUPPORTED_MODULES,
+    model_values,
+    simulate,
+    step_values,
+    welfare,
+    yearly_value,
+    set_variable_values,
+)
+
+# Size of the imaginary step of the complex step derivatives
+COMPLEX_STEP = 1e-30
+
+# Time dependent data used in `step_values`, with shape (time steps, regions) or (time steps,)
+TIME_DEPENDENT_REGIONAL = [
+    "TFP",
+    "L",
+    "baseline_emissions",
+    "carbon_intensity",
+    "financial_transfer",
+]
+TIME_DEPENDENT_GLOBAL = ["LOT_factor", "baseline_cumulative_global"]
+
+# Relative abatement at which the curvature of the objective is estimated, see `_abatement_scale`
+REFERENCE_ABATEMENT = 0.5
+
+# Scaled objective value returned when the simulation fails
+UNDEFINED_OBJECTIVE = 1e10
+
+# Regional values of a time step on which the yearly value of the objective depends
+VALUE_INPUTS = {
+    "utility": ["GDP_net"],
+    "globalcosts": ["mitigation_costs", "damage_costs", "GDP_gross"],
+}
+
+
+def optimise_abatement(
+    m,
+    params,
+    data_store,
+    initial_abatement=None,
+    tolerance=1e-7,
+    constraint_tolerance=1e-6,
+    max_iterations=2000,
+    max_inner_iterations=50,
+) -> SimpleNamespace:
+    """Optimises the relative abatement of `m` and sets the values of all variables of `m`
+    to the optimal solution.
+
+    Args:
+        m (ConcreteModel): the concrete model (not in simulation mode)
+        params (dict): the (parsed) parameters of the model
+        data_store (DataStore): data store of the model, for the baseline data
+        initial_abatement (np.ndarray, optional): relative abatement to start from, shape
+            (time steps, regions). Defaults to the current values of `relative_abatement`.
+        tolerance (float, optional): tolerance of L-BFGS-B on the projected gradient of the
+            scaled objective. Defaults to 1e-7.
+        constraint_tolerance (float, optional): maximum violation of the emission constraints,
+            relative to the baseline emissions of the first year. Only relevant when the
+            baseline emissions depend on GDP (see `AbatementPath`). Defaults to 1e-6.
+        max_iterations (int, optional): maximum total number of L-BFGS-B iterations.
+            Defaults to 2000.
+        max_inner_iterations (int, optional): number of L-BFGS-B iterations after which
+            the bounds of the relative abatement (see `AbatementPath`) and the scaling of
+            the controls are updated to the current solution. Defaults to 50.
+
+    Returns:
+        SimpleNamespace: with attributes `success`, `message` (of the last L-BFGS-B run),
+            `iterations` (L-BFGS-B), `outer_iterations` (L-BFGS-B runs), `evaluations`,
+            `NPV` and `max_violation`
+
+    Raises:
+        NotImplementedError: raised if a module, effort sharing regime, simulation mode,
+            carbon budget, temperature target or global inertia is used
+    """
+    from scipy import optimize
+
+    check_reduced_space(params)
+    modules = params["model"]
+
+    v = model_values(m, data_store)
+    num_time_steps, num_regions = len(v.years), len(v.regions)
+    if initial_abatement is None:
+        initial_abatement = np.array(
+            [m.relative_abatement[t, r].value or 0.0 for t in m.t for r in m.regions]
+        ).reshape(num_time_steps, num_regions)
+    bounds = [m.relative_abatement[t, r].bounds for t in m.t for r in m.regions]
+    bounds = np.array(bounds, dtype=float).reshape(num_time_steps, num_regions, 2)
+    relative_abatement = np.clip(initial_abatement, bounds[..., 0], bounds[..., 1])
+    sign = -1.0 if modules["objective module"] == "utility" else 1.0  # Maximise utility
+
+    # Scale the objective such that the largest initial derivative is 1,
+    # and the relative abatement with the curvature of the objective
+    simulate(v, modules, relative_abatement=relative_abatement)
+    objective_scale = max(np.abs(adjoint_gradient(v, modules, 1.0)).max(), 1e-12)
+    abatement_scale = _abatement_scale(v, modules, objective_scale)
+
+    # The relative abatement of the first time step has no influence on the NPV:
+    # only the controls of the other time steps are optimised
+    carbonprice_upper = [m.carbonprice[t, r].ub for t in m.t for r in m.regions]
+    carbonprice_upper = np.array(carbonprice_upper, dtype=float).reshape(
+        num_time_steps, num_regions
+    )
+    path = AbatementPath(v, bounds, carbonprice_upper)
+    controls = np.zeros((num_time_steps, num_regions))
+
+    def evaluate(x, factor):
+        controls[1:] = x.reshape(factor.shape) / factor
+        relative_abatement[1:] = path.abatement(controls)[1:]
+        simulate(v, modules, relative_abatement=relative_abatement)
+        if not np.isfinite(v.NPV[-1]):
+            # Outside the domain of the model equations (e.g. negative capital stock):
+            # a large value makes the line search of L-BFGS-B take a smaller step
+            return UNDEFINED_OBJECTIVE, np.zeros(x.shape)
+        gradient = adjoint_gradient(v, modules, sign / objective_scale)
+        return (
+            sign * v.NPV[-1] / objective_scale,
+            (path.gradient(gradient)[1:] / factor).ravel(),
+        )
+
+    result = SimpleNamespace(iterations=0, evaluations=0, outer_iterations=0)
+    converged = False
+    while not converged and result.iterations < max_iterations:
+        # Bounds with the baseline emissions and learning factor of the current solution
+        simulate(v, modules, relative_abatement=relative_abatement)
+        path.update(v)
+        controls[:] = path.controls(relative_abatement)
+        relative_abatement[1:] = path.abatement(controls)[1:]
+
+        # Scale the controls with the width of the bounds of the relative abatement.
+        # The widths change with the solution: restarting L-BFGS-B with updated widths
+        # converges much faster than a single run with the initial widths.
+        factor = np.where(path.width > 0, path.width / abatement_scale, 1.0)[1:]
+        solution = optimize.minimize(
+            evaluate,
+            (controls[1:] * factor).ravel(),
+            args=(factor,),
+            jac=True,
+            method="L-BFGS-B",
+            bounds=np.column_stack([np.zeros(factor.size), factor.ravel()]),
+            options={
+                "maxiter": min(
+                    max_inner_iterations, max_iterations - result.iterations
+                ),
+                "gtol": tolerance,
+                "ftol": 1e-13,
+                "maxcor": 20,
+            },
+        )
+        controls[1:] = solution.x.reshape(factor.shape) / factor
+        relative_abatement[1:] = path.abatement(controls)[1:]
+        result.iterations += solution.nit
+        result.evaluations += solution.nfev
+        result.outer_iterations += 1
+        result.message = solution.message
+
+        simulate(v, modules, relative_abatement=relative_abatement)
+        max_violation = path.max_violation(v)
+        converged = (
+            solution.success
+            and solution.nit < max_inner_iterations
+            and max_violation <= constraint_tolerance
+        )
+        if solution.nit == 0:
+            break  # No progress
+
+    set_variable_values(m, v)
+
+    result.NPV = v.NPV[-1]
+    result.max_violation = max_violation
+    result.success = converged
+    if not result.success:
+        logger.warning(
+            f"Reduced-space optimisation did not converge: {result.message}, "
+            f"max. violation of the emission constraints {max_violation:.2e}"
+        )
+    return result
+
+
+def check_reduced_space(params) -> None:
+    """Checks if the model defined by `params` can be optimised in reduced space"""
+    for module, supported in SUPPORTED_MODULES.items():
+        if params["model"][module] not in supported:
+            raise NotImplementedError(
+                f"Reduced-space optimisation is not implemented for {module} "
+                f"`{params['model'][module]}`, choose from {supported}"
+            )
+    if params["effort sharing"]["regime"] != "noregime":
+        raise NotImplementedError(
+            "Reduced-space optimisation is not implemented for effort sharing regimes"
+        )
+    if params["simulation"]["simulationmode"]:
+        raise NotImplementedError(
+            "Reduced-space optimisation is not available in simulation mode, "
+            "use `MIMOSA.simulate` instead"
+        )
+    if params["emissions"]["carbonbudget"] is not False:
+        raise NotImplementedError(
+            "Reduced-space optimisation is not implemented for runs with a carbon budget"
+        )
+    if params["temperature"]["target"] is not False:
+        raise NotImplementedError(
+            "Reduced-space optimisation is not implemented for runs with a temperature target"
+        )
+    if params["emissions"]["inertia"]["global"] is not False:
+        raise NotImplementedError(
+            "Reduced-space optimisation is not implemented for global inertia"
+        )
+
+
+def adjoint_gradient(v, modules, npv_weight, emissions_gradient=None) -> np.ndarray:
+    """Gradient of `npv_weight * NPV + sum(emissions_gradient * regional_emissions)`
+    w.r.t. the relative abatement, for the simulated values in `v` (see `simulate`).
+
+    Every time step t > 0 solves the equations F_t(z_t) = 0 for the state
+    z_t = (capital stock, cumulative emissions), with the total SLR calculated from the
+    previous time step. Going backwards in time, the adjoint of a time step is the solution
+    of a linear system with the Jacobian of F_t w.r.t. z_t. Since the capital stock of a
+    region only influences the investments and emissions of that region, this Jacobian
+    is diagonal except for the row and column of the cumulative emissions, and the linear
+    system is solved directly.
+
+    Args:
+        v (SimpleNamespace): the simulated values, as calculated by `simulate`
+        modules (dict): the module choices (`params["model"]`)
+        npv_weight (float): weight of the NPV of the last time step
+        emissions_gradient (np.ndarray, optional): shape (time steps, regions). Defaults to 0.
+
+    Returns:
+        np.ndarray: shape (time steps, regions). The first time step has no influence.
+    """
+    num_time_steps, num_regions = len(v.years), len(v.regions)
+    if emissions_gradient is None:
+        emissions_gradient = np.zeros((num_time_steps, num_regions))
+    dt = v.dt
+    capital_factor = 2 - (1 - v.dk) ** dt  # K[t] * capital_factor = K[t-1] + dt * I[t]
+    emissions_factor = 0.5 if v.cumulative_emissions_trapz else 1.0
+    value_weight = npv_weight * dt * np.exp(-v.PRTP * (v.years - v.beginyear))
+
+    d_investments, d_emissions, d_value = _step_derivatives(v, modules)
+    slr_jacobian = _slr_derivatives(v)
+
+    gradient = np.zeros((num_time_steps, num_regions))
+    # Adjoint variables of the next time step, and sensitivities of the objective to
+    # the current state through the next time steps
+    adjoint_capital = np.zeros(num_regions)
+    adjoint_cumulative = 0.0
+    slr_sensitivity = np.zeros(3)
+    cumulative_sensitivity = 0.0
+    for t in range(num_time_steps - 1, 0, -1):
+        emissions_weight = emissions_gradient[t]
+        if v.cumulative_emissions_trapz:
+            emissions_weight = (
+                emissions_weight + emissions_factor * dt * adjoint_cumulative
+            )
+
+        # Sensitivities of the objective to the state of this time step, ignoring F_t
+        rhs_capital = (
+            adjoint_capital / capital_factor
+            + d_emissions["capital"][t] * emissions_weight
+            + value_weight[t] * d_value["capital"][t]
+        )
+        rhs_cumulative = (
+            adjoint_cumulative
+            + cumulative_sensitivity
+            + d_emissions["cumulative"][t] @ emissions_weight
+            + value_weight[t] * d_value["cumulative"][t]
+        )
+
+        # Adjoint: solve J^T @ adjoint = rhs, with the Jacobian of F_t w.r.t. z_t
+        #   J = [[diag(capital_diag), capital_cumulative], [cumulative_capital, cumulative_cumulative]]
+        capital_diag = 1 - dt / capital_factor * d_investments["capital"][t]
+        capital_cumulative = -dt / capital_factor * d_investments["cumulative"][t]
+        cumulative_capital = -dt * emissions_factor * d_emissions["capital"][t]
+        cumulative_cumulative = 1 - dt * emissions_factor * np.sum(
+            d_emissions["cumulative"][t]
+        )
+        adjoint_cumulative = (
+            rhs_cumulative - capital_cumulative @ (rhs_capital / capital_diag)
+        ) / (
+            cumulative_cumulative
+            - capital_cumulative @ (cumulative_capital / capital_diag)
+        )
+        adjoint_capital = (
+            rhs_capital - cumulative_capital * adjoint_cumulative
+        ) / capital_diag
+
+        # Sensitivities to the relative abatement and the total SLR of this time step
+        gradient[t] = (
+            d_emissions["relative_abatement"][t] * emissions_weight
+            + value_weight[t] * d_value["relative_abatement"][t]
+            + dt
+            / capital_factor
+            * d_investments["relative_abatement"][t]
+            * adjoint_capital
+            + dt
+            * emissions_factor
+            * d_emissions["relative_abatement"][t]
+            * adjoint_cumulative
+        )
+        slr_sensitivity = slr_sensitivity + (
+            d_emissions["total_SLR"][t] @ emissions_weight
+            + value_weight[t] * d_value["total_SLR"][t]
+            + dt / capital_factor * d_investments["total_SLR"][t] @ adjoint_capital
+            + dt
+            * emissions_factor
+            * np.sum(d_emissions["total_SLR"][t])
+            * adjoint_cumulative
+        )
+
+        # Sea level rise of this time step follows from the previous time step
+        cumulative_sensitivity = v.TCRE * slr_jacobian[t - 1, 3] @ slr_sensitivity
+        slr_sensitivity = slr_jacobian[t - 1, :3] @ slr_sensitivity
+
+    return gradient
+
+
+def _step_derivatives(v, modules):
+    """Derivatives of the investments, regional emissions and yearly value of every time step
+    w.r.t. the capital stock and relative abatement (per region), cumulative emissions and
+    total SLR of that time step. Uses the complex step method on `step_values`, with one
+    batch row per time step and direction.
+
+    The investments and emissions of a region only depend on the capital stock and relative
+    abatement of that region, so all regions are perturbed at once. The yearly value depends
+    on all regions: its derivatives follow from the derivatives of its inputs
+    (`VALUE_INPUTS`) and the derivatives of the yearly value w.r.t. these inputs.
+
+    Returns:
+        tuple of dict: derivatives of the investments, regional emissions and yearly value,
+            with as keys the directions ("capital", "relative_abatement", "cumulative" and
+            "total_SLR") and as values arrays of shape (time steps, regions), or (time steps,)
+            for the yearly value w.r.t. cumulative emissions and total SLR. For "capital" and
+            "relative_abatement", element [t, r] is the derivative w.r.t. region r.
+            The values for the first time step are zero.
+    """
+    num_time_steps, num_regions = len(v.years), len(v.regions)
+    directions = ["capital", "relative_abatement", "cumulative", "total_SLR"]
+    num_directions = len(directions)
+
+    # Batch rows: all directions of time step 1, then of time step 2, etc.
+    time_steps = np.repeat(np.arange(1, num_time_steps), num_directions)
+    step = 1j * COMPLEX_STEP * np.tile(np.eye(num_directions), (num_time_steps - 1, 1))
+    values = step_values(
+        _select_time_steps(v, time_steps),
+        ...,
+        v.capital_stock[time_steps] + step[:, 0:1],
+        v.cumulative_emissions[time_steps, None] + step[:, 2:3],
+        v.total_SLR[time_steps, None] + step[:, 3:4],
+        modules["damage module"],
+        relative_abatement=v.relative_abatement[time_steps] + step[:, 1:2],
+    )
+
+    def derivatives(values):
+        # Shape (time steps, directions, ...), with zeros for the first time step
+        values = values.imag.reshape(
+            (num_time_steps - 1, num_directions) + values.shape[1:]
+        )
+        values = np.concatenate([np.zeros((1,) + values.shape[1:]), values])
+        return dict(zip(directions, np.moveaxis(values / COMPLEX_STEP, 1, 0)))
+
+    # Derivatives of the yearly value w.r.t. its regional inputs, of shape (time steps - 1, regions)
+    inputs = {
+        name: getattr(values, name).real[::num_directions]
+        for name in VALUE_INPUTS[modules["objective module"]]
+    }
+    d_value = {
+        direction: np.zeros(num_time_steps if i >= 2 else (num_time_steps, num_regions))
+        for i, direction in enumerate(directions)
+    }
+    for name in inputs:
+        # Perturb every region separately: shape (time steps - 1, regions, regions)
+        perturbed = {key: value[:, None, :] for key, value in inputs.items()}
+        perturbed[name] = perturbed[name] + 1j * COMPLEX_STEP * np.eye(num_regions)
+        d_value_d_input = (
+            _yearly_value(v, modules, SimpleNamespace(**perturbed)).imag / COMPLEX_STEP
+        )
+        d_input = derivatives(getattr(values, name))
+        for i, direction in enumerate(directions):
+            contribution = d_value_d_input * d_input[direction][1:]
+            d_value[direction][1:] += (
+                contribution if i < 2 else contribution.sum(axis=-1)
+            )
+
+    return (
+        derivatives(values.investments),
+        derivatives(values.regional_emissions),
+        d_value,
+    )
+
+
+def _yearly_value(v, modules, values):
+    """Yearly value of the objective from the values of `VALUE_INPUTS`, of shape (time steps - 1, ..., regions)"""
+    if modules["objective module"] == "utility":
+        consumption = (1 - v.sr) * values.GDP_net
+        population = v.L[1:, None, :]
+        _, values.yearly_welfare = welfare(
+            v, modules["welfare module"], consumption, population
+        )
+    return yearly_value(values, modules["objective module"])
+
+
+def _abatement_scale(v, modules, objective_scale) -> np.ndarray:
+    """Scaling of the relative abatement for L-BFGS-B, of shape (time steps, regions).
+
+    The curvature of the objective w.r.t. the relative abatement varies by orders of magnitude
+    between time steps (discounting) and regions (size). It is dominated by the mitigation
+    costs, which are proportional to a^(beta + 1) for relative abatement a. At a = REFERENCE_ABATEMENT,
+    the second derivative is therefore about beta / a times the first derivative of the yearly
+    value. The relative abatement is divided by the square root of this estimate.
+    """
+    num_time_steps, num_regions = len(v.years), len(v.regions)
+    reference = np.full((num_time_steps, num_regions), REFERENCE_ABATEMENT)
+    simulate(v, modules, relative_abatement=reference)
+    _, _, d_value = _step_derivatives(v, modules)
+    value_weight = v.dt * np.exp(-v.PRTP * (v.years - v.beginyear)) / objective_scale
+    curvature = (
+        v.MAC_beta
+        / REFERENCE_ABATEMENT
+        * np.abs(d_value["relative_abatement"])
+        * value_weight[:, None]
+    )
+    scale = np.ones((num_time_steps, num_regions))
+    scale[curvature > 0] = 1 / np.sqrt(curvature[curvature > 0])
+    return scale
+
+
+def _select_time_steps(v, time_steps) -> SimpleNamespace:
+    """Copy of `v` in which the time dependent data only contains the rows of `time_steps`,
+    such that `step_values` can evaluate several time steps at once (with `t=...`)"""
+    v_rows = SimpleNamespace(**vars(v))
+    for name in TIME_DEPENDENT_REGIONAL:
+        setattr(v_rows, name, getattr(v, name)[time_steps])
+    for name in TIME_DEPENDENT_GLOBAL:
+        setattr(v_rows, name, getattr(v, name)[time_steps, None])
+    return v_rows
+
+
+def _slr_derivatives(v) -> np.ndarray:
+    """Derivatives of the sea level rise components (thermal, GSIC, GIS) of time step t + 1
+    w.r.t. those of time step t (directions 0-2) and the temperature of time step t
+    (direction 3). Returns an array of shape (time steps - 1, directions, components).
+    """
+    step = 1j * COMPLEX_STEP * np.eye(4)
+    slr_thermal = v.slr_thermal[:-1, None] + step[0]
+    slr_cumgsic = v.slr_cumgsic[:-1, None] + step[1]
+    slr_cumgis = v.slr_cumgis[:-1, None] + step[2]
+    temperature = v.temperature[:-1, None] + step[3]
+    next_values = [
+        sealevelrise.slr_thermal_expansion(slr_thermal, temperature, v),
+        sealevelrise.slr_gsic(slr_cumgsic, temperature, v),
+        sealevelrise.slr_gis(slr_cumgis, temperature, v),
+    ]
+    return np.stack(next_values, axis=-1).imag / COMPLEX_STEP
+
+
+class AbatementPath:
+    """Relative abatement paths which satisfy the regional emission constraints.
+
+    Given the emissions E[t-1] of the previous time step and the baseline emissions B[t],
+    the constraints on the emissions E[t] = (1 - a[t]) * B[t] are bounds on the relative
+    abatement a[t]:
+
+    - inertia: E[t] >= E[t-1] + dt * inertia * B[first year]
+    - minimum emission level: E[t] >= regional min level
+    - non-increasing emissions: E[t] <= E[t-1], if year[t-1] > 2100
+
+    together with the bounds of the `relative_abatement` variable and the upper bound of
+    the carbon price (through the MAC). The controls u in [0, 1] give
+    a[t] = lower[t] + u[t] * (upper[t] - lower[t]), one time step after the other.
+
+    The baseline emissions B and the learning factor of the MAC are those of the last call to
+    `update`: when they depend on the relative abatement (baseline carbon intensity, learning
+    by doing), the constraints are only satisfied exactly after they have converged. When the
+    bounds conflict, the emission constraints are not satisfied. The global minimum emission
+    level is only checked (in `max_violation`).
+
+    Args:
+        v (SimpleNamespace): parameter values and data, as returned by `model_values`
+        abatement_bounds (np.ndarray): bounds of the relative abatement, shape (time steps, regions, 2)
+        carbonprice_upper (np.ndarray): upper bound of the carbon price, shape (time steps, regions)
+    """
+
+    def __init__(self, v, abatement_bounds, carbonprice_upper):
+        self.abatement_bounds = abatement_bounds
+        self.variable_bounds = abatement_bounds.copy()
+        self.carbonprice_upper = carbonprice_upper
+        self.update(v)
+        self.first_year_emissions = v.baseline_emissions[0]
+        self.inertia = (
+            None
+            if v.inertia_regional is False
+            else v.dt * v.inertia_regional * self.first_year_emissions
+        )
+        self.min_level = None if v.regional_min_level is False else v.regional_min_level
+        self.global_min_level = (
+            None if v.global_min_level is False else v.global_min_level
+        )
+        self.non_increasing = np.zeros(len(v.years), dtype=bool)
+        if v.non_increasing_emissions_after_2100:
+            self.non_increasing[1:] = v.years[:-1] > 2100
+
+        # Values of the last call to `abatement`, used in `gradient`
+        shape = abatement_bounds.shape[:2]
+        self.controls_used = np.zeros(shape)
+        self.width = np.zeros(shape)
+        self.lower_derivative = np.zeros(shape)
+        self.upper_derivative = np.zeros(shape)
+
+    def update(self, v) -> None:
+        """Uses the baseline emissions and the learning factor of the simulation in `v`"""
+        self.baseline = v.baseline.copy()
+        mac_factor = v.learning_factor[:, None] * v.MAC_scaling_factor * v.MAC_gamma
+        self.variable_bounds[..., 1] = np.minimum(
+            self.abatement_bounds[..., 1],
+            (self.carbonprice_upper / mac_factor) ** (1 / v.MAC_beta),
+        )
+
+    def abatement(self, controls) -> np.ndarray:
+        """Relative abatement for the controls (from time step 1), shape (time steps, regions)"""
+        abatement = np.zeros(controls.shape)
+        self.controls_used = controls.copy()
+        emissions = self.first_year_emissions
+        for t in range(1, len(controls)):
+            lower, upper = self._bounds(t, emissions)
+            abatement[t] = lower + controls[t] * self.width[t]
+            emissions = (1 - abatement[t]) * self.baseline[t]
+        return abatement
+
+    def controls(self, abatement) -> np.ndarray:
+        """Controls which give the relative abatement closest to `abatement`"""
+        controls = np.zeros(abatement.shape)
+        emissions = self.first_year_emissions
+        for t in range(1, len(abatement)):
+            lower, upper = self._bounds(t, emissions)
+            width = self.width[t]
+            controls[t] = np.clip(
+                (abatement[t] - lower) / np.where(width > 0, width, 1.0), 0.0, 1.0
+            )
+            emissions = (1 - lower - controls[t] * width) * self.baseline[t]
+        return controls
+
+    def gradient(self, abatement_gradient) -> np.ndarray:
+        """Gradient w.r.t. the controls of the last call to `abatement`, from the gradient
+        w.r.t. the relative abatement"""
+        controls = self.controls_used
+        gradient = np.zeros(abatement_gradient.shape)
+        previous = np.zeros(abatement_gradient.shape[1])
+        for t in range(len(gradient) - 1, 0, -1):
+            total = abatement_gradient[t] + previous
+            gradient[t] = total * self.width[t]
+            # Derivative of a[t] w.r.t. a[t-1]
+            previous = total * np.where(
+                self.width[t] > 0,
+                (1 - controls[t]) * self.lower_derivative[t]
+                + controls[t] * self.upper_derivative[t],
+                self.lower_derivative[t],
+            )
+        return gradient
+
+    def _bounds(self, t, previous_emissions):
+        """Lower and upper bound of the relative abatement of time step t, given the
+        emissions of the previous time step. Also stores the width of the bounds and
+        the derivatives of the bounds w.r.t. the relative abatement of the previous time step.
+        """
+        baseline = self.baseline[t]
+        lower = self.variable_bounds[t, :, 0]
+        upper = self.variable_bounds[t, :, 1]
+        # Derivative of a bound 1 - (E[t-1] + c) / B[t] w.r.t. a[t-1]
+        derivative = self.baseline[t - 1] / baseline if t > 1 else 0.0
+        self.lower_derivative[t] = 0.0
+        self.upper_derivative[t] = 0.0
+
+        if self.inertia is not None:
+            inertia_upper = 1 - (previous_emissions + self.inertia) / baseline
+            self.upper_derivative[t] = np.where(inertia_upper < upper, derivative, 0.0)
+            upper = np.minimum(upper, inertia_upper)
+        if self.min_level is not None:
+            min_level_upper = 1 - self.min_level / baseline
+            self.upper_derivative[t] = np.where(
+                min_level_upper < upper, 0.0, self.upper_derivative[t]
+            )
+            upper = np.minimum(upper, min_level_upper)
+        if self.non_increasing[t]:
+            non_increasing_lower = 1 - previous_emissions / baseline
+            self.lower_derivative[t] = np.where(
+                non_increasing_lower > lower, derivative, 0.0
+            )
+            lower = np.maximum(lower, non_increasing_lower)
+
+        # Conflicting bounds (for example non-increasing emissions which would require more
+        # than the maximum relative abatement): the bounds of the variable have priority over
+        # the emission constraints, and the upper bound over the lower bound
+        below = upper < self.variable_bounds[t, :, 0]
+        upper = np.where(below, self.variable_bounds[t, :, 0], upper)
+        self.upper_derivative[t] = np.where(below, 0.0, self.upper_derivative[t])
+        above = lower > upper
+        lower = np.where(above, upper, lower)
+        self.lower_derivative[t] = np.where(
+            above, self.upper_derivative[t], self.lower_derivative[t]
+        )
+
+        self.width[t] = upper - lower
+        return lower, upper
+
+    def max_violation(self, v) -> float:
+        """Largest violation of the emission constraints in the simulation `v`, relative to the
+        (regional or global) baseline emissions of the first year, and of the upper bound of
+        the carbon price, relative to this bound"""
+        regional_emissions = v.regional_emissions
+        regional_scale = np.abs(self.first_year_emissions)
+        emissions, previous = regional_emissions[1:], regional_emissions[:-1]
+        violations = [
+            np.max((v.carbonprice - self.carbonprice_upper) / self.carbonprice_upper)
+        ]
+        if self.inertia is not None:
+            violations.append(
+                np.max((previous + self.inertia - emissions) / regional_scale)
+            )
+        if self.min_level is not None:
+            violations.append(np.max((self.min_level - emissions) / regional_scale))
+        if self.non_increasing.any():
+            after_2100 = self.non_increasing[1:]
+            violations.append(
+                np.max(
+                    (emissions[after_2100] - previous[after_2100]) / regional_scale,
+                    initial=0.0,
+                )
+            )
+        if self.global_min_level is not None:
+            violations.append(
+                np.max(self.global_min_level - emissions.sum(axis=1))
+                / abs(self.first_year_emissions.sum())
+            )
+        return max(0.0, *violations)
@@ -1 +1,2 @@
 from .main import set_simulation_mode
+from .forward import forward_simulation
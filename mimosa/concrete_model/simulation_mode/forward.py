@@ -0,0 +1,522 @@
+"""
+Forward simulation of a model in which the policy is imposed
+
+When the relative abatement (or the carbon price) of every region is imposed in simulation
+mode, the model has no degrees of freedom left: all other variables follow from the model
+equations, one time step after the other. Instead of sending this square system to IPOPT,
+`forward_simulation` evaluates the equations recursively in NumPy, for all regions at once.
+
+The equations are not copied: the helper functions of the components (`calc_GDP`, `MAC`,
+`slr_thermal_expansion`, `damage_fct`, `calc_utility`, ...) are called with a namespace of
+NumPy values instead of the Pyomo model (see `model_values`). Within a time step, the capital
+stock, GDP, baseline emissions (when the baseline carbon intensity is used) and cumulative
+emissions depend on each other. These are iterated until they no longer change.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from mimosa.common import Param, Var, value, soft_min, economics, logger
+from mimosa.components import sealevelrise
+from mimosa.components.damages import coacch
+from mimosa.components.mitigation import MAC, AC
+from mimosa.components.welfare.utility_fct import calc_utility
+from mimosa.components.welfare.inequal_aversion_general import (
+    calc_regional_utility,
+    calc_global_utility,
+)
+from .set_constraints import get_fixed_paths
+
+# Module choices for which all equations are implemented in `simulate`
+SUPPORTED_MODULES = {
+    "damage module": ["COACCH", "nodamage"],
+    "emissiontrade module": ["notrade"],
+    "financialtransfer module": ["notransfer"],
+    "welfare module": [
+        "welfare_loss_minimising",
+        "cost_minimising",
+        "inequal_aversion_general",
+    ],
+    "objective module": ["utility", "globalcosts"],
+}
+
+# Variables that can be imposed (exactly one of them)
+POLICY_VARIABLES = ["relative_abatement", "carbonprice"]
+
+REGIONAL_VARIABLES = [
+    "regional_emissions",
+    "baseline",
+    "relative_abatement",
+    "regional_emission_reduction",
+    "damage_costs",
+    "damage_costs_non_slr",
+    "damage_costs_slr",
+    "mitigation_costs",
+    "rel_mitigation_costs",
+    "carbonprice",
+    "capital_stock",
+    "GDP_gross",
+    "GDP_net",
+    "investments",
+    "consumption",
+    "utility",
+]
+GLOBAL_VARIABLES = [
+    "cumulative_emissions",
+    "global_emissions",
+    "emission_relative_cumulative",
+    "temperature",
+    "slr_thermal",
+    "slr_cumgsic",
+    "slr_cumgis",
+    "total_SLR",
+    "global_rel_mitigation_costs",
+    "LBD_factor",
+    "LOT_factor",
+    "learning_factor",
+    "yearly_welfare",
+    "NPV",
+]
+
+# Index to select all regions at once in the helper functions of the components
+ALL_REGIONS = slice(None)
+
+
+def forward_simulation(m, params, data_store, tolerance=1e-10, max_iterations=50):
+    """Sets the values of all variables of `m` by simulating the model forward in time
+    from the imposed policy, without calling a solver.
+
+    Args:
+        m (ConcreteModel): the concrete model in simulation mode
+        params (dict): the (parsed) parameters of the model
+        data_store (DataStore): data store of the model, for the baseline data
+        tolerance (float, optional): relative tolerance of the iterations within a time step.
+            Defaults to 1e-10.
+        max_iterations (int, optional): maximum number of iterations per time step.
+            Defaults to 50.
+
+    Raises:
+        NotImplementedError: raised if a module or effort sharing regime is not supported
+        ValueError: raised if not exactly one of the `POLICY_VARIABLES` is imposed
+    """
+    policy_variable = check_forward_simulation(params)
+    fixed_path = get_fixed_paths(m, params)[policy_variable]
+    policy = np.array([fixed_path[t, r] for t in m.t for r in m.regions])
+
+    v = model_values(m, data_store)
+    simulate(
+        v,
+        params["model"],
+        **{policy_variable: policy.reshape(len(m.t), len(m.regions))},
+        tolerance=tolerance,
+        max_iterations=max_iterations,
+    )
+    set_variable_values(m, v)
+
+
+def check_forward_simulation(params) -> str:
+    """Checks if the model defined by `params` can be simulated forward in time,
+    and returns the name of the imposed policy variable"""
+    for module, supported in SUPPORTED_MODULES.items():
+        if params["model"][module] not in supported:
+            raise NotImplementedError(
+                f"Forward simulation is not implemented for {module} "
+                f"`{params['model'][module]}`, choose from {supported}"
+            )
+    if params["effort sharing"]["regime"] != "noregime":
+        raise NotImplementedError(
+            "Forward simulation is not implemented for effort sharing regimes"
+        )
+
+    imposed = list(params["simulation"]["constraint_variables"].keys())
+    if not params["simulation"]["simulationmode"] or len(imposed) != 1:
+        raise ValueError(
+            f"Forward simulation requires simulation mode with exactly one of {POLICY_VARIABLES} "
+            f"as constraint variable, got {imposed}"
+        )
+    if imposed[0] not in POLICY_VARIABLES:
+        raise ValueError(
+            f"Forward simulation cannot impose `{imposed[0]}`, choose from {POLICY_VARIABLES}"
+        )
+    return imposed[0]
+
+
+def model_values(m, data_store) -> SimpleNamespace:
+    """Returns the parameter values and data of `m` as a namespace which can be used
+    instead of `m` in the helper functions of the components.
+
+    Scalar parameters are numbers, regional parameters are arrays indexed by region
+    number (lists if they are not numeric) and the data (TFP, L, GDP, baseline_emissions,
+    carbon_intensity) are arrays of shape (time steps, regions).
+    """
+    regions = list(m.regions)
+    years = np.array([m.year(t) for t in m.t], dtype=float)
+    v = SimpleNamespace(regions=regions, years=years)
+
+    for param in m.component_objects(Param):
+        setattr(v, param.local_name, _param_values(param, len(years), len(regions)))
+
+    v.TFP = data_store.data_values("TFP", years, regions)
+    v.L = data_store.data_values("population", years, regions)
+    v.GDP = data_store.data_values("GDP", years, regions)
+    v.baseline_emissions = data_store.data_values("baseline", years, regions)
+    v.carbon_intensity = data_store.data_values("carbon_intensity", years, regions)
+    v.baseline_cumulative_global = np.asarray(
+        m.baseline_cumulative_global(m, years[0], years), dtype=float
+    )
+    return v
+
+
+def _param_values(param, num_time_steps, num_regions):
+    if not param.is_indexed():
+        return value(param, exception=False)
+    values = param.extract_values()
+    items = [values.get(index) for index in param.index_set()]
+    try:
+        array = np.array(items, dtype=float)
+    except (TypeError, ValueError):
+        return items
+    if param.index_set().dimen == 2:
+        return array.reshape(num_time_steps, num_regions)
+    return array
+
+
+def simulate(
+    v,
+    modules,
+    relative_abatement=None,
+    carbonprice=None,
+    tolerance=1e-10,
+    max_iterations=50,
+) -> None:
+    """Calculates all variables from the imposed relative abatement or carbon price.
+    The values are stored in `v` as arrays of shape (time steps, regions) or (time steps,),
+    with the names of the model variables.
+
+    Args:
+        v (SimpleNamespace): parameter values and data, as returned by `model_values`
+        modules (dict): the module choices (`params["model"]`)
+        relative_abatement (np.ndarray, optional): imposed relative abatement, shape (time steps, regions)
+        carbonprice (np.ndarray, optional): imposed carbon price, shape (time steps, regions).
+            Only used if no relative abatement is given.
+        tolerance (float, optional): see `forward_simulation`
+        max_iterations (int, optional): see `forward_simulation`
+    """
+    num_time_steps, num_regions = len(v.years), len(v.regions)
+    for name in REGIONAL_VARIABLES:
+        setattr(v, name, np.full((num_time_steps, num_regions), np.nan))
+    for name in GLOBAL_VARIABLES:
+        setattr(v, name, np.full(num_time_steps, np.nan))
+
+    impose_carbonprice = relative_abatement is None
+    if impose_carbonprice:
+        v.carbonprice[:] = carbonprice
+    else:
+        v.relative_abatement[:] = relative_abatement
+
+    v.LOT_factor[:] = 1 / (1 + v.LOT_rate) ** np.arange(num_time_steps)
+    if modules["damage module"] == "COACCH":
+        v.damage_groups = {
+            is_slr: coacch.damage_groups(v, is_slr) for is_slr in [False, True]
+        }
+
+    for t in range(num_time_steps):
+        # Sea level rise only depends on the temperature of the previous time step
+        if t == 0:
+            v.slr_thermal[0] = sealevelrise.slr_thermal_expansion_init(v)
+            v.slr_cumgsic[0] = sealevelrise.SLR_GSIC_INIT
+            v.slr_cumgis[0] = sealevelrise.SLR_GIS_INIT
+        else:
+            v.slr_thermal[t] = sealevelrise.slr_thermal_expansion(
+                v.slr_thermal[t - 1], v.temperature[t - 1], v
+            )
+            v.slr_cumgsic[t] = sealevelrise.slr_gsic(
+                v.slr_cumgsic[t - 1], v.temperature[t - 1], v
+            )
+            v.slr_cumgis[t] = sealevelrise.slr_gis(
+                v.slr_cumgis[t - 1], v.temperature[t - 1], v
+            )
+        v.total_SLR[t] = v.slr_thermal[t] + v.slr_cumgsic[t] + v.slr_cumgis[t]
+
+        if t == 0:
+            _time_step(
+                v,
+                0,
+                v.init_capitalstock_factor * v.GDP[0],
+                0.0,
+                modules,
+                impose_carbonprice,
+            )
+            continue
+
+        # First guess: same growth as in the previous time step
+        capital_stock = v.capital_stock[t - 1]
+        if t > 1:
+            capital_stock = capital_stock * capital_stock / v.capital_stock[t - 2]
+        cumulative_emissions = (
+            v.cumulative_emissions[t - 1] + v.dt * v.global_emissions[t - 1]
+        )
+        for _ in range(max_iterations):
+            new_capital_stock, new_cumulative_emissions = _time_step(
+                v, t, capital_stock, cumulative_emissions, modules, impose_carbonprice
+            )
+            change_capital_stock = np.max(
+                np.abs(new_capital_stock - capital_stock) / np.abs(capital_stock)
+            )
+            change_cumulative_emissions = abs(
+                new_cumulative_emissions - cumulative_emissions
+            ) / max(abs(cumulative_emissions), 1.0)
+            converged = (
+                max(change_capital_stock, change_cumulative_emissions) < tolerance
+            )
+            capital_stock = _newton_step(v, t, capital_stock, new_capital_stock)
+            cumulative_emissions = new_cumulative_emissions
+            if converged:
+                break
+        else:
+            logger.warning(
+                f"Forward simulation did not converge in year {v.years[t]:g}"
+            )
+
+    _economics(v, modules)
+
+
+def _time_step(v, t, capital_stock, cumulative_emissions, modules, impose_carbonprice):
+    """Evaluates the equations of time step `t` for the given capital stock and cumulative
+    emissions. Returns the capital stock and cumulative emissions that follow from them.
+    """
+    dt = v.dt
+    v.capital_stock[t] = capital_stock
+    v.cumulative_emissions[t] = cumulative_emissions
+    policy = (
+        {"carbonprice": v.carbonprice[t]}
+        if impose_carbonprice
+        else {"relative_abatement": v.relative_abatement[t]}
+    )
+    values = step_values(
+        v,
+        t,
+        capital_stock,
+        cumulative_emissions,
+        v.total_SLR[t],
+        modules["damage module"],
+        **policy,
+    )
+    for name, step_value in vars(values).items():
+        getattr(v, name)[t] = step_value
+
+    # Emissions
+    v.global_emissions[t] = v.regional_emissions[t].sum()
+    if t == 0:
+        return capital_stock, cumulative_emissions
+
+    if v.cumulative_emissions_trapz:
+        emissions = (v.global_emissions[t] + v.global_emissions[t - 1]) / 2
+    else:
+        emissions = v.global_emissions[t]
+    new_cumulative_emissions = v.cumulative_emissions[t - 1] + dt * emissions
+
+    # The capital stock equation
+    #   K[t] = K[t-1] + dt * calc_dKdt(K[t], dk, I[t], dt)
+    # is linear in K[t]
+    new_capital_stock = (v.capital_stock[t - 1] + dt * v.investments[t]) / (
+        2 - (1 - v.dk) ** dt
+    )
+    return new_capital_stock, new_cumulative_emissions
+
+
+def step_values(
+    v,
+    t,
+    capital_stock,
+    cumulative_emissions,
+    total_slr,
+    damage_module,
+    relative_abatement=None,
+    carbonprice=None,
+) -> SimpleNamespace:
+    """Evaluates the equations of time step `t` which only depend on the state of that
+    time step: temperature, damages, learning, mitigation costs, GDP, investments and
+    regional emissions. Returns the values in a namespace with the names of the variables.
+
+    The arguments can have leading batch dimensions, e.g. capital stock and relative
+    abatement of shape (..., regions) and cumulative emissions and total SLR of shape (..., 1).
+
+    Args:
+        v (SimpleNamespace): parameter values and data, as returned by `model_values`
+        t (int): the time step
+        capital_stock (np.ndarray): per region
+        cumulative_emissions (float or np.ndarray)
+        total_slr (float or np.ndarray)
+        damage_module (str): "COACCH" or "nodamage"
+        relative_abatement (np.ndarray, optional): per region
+        carbonprice (np.ndarray, optional): per region, only used if no relative abatement is given
+    """
+    values = SimpleNamespace()
+
+    # Temperature and damages
+    values.temperature = v.T0 + v.TCRE * cumulative_emissions
+    _damages(v, values, total_slr, damage_module)
+
+    # Learning and mitigation costs
+    values.LBD_factor = (
+        soft_min(
+            (v.baseline_cumulative_global[t] - cumulative_emissions) / v.LBD_scaling
+            + 1.0
+        )
+        ** v.log_LBD_rate
+    )
+    values.learning_factor = values.LBD_factor * v.LOT_factor[t]
+    # MAC and AC only need the learning factor of time step t
+    learning = SimpleNamespace(
+        learning_factor={t: values.learning_factor},
+        MAC_scaling_factor=v.MAC_scaling_factor,
+        MAC_gamma=v.MAC_gamma,
+        MAC_beta=v.MAC_beta,
+    )
+    if relative_abatement is None:
+        # Inverse of the MAC. The interpolated carbon price can be slightly negative
+        relative_abatement = (
+            np.maximum(carbonprice, 0.0)
+            / (values.learning_factor * v.MAC_scaling_factor * v.MAC_gamma)
+        ) ** (1 / v.MAC_beta)
+        values.carbonprice = carbonprice
+    else:
+        values.carbonprice = MAC(relative_abatement, learning, t, ALL_REGIONS)
+    values.relative_abatement = relative_abatement
+    abatement_costs = AC(relative_abatement, learning, t, ALL_REGIONS)
+
+    # GDP and baseline emissions
+    if t == 0:
+        values.GDP_gross = v.GDP[0]
+    else:
+        values.GDP_gross = economics.calc_GDP(
+            v.TFP[t], v.L[t], soft_min(capital_stock, scale=10), v.alpha
+        )
+    damage_costs = 0.0 if v.ignore_damages else values.damage_costs
+    if v.baseline_carbon_intensity:
+        # The mitigation costs depend on the baseline emissions, which in turn
+        # depend on the net GDP: GDP_net = GDP_gross * (1 - damages) - AC * intensity * GDP_net
+        values.GDP_net = (
+            values.GDP_gross * (1 - damage_costs) - v.financial_transfer[t]
+        ) / (1 + abatement_costs * v.carbon_intensity[t])
+        values.baseline = v.carbon_intensity[t] * values.GDP_net
+    else:
+        values.baseline = v.baseline_emissions[t]
+        values.GDP_net = (
+            values.GDP_gross * (1 - damage_costs)
+            - abatement_costs * values.baseline
+            - v.financial_transfer[t]
+        )
+    values.mitigation_costs = abatement_costs * values.baseline
+    values.investments = v.sr * values.GDP_net
+
+    # Regional emissions
+    if t == 0:
+        values.regional_emissions = v.baseline_emissions[0]
+    else:
+        values.regional_emissions = (1 - relative_abatement) * (
+            values.baseline if v.baseline_carbon_intensity else v.baseline_emissions[t]
+        )
+    return values
+
+
+def _newton_step(v, t, capital_stock, new_capital_stock):
+    """Next estimate of the capital stock. Since the investments are roughly proportional
+    to K^alpha, the derivative of the new capital stock w.r.t. the capital stock is about
+    alpha * dt * I / (K * (2 - (1 - dk)^dt)), which gives a Newton step on K = f(K)."""
+    derivative = (
+        v.alpha * v.dt * v.investments[t] / (capital_stock * (2 - (1 - v.dk) ** v.dt))
+    )
+    return capital_stock + (new_capital_stock - capital_stock) / (1 - derivative)
+
+
+def _damages(v, values, total_slr, damage_module):
+    shape = np.broadcast_shapes(np.shape(values.temperature), (len(v.regions),))
+    if damage_module == "nodamage":
+        values.damage_costs = np.zeros(shape)
+        return
+
+    # COACCH: the damages are calculated for all regions with the same functional form at once
+    dtype = np.result_type(values.temperature, total_slr, float)
+    for is_slr, name in [(False, "damage_costs_non_slr"), (True, "damage_costs_slr")]:
+        x, x0 = (
+            (total_slr, v.total_SLR[0])
+            if is_slr
+            else (values.temperature - 0.6, v.T0 - 0.6)
+        )
+        damages = np.zeros(shape, dtype=dtype)
+        for regions, group in v.damage_groups[is_slr]:
+            damages[..., regions] = v.damage_scale_factor * coacch.damage_fct(
+                x, x0, group, 0, is_slr
+            )
+        setattr(values, name, damages)
+    values.damage_costs = values.damage_costs_non_slr + values.damage_costs_slr
+
+
+def _economics(v, modules):
+    """Variables which follow from the simulated time steps: consumption,
+    utility, welfare, NPV and the relative and global indicators"""
+    v.consumption[:] = (1 - v.sr) * v.GDP_net
+    v.rel_mitigation_costs[:] = v.mitigation_costs / v.GDP_gross
+    v.regional_emission_reduction[:] = v.baseline - v.regional_emissions
+
+    global_mitigation_costs = v.mitigation_costs.sum(axis=1)
+    v.global_rel_mitigation_costs[:] = global_mitigation_costs / v.GDP_gross.sum(axis=1)
+    v.emission_relative_cumulative[0] = 1
+    v.emission_relative_cumulative[1:] = (
+        v.cumulative_emissions[1:] / v.baseline_cumulative_global[1:]
+    )
+
+    # Utility, welfare and objective
+    v.utility[:], v.yearly_welfare[:] = welfare(
+        v, modules["welfare module"], v.consumption, v.L
+    )
+    discount = np.exp(-v.PRTP * (v.years - v.beginyear))
+    v.NPV[0] = 0
+    v.NPV[1:] = np.cumsum(
+        v.dt * discount[1:] * yearly_value(v, modules["objective module"])[1:]
+    )
+
+
+def welfare(v, welfare_module, consumption, population):
+    """Returns the utility per region and the yearly welfare, for consumption and
+    population of shape (..., regions)"""
+    global_population = population.sum(axis=-1)
+    if welfare_module == "welfare_loss_minimising":
+        utility = calc_utility(consumption, population, v.elasmu)
+        yearly_welfare = (population * utility).sum(axis=-1)
+    elif welfare_module == "cost_minimising":
+        utility = consumption / population
+        yearly_welfare = global_population * calc_utility(
+            consumption.sum(axis=-1), global_population, v.elasmu
+        )
+    else:
+        utility = calc_regional_utility(consumption, population, v.inequal_aversion)
+        yearly_welfare = global_population * calc_global_utility(
+            utility.sum(axis=-1), global_population, v.elasmu, v.inequal_aversion
+        )
+    return utility, yearly_welfare
+
+
+def yearly_value(values, objective_module):
+    """Returns the yearly value of which the discounted sum is the NPV (the objective)"""
+    if objective_module == "utility":
+        return values.yearly_welfare
+    return values.mitigation_costs.sum(axis=-1) + (
+        values.damage_costs * values.GDP_gross
+    ).sum(axis=-1)
+
+
+def set_variable_values(m, v) -> None:
+    """Copies the simulated values in `v` to the variables of `m`. Values which are not
+    determined by the simulation (NaN) are left unchanged."""
+    for var in m.component_objects(Var):
+        values = getattr(v, var.local_name, None)
+        if not isinstance(values, np.ndarray) or values.size != len(var):
+            continue
+        # Indices (t, r) or t, in the same order as the arrays of shape (time steps, regions)
+        for var_data, var_value in zip(var.values(), values.ravel().tolist()):
+            if var_value == var_value:  # Not NaN
+                var_data.set_value(var_value, skip_validation=True)
@@ -1,9 +1,15 @@
 """
 Add constraints for each fixed variable
+
+The imposed path of every variable is evaluated once for the whole time grid. It is then
+imposed either through two inequality constraints per time step (and region), through
+the bounds of the variable, or by fixing the variable (`params["simulation"]["fixing_method"]`).
 """
 
+import numpy as np
 import pandas as pd
 from mimosa.common import (
+    Var,
     RegionalConstraint,
     GlobalConstraint,
     is_regional,
@@ -13,18 +19,44 @@ from .utils import InterpolatingData, read_csv
 
 
 def set_constraints_fixed_variables(m, params):
-    data_cache = {}
     extra_constraints = []
+    eps = 1e-3  # TODO make eps a variable
+    fixing_method = params["simulation"]["fixing_method"]
+
+    for variable_name, fixed_path in get_fixed_paths(m, params).items():
+        if (
+            fixing_method != "constraints"
+            and getattr(m, variable_name).ctype is not Var
+        ):
+            raise ValueError(
+                f"`{variable_name}` is an expression in the compact formulation, "
+                "it can only be imposed with fixing_method `constraints`"
+            )
+        if fixing_method == "bounds":
+            _set_bounds(getattr(m, variable_name), fixed_path, eps)
+        elif fixing_method == "fix":
+            _fix_values(getattr(m, variable_name), fixed_path)
+        else:
+            extra_constraints.extend(
+                _fixed_data_constraint(m, variable_name, fixed_path, eps)
+            )
+
+    # Add constraints to concrete model
+    for constraint in extra_constraints:
+        add_constraint(m, constraint.to_pyomo_constraint(m), constraint.name)
+
 
+def get_fixed_paths(m, params) -> dict:
+    """Returns the imposed path of every variable in `params["simulation"]["constraint_variables"]`,
+    as dictionary of variable name -> {index: imposed value} (see `_fixed_path`)"""
+    data_cache = {}
+    fixed_paths = {}
     for variable_name, filepath_or_data in params["simulation"][
         "constraint_variables"
     ].items():
         interp_data = _get_interp_data(filepath_or_data, data_cache, variable_name)
-        extra_constraints.extend(_fixed_data_constraint(m, variable_name, interp_data))
-
-    # Add constraints to concrete model
-    for constraint in extra_constraints:
-        add_constraint(m, constraint.to_pyomo_constraint(m), constraint.name)
+        fixed_paths[variable_name] = _fixed_path(m, variable_name, interp_data)
+    return fixed_paths
 
 
 def _get_interp_data(filepath_or_data, data_cache, variable_name):
@@ -49,18 +81,58 @@ def _get_interp_data(filepath_or_data, data_cache, variable_name):
     return interp_data
 
 
-def _fixed_data_constraint(m, variable_name, interp_data):
-    # 3. Create constraints out of this
-    eps = 1e-3  # TODO make eps a variable
+def _fixed_path(m, variable_name, interp_data):
+    """Evaluates the imposed values for all time steps at once. Returns a dictionary
+    with as keys the indices of the variable ((t, r) or t) and as values the imposed values
+    """
+    time_steps = list(m.t)
+    years = np.array([m.year(t) for t in time_steps], dtype=float)
+
+    if is_regional(getattr(m, variable_name)):
+        fixed_path = {}
+        for r in m.regions:
+            values = np.atleast_1d(interp_data.get(r, years))
+            fixed_path.update(
+                {(t, r): float(value) for t, value in zip(time_steps, values)}
+            )
+        return fixed_path
+
+    values = np.atleast_1d(interp_data.get("Global", years))
+    return {t: float(value) for t, value in zip(time_steps, values)}
 
+
+def _fixed_data_constraint(m, variable_name, fixed_path, eps):
+    # 3. Create constraints out of this
     if is_regional(getattr(m, variable_name)):
-        extra_constraints = _extra_regional_constraint(variable_name, interp_data, eps)
+        extra_constraints = _extra_regional_constraint(variable_name, fixed_path, eps)
     else:
-        extra_constraints = _extra_global_constraint(variable_name, interp_data, eps)
+        extra_constraints = _extra_global_constraint(variable_name, fixed_path, eps)
 
     return extra_constraints
 
 
+def _set_bounds(var, fixed_path, eps):
+    """Bounds the variable to the imposed values plus or minus `eps`, within
+    the bounds it already had"""
+    for index, fixed_value in fixed_path.items():
+        var_data = var[index]
+        lower, upper = fixed_value - eps, fixed_value + eps
+        if var_data.lb is not None:
+            lower = max(lower, var_data.lb)
+        if var_data.ub is not None:
+            upper = min(upper, var_data.ub)
+        var_data.setlb(lower)
+        var_data.setub(upper)
+
+
+def _fix_values(var, fixed_path):
+    """Fixes the variable to the imposed values. Fixed variables are not sent to the
+    solver, and are propagated through equality constraints in the pre-processing step
+    """
+    for index, fixed_value in fixed_path.items():
+        var[index].fix(fixed_value, skip_validation=True)
+
+
 ###########
 #
 # Make regional or global constraints
@@ -68,18 +140,16 @@ def _fixed_data_constraint(m, variable_name, interp_data):
 ############
 
 
-def _extra_regional_constraint(variable_name, interp_data, eps):
+def _extra_regional_constraint(variable_name, fixed_path, eps):
     return [
         RegionalConstraint(
-            lambda m, t, r: getattr(m, variable_name)[t, r]
-            - interp_data.get(r, m.year(t))
+            lambda m, t, r: getattr(m, variable_name)[t, r] - fixed_path[t, r]
             <= eps
             # if m.year(t) <= interp_data.maxyear
             # else Constraint.Skip
         ),
         RegionalConstraint(
-            lambda m, t, r: getattr(m, variable_name)[t, r]
-            - interp_data.get(r, m.year(t))
+            lambda m, t, r: getattr(m, variable_name)[t, r] - fixed_path[t, r]
             >= -eps
             # if m.year(t) <= interp_data.maxyear
             # else Constraint.Skip
@@ -87,18 +157,16 @@ def _extra_regional_constraint(variable_name, interp_data, eps):
     ]
 
 
-def _extra_global_constraint(variable_name, interp_data: InterpolatingData, eps):
+def _extra_global_constraint(variable_name, fixed_path, eps):
     return [
         GlobalConstraint(
-            lambda m, t: getattr(m, variable_name)[t]
-            - interp_data.get("Global", m.year(t))
+            lambda m, t: getattr(m, variable_name)[t] - fixed_path[t]
             <= eps
             # if t > 0  # and m.year(t) <= interp_data.maxyear
             # else Constraint.Skip
         ),
         GlobalConstraint(
-            lambda m, t: getattr(m, variable_name)[t]
-            - interp_data.get("Global", m.year(t))
+            lambda m, t: getattr(m, variable_name)[t] - fixed_path[t]
             >= -eps
             # if t > 0  # and m.year(t) <= interp_data.maxyear
             # else Constraint.Skip
@@ -2,17 +2,17 @@
 Utils
 """
 
-
 from glob import glob
 
 import numpy as np
 from mimosa.common.data.utils import extrapolate
 import pandas as pd
-from scipy.interpolate import InterpolatedUnivariateSpline
 from mimosa.common import logger
 
 
-def read_csv(path):
+def resolve_path(path):
+    """Returns the file matching `path`, which can be a pattern with `*`.
+    If the pattern matches multiple files, the first one is used."""
     if "*" in path:
         paths = glob(path)
         if len(paths) != 1:
@@ -21,8 +21,12 @@ def read_csv(path):
                     len(paths), path
                 )
             )
-        path = glob(path)[0]
-    return pd.read_csv(path)
+        path = paths[0]
+    return path
+
+
+def read_csv(path):
+    return pd.read_csv(resolve_path(path))
 
 
 class InterpolatingData:
@@ -40,6 +44,9 @@ class InterpolatingData:
 
     @staticmethod
     def interp(row):
+        # scipy is only imported when needed, as it is slow to import
+        from scipy.interpolate import InterpolatedUnivariateSpline
+
         values = row.values
         years = row.index.astype(float).to_numpy()
         extra_years = np.arange(years[-1] + 5, 2151, 5)
@@ -2,5 +2,14 @@
 Imports all `export` modules (plotting functions and functions to save output to CSV)
 """
 
-from .utils import visualise_ipopt_output
-from .save import save_output
+from .utils import visualise_ipopt_output, get_ipopt_iterations
+from .save import (
+    save_output,
+    write_output,
+    output_dataframe,
+    params_hash,
+    register_output_format,
+    OUTPUT_FORMATS,
+)
+from .store import ResultsStore
+from .cache import ResultsCache
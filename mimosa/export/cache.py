@@ -0,0 +1,106 @@
+"""
+Cache of solved runs, such that a run with exactly the same inputs is not solved again.
+
+The key of a run is a hash of its parameters, of the contents of the input database (and of
+the CSV files imposed in simulation mode) and of the MIMOSA version. Every entry is a separate file in the cache folder containing the
+variable values, the output DataFrame and the solver status. Entries are only added
+after a successful solve, so a sweep which was interrupted can simply be started again:
+the scenarios that were already solved are taken from the cache.
+
+Usage:
+
+    # Only creates and solves the model if the run is not in the cache yet
+    model = MIMOSA(params, results_cache="output/.cache")
+    model.solve()
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+from mimosa import __version__
+from mimosa.common import logger
+from mimosa.common.data import DataStore
+from mimosa.concrete_model.simulation_mode.utils import resolve_path
+
+
+class ResultsCache:
+    """Content-addressed cache of solved runs in `folder`.
+
+    Args:
+        folder (str): the cache folder, created if it doesn't exist yet
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    @staticmethod
+    def key(params: dict) -> str:
+        """Returns the cache key of a run with (parsed) parameters `params`"""
+        file_hashes = [file_hash(DataStore.database_filename(params))]
+        simulation = params.get("simulation")
+        if simulation is not None and simulation["simulationmode"]:
+            # The imposed paths can be read from CSV files, whose contents can change
+            for filepath_or_data in simulation["constraint_variables"].values():
+                if isinstance(filepath_or_data, str):
+                    file_hashes.append(file_hash(resolve_path(filepath_or_data)))
+        content = json.dumps([params, file_hashes, __version__])
+        return hashlib.md5(content.encode()).hexdigest()
+
+    def get(self, key: str):
+        """Returns the entry stored under `key`, or None if there is none.
+
+        Returns:
+            dict or None: with keys "variable_values" (as returned by `MIMOSA.get_variable_values`),
+                "output" (as returned by `output_dataframe`), "status", "termination_condition"
+                and "iterations"
+        """
+        filename = self._filename(key)
+        if not os.path.exists(filename):
+            return None
+        try:
+            with open(filename, "rb") as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError) as exc:
+            logger.warning(f"Could not read cached results {filename}: {exc}")
+            return None
+
+    def put(self, key: str, entry: dict) -> None:
+        """Stores `entry` under `key`, see `get`"""
+        filename = self._filename(key)
+        # Write to a temporary file first, such that other processes never read a partial file
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_filename, "wb") as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_filename, filename)
+        except OSError as exc:
+            logger.warning(f"Could not write cached results {filename}: {exc}")
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._filename(key))
+
+    def _filename(self, key):
+        return os.path.join(self.folder, f"{key}.pkl")
+
+
+# File hashes by (filename, size, modification time), see `file_hash`
+_file_hashes = {}
+
+
+def file_hash(filename: str) -> str:
+    """Returns the MD5 hash of the contents of a file. The hash is only calculated
+    again when the size or modification time of the file changes."""
+    stat = os.stat(filename)
+    file_key = (os.path.abspath(filename), stat.st_size, stat.st_mtime_ns)
+    if file_key not in _file_hashes:
+        md5 = hashlib.md5()
+        with open(filename, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                md5.update(block)
+        _file_hashes[file_key] = md5.hexdigest()
+    return _file_hashes[file_key]
@@ -1,6 +1,11 @@
 """
-Generates a CSV file with a row for each variable (`Var`)
-in the ConcreteModel `m`.
+Generates an output file with a row for each variable (`Var`)
+in the ConcreteModel `m`, and for each reporting variable (see `ReportingVariable`),
+which is calculated from the values of the solved model.
+
+The values of each variable are read at once into a NumPy array, and the output is
+written by one of the writers in `OUTPUT_FORMATS` (CSV by default). Other formats can
+be added with `register_output_format`.
 """
 
 import json
@@ -9,44 +14,113 @@ import hashlib
 import numpy as np
 import pandas as pd
 
-from mimosa.common import get_all_variables, value
-
+from mimosa.common import (
+    Expression,
+    get_all_variables,
+    get_reporting_variables,
+    get_reporting_values,
+    value,
+)
+
+
+def save_output(
+    params,
+    m,
+    experiment=None,
+    hash_suffix=False,
+    folder="output",
+    output_format="csv",
+):
+    """Saves the values of all variables of `m` and the parameters used.
+
+    Args:
+        params (dict): the parameters, saved as JSON next to the output file
+        m (ConcreteModel): the (solved) concrete model
+        experiment (str, optional): filename without extension. Defaults to None.
+        hash_suffix (bool, optional): adds a hash of the parameters to the filename. Defaults to False.
+        folder (str, optional): output folder. Defaults to "output".
+        output_format (str, optional): any of the keys of `OUTPUT_FORMATS`: "csv", "csv.gz",
+            "parquet" or "feather". The last two require the `pyarrow` package. Defaults to "csv".
+
+    Returns:
+        str: filename of the output file
+    """
+    return write_output(
+        params, output_dataframe(m), experiment, hash_suffix, folder, output_format
+    )
+
+
+def write_output(
+    params,
+    dataframe,
+    experiment=None,
+    hash_suffix=False,
+    folder="output",
+    output_format="csv",
+):
+    """Writes an output DataFrame, as returned by `output_dataframe`, and the parameters
+    used. See `save_output` for the arguments."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output format `{output_format}`, "
+            f"choose from {list(OUTPUT_FORMATS.keys())}"
+        )
+    extension, writer = OUTPUT_FORMATS[output_format]
 
-def save_output(params, m, experiment=None, hash_suffix=False, folder="output"):
     # 1. Create a unique identifier
-    if hash_suffix:
-        settings_hash = hashlib.md5(json.dumps(params).encode()).hexdigest()[:9]
-    else:
-        settings_hash = ""
+    settings_hash = params_hash(params) if hash_suffix else ""
+
+    # 2. Save the output file
+    os.makedirs(folder + "/", exist_ok=True)
+    filename = f"{experiment}_{settings_hash}" if hash_suffix else experiment
+    output_filename = f"{folder}/{filename}.{extension}"
+    writer(dataframe, output_filename)
+
+    # 3. Save the param file
+    with open(f"{output_filename}.params.json", "w") as fh:
+        json.dump(params, fh)
 
-    # 2. Save the Pyomo variables and data functions
+    return output_filename
+
+
+def params_hash(params, full: bool = False) -> str:
+    """Returns a hash of the parameters, which identifies a run. By default, only the
+    first 9 characters are returned (as used in filenames), with `full=True` the full MD5 digest.
+    """
+    digest = hashlib.md5(json.dumps(params).encode()).hexdigest()
+    return digest if full else digest[:9]
+
+
+def output_dataframe(m) -> pd.DataFrame:
+    """Returns the values of all variables and reporting variables of `m` (and of the data
+    functions) as DataFrame with columns Variable, Region, Unit and one column per year
+    """
     all_variables = get_all_variables(m)
 
     all_functions = [
         [[m.population, "population"], "billion people"]
     ]  # TODO: unit of population should be automatically detected
 
-    rows = []
+    labels = []
+    blocks = []
     for useful_var in all_variables:
-        var_to_row(rows, m, useful_var.var, useful_var.is_regional, useful_var.unit)
+        var_to_block(
+            labels, blocks, m, useful_var.var, useful_var.is_regional, useful_var.unit
+        )
+    for reporting_var, values in zip(
+        get_reporting_variables(m), get_reporting_values(m).values()
+    ):
+        regions = list(m.regions) if reporting_var.is_regional else ["Global"]
+        labels.extend([reporting_var.name, r, reporting_var.unit] for r in regions)
+        blocks.append(values.reshape(len(m.t), len(regions)).T)
     for var, unit in all_functions:
-        var_to_row(rows, m, var, True, unit)
-    dataframe = rows_to_dataframe(rows, m)
+        var_to_block(labels, blocks, m, var, True, unit)
+    return blocks_to_dataframe(labels, blocks, m)
 
-    # add_param_columns(df, params, id, experiment)
 
-    # 3. Save the CSV file
-    os.makedirs(folder + "/", exist_ok=True)
-    filename = f"{experiment}_{settings_hash}" if hash_suffix else experiment
-
-    dataframe.to_csv(f"{folder}/{filename}.csv", float_format="%.6g", index=False)
-
-    # 3. Save the param file
-    with open(f"{folder}/{filename}.csv.params.json", "w") as fh:
-        json.dump(params, fh)
-
-
-def var_to_row(rows, m, var, is_regional, unit):
+def var_to_block(labels, blocks, m, var, is_regional, unit):
+    """Appends the values of `var` as array of shape (number of rows, number of years)
+    to `blocks`, and the Variable, Region and Unit of each row to `labels`"""
     # If var is a list, second element is the name
     if isinstance(var, list):
         name = var[1]
@@ -54,20 +128,78 @@ def var_to_row(rows, m, var, is_regional, unit):
     else:
         name = var.name
 
-    # Check if var is a function or a pyomo variable
-    if is_regional:
-        fct = lambda t, r: (var(m.year(t), r) if callable(var) else value(var[t, r]))
-        for r in m.regions:
-            rows.append([name, r, unit] + [fct(t, r) for t in m.t])
+    regions = list(m.regions) if is_regional else ["Global"]
+    num_years = len(m.t)
+
+    if callable(var):
+        # Data functions of type f(year, region)
+        years = [m.year(t) for t in m.t]
+        values = np.array([[var(year, r) for year in years] for r in regions])
+    elif len(var) == num_years * len(regions):
+        # Pyomo variables are indexed by (t, r) or t: reading the values in
+        # the order of the index gives an array of shape (years, regions)
+        if var.ctype is Expression:
+            # Variables replaced by an Expression in the compact formulation
+            var_values = (value(data, exception=False) for data in var.values())
+        else:
+            var_values = (var_data.value for var_data in var.values())
+        values = np.fromiter(
+            (np.nan if var_value is None else var_value for var_value in var_values),
+            dtype=float,
+            count=len(var),
+        )
+        values = values.reshape(num_years, len(regions)).T
+    elif is_regional:
+        values = np.array([[value(var[t, r]) for t in m.t] for r in m.regions])
     else:
-        fct = lambda t: (var(m.year(t)) if callable(var) else value(var[t]))
-        rows.append([name, "Global", unit] + [fct(t) for t in m.t])
+        values = np.array([[value(var[t]) for t in m.t]])
 
+    labels.extend([name, r, unit] for r in regions)
+    blocks.append(values)
 
-def rows_to_dataframe(rows, m):
+
+def blocks_to_dataframe(labels, blocks, m):
     years = ["{:g}".format(year) for year in m.year(np.array(m.t))]
-    columns = ["Variable", "Region", "Unit"] + years
-    return pd.DataFrame(rows, columns=columns)
+    dataframe = pd.DataFrame(np.vstack(blocks), columns=years)
+    dataframe.insert(0, "Variable", [label[0] for label in labels])
+    dataframe.insert(1, "Region", [label[1] for label in labels])
+    dataframe.insert(2, "Unit", [label[2] for label in labels])
+    return dataframe
+
+
+####### Output formats
+
+
+def write_csv(dataframe, filename):
+    dataframe.to_csv(filename, float_format="%.6g", index=False)
+
+
+def write_parquet(dataframe, filename):
+    dataframe.to_parquet(filename, index=False)
+
+
+def write_feather(dataframe, filename):
+    dataframe.to_feather(filename)
+
+
+# Output format name: (file extension, writer function of type f(dataframe, filename))
+OUTPUT_FORMATS = {
+    "csv": ("csv", write_csv),
+    "csv.gz": ("csv.gz", write_csv),  # Pandas compresses based on the extension
+    "parquet": ("parquet", write_parquet),
+    "feather": ("feather", write_feather),
+}
+
+
+def register_output_format(name, extension, writer):
+    """Adds an output format which can be used in `save_output`.
+
+    Args:
+        name (str): name of the format (the `output_format` argument of `save_output`)
+        extension (str): file extension, without the leading dot
+        writer (Callable[[pd.DataFrame, str], None]): function writing the DataFrame to the given filename
+    """
+    OUTPUT_FORMATS[name] = (extension, writer)
 
 
 # def add_param_columns(dataframe, params, exp_id, experiment):
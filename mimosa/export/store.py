@@ -0,0 +1,220 @@
+"""
+Stores the output of many runs in a single SQLite file, instead of one output file
+and one parameter file per run.
+
+Every run is identified by the (full MD5) hash of its parameters (see `params_hash`). Runs can
+only be added, not changed: adding a run with the same parameters again is skipped with a warning. The values
+of every output row are stored as one binary array, such that selected variables can be
+loaded for many runs at once without reading the other variables.
+
+Usage:
+
+    store = ResultsStore("output/sweep.sqlite")
+    store.add(params, output_dataframe(m), experiment="run1")
+
+    store.scenarios()  # Hash, experiment and time of every run
+    store.load(["temperature", "global_emissions"], experiments=["run1"])
+    store.params(run_hash)
+"""
+
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from mimosa.common import logger
+from .save import output_dataframe, params_hash
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    hash TEXT PRIMARY KEY,
+    experiment TEXT,
+    created REAL,
+    years TEXT,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    hash TEXT,
+    variable TEXT,
+    region TEXT,
+    unit TEXT,
+    rownumber INTEGER,
+    "values" BLOB
+);
+CREATE INDEX IF NOT EXISTS results_variable ON results (variable, hash);
+CREATE INDEX IF NOT EXISTS results_hash ON results (hash);
+"""
+
+
+class ResultsStore:
+    """Append-only store of the output of many runs in one SQLite file.
+
+    Args:
+        filename (str): the SQLite file, created if it doesn't exist yet
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        folder = os.path.dirname(filename)
+        if folder != "":
+            os.makedirs(folder, exist_ok=True)
+        with self._connection() as connection:
+            connection.executescript(_SCHEMA)
+
+    def add(self, params: dict, dataframe: pd.DataFrame, experiment=None) -> str:
+        """Adds the output of a run. If a run with the same parameters is already stored,
+        it is kept and a warning is logged.
+
+        Args:
+            params (dict): the parameters of the run
+            dataframe (pd.DataFrame): the output, as returned by `output_dataframe`
+            experiment (str, optional): name of the run. Defaults to None.
+
+        Returns:
+            str: the hash of the parameters, which identifies the run in the store
+        """
+        run_hash = params_hash(params, full=True)
+        years = list(dataframe.columns[3:])
+        values = dataframe[years].to_numpy(dtype=float)
+        rows = [
+            (run_hash, variable, region, unit, i, values[i].tobytes())
+            for i, (variable, region, unit) in enumerate(
+                zip(dataframe["Variable"], dataframe["Region"], dataframe["Unit"])
+            )
+        ]
+        with self._connection() as connection:
+            inserted = connection.execute(
+                "INSERT OR IGNORE INTO scenarios VALUES (?, ?, ?, ?, ?)",
+                (
+                    run_hash,
+                    experiment,
+                    time.time(),
+                    json.dumps(years),
+                    json.dumps(params),
+                ),
+            ).rowcount
+            if inserted > 0:
+                connection.executemany(
+                    "INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+        if inserted == 0:
+            logger.warning(
+                f"Run {experiment} not added to {self.filename}: a run with the same "
+                f"parameters is already stored under hash {run_hash}"
+            )
+        return run_hash
+
+    def add_model(self, params: dict, m, experiment=None) -> str:
+        """Adds the output of the (solved) concrete model `m`, see `add`"""
+        return self.add(params, output_dataframe(m), experiment)
+
+    def __contains__(self, run_hash: str) -> bool:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM scenarios WHERE hash = ?", (run_hash,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+
+    def scenarios(self) -> pd.DataFrame:
+        """Returns the hash, experiment name and creation time of every stored run"""
+        with self._connection() as connection:
+            return pd.read_sql_query(
+                "SELECT hash AS Hash, experiment AS Experiment, created AS Created "
+                "FROM scenarios ORDER BY created",
+                connection,
+            )
+
+    def params(self, run_hash: str) -> dict:
+        """Returns the parameters of the run `run_hash`"""
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT params FROM scenarios WHERE hash = ?", (run_hash,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Run `{run_hash}` is not in results store {self.filename}")
+        return json.loads(row[0])
+
+    def load(
+        self, variables=None, regions=None, hashes=None, experiments=None
+    ) -> pd.DataFrame:
+        """Loads the output of the selected runs into one DataFrame. Only the selected
+        variables are read from the store.
+
+        Args:
+            variables (list, optional): names of the variables. Defaults to all variables.
+            regions (list, optional): the regions (including "Global"). Defaults to all regions.
+            hashes (list, optional): the hashes of the runs. Defaults to all runs.
+            experiments (list, optional): names of the runs. Defaults to all runs.
+
+        Returns:
+            pd.DataFrame: columns Hash, Experiment, Variable, Region, Unit and one column
+                per year. Years which are not part of a run have no value.
+        """
+        conditions = []
+        arguments = []
+        for column, selection in [
+            ("results.variable", variables),
+            ("results.region", regions),
+            ("results.hash", hashes),
+            ("scenarios.experiment", experiments),
+        ]:
+            if selection is not None:
+                selection = list(selection)
+                conditions.append(f"{column} IN ({', '.join('?' * len(selection))})")
+                arguments.extend(selection)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connection() as connection:
+            rows = connection.execute(
+                "SELECT results.hash, scenarios.experiment, scenarios.years, "
+                'results.variable, results.region, results.unit, results."values" '
+                "FROM results JOIN scenarios ON results.hash = scenarios.hash "
+                f"{where} ORDER BY scenarios.created, results.rownumber",
+                arguments,
+            ).fetchall()
+
+        # Rows of the same run have the same years, so create one DataFrame per run
+        dataframes = []
+        for run_hash, run_rows in _group_by_run(rows):
+            years = json.loads(run_rows[0][2])
+            dataframe = pd.DataFrame(
+                np.vstack([np.frombuffer(row[6], dtype=float) for row in run_rows]),
+                columns=years,
+            )
+            dataframe.insert(0, "Hash", run_hash)
+            dataframe.insert(1, "Experiment", run_rows[0][1])
+            dataframe.insert(2, "Variable", [row[3] for row in run_rows])
+            dataframe.insert(3, "Region", [row[4] for row in run_rows])
+            dataframe.insert(4, "Unit", [row[5] for row in run_rows])
+            dataframes.append(dataframe)
+
+        if len(dataframes) == 0:
+            return pd.DataFrame(
+                columns=["Hash", "Experiment", "Variable", "Region", "Unit"]
+            )
+        return pd.concat(dataframes, ignore_index=True)
+
+    @contextmanager
+    def _connection(self):
+        """Opens a connection which commits on success and is always closed"""
+        connection = sqlite3.connect(self.filename, timeout=60)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+def _group_by_run(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault(row[0], []).append(row)
+    return groups.items()
@@ -4,13 +4,11 @@ Plot functions. Not necessary if dashboard is used.
 
 import pandas as pd
 
-try:
-    import plotly.express as px
-except ModuleNotFoundError:
-    pass
-
 
 def visualise_ipopt_output(output_file):
+    # Plotly is optional and slow to import, so only import it when needed
+    import plotly.express as px
+
     with open(output_file, "r") as file:
         in_iterations = False
 
@@ -53,3 +51,12 @@ def visualise_ipopt_output(output_file):
     )
 
     fig.write_html(output_file.split(".")[0] + ".html", include_plotlyjs="cdn")
+
+
+def get_ipopt_iterations(output_file):
+    """Returns the number of IPOPT iterations written to the IPOPT output file"""
+    with open(output_file, "r") as file:
+        for line in file:
+            if line.startswith("Number of Iterations"):
+                return int(line.split(":")[1])
+    return None
@@ -8,6 +8,7 @@ Finally, the export functions are called here.
 """
 
 import os
+import pandas as pd
 
 from mimosa.common import (
     AbstractModel,
@@ -16,6 +17,10 @@ from mimosa.common import (
     SolverFactory,
     SolverManagerFactory,
     SolverStatus,
+    SolverResults,
+    Suffix,
+    TerminationCondition,
+    Var,
     value,
     OptSolver,
     data,
@@ -23,11 +28,25 @@ from mimosa.common import (
     utils,
     logger,
 )
-from mimosa.common.config.parseconfig import check_params
-from mimosa.export import visualise_ipopt_output, save_output
+from mimosa.common.config.parseconfig import check_params, get_nested, set_nested
+from mimosa.common.profiler import (
+    Profiler,
+    constraint_report,
+    count_expression_nodes,
+)
+from mimosa.export import (
+    visualise_ipopt_output,
+    get_ipopt_iterations,
+    save_output,
+    write_output,
+    output_dataframe,
+    ResultsStore,
+    ResultsCache,
+)
 from mimosa.abstract_model import create_abstract_model
-from mimosa.concrete_model.instantiate_params import InstantiatedModel
+from mimosa.concrete_model.instantiate_params import InstantiatedModel, get_param_value
 from mimosa.concrete_model import simulation_mode
+from mimosa.concrete_model.reduced_space import optimise_abatement
 
 
 class MIMOSA:
@@ -37,6 +56,22 @@ class MIMOSA:
 
     Args:
         params (dict): contains all Param values, and is based on `input/config.yaml`
+        cache_abstract_model (bool, optional): re-use the AbstractModel of previous MIMOSA
+            instances with the same module combination. Defaults to True.
+        initial_values (dict, optional): initial values of the variables, as returned by
+            `get_variable_values` of a previously solved model. Variables without an initial
+            value are initialised to the midpoint of their bounds. Defaults to None.
+        profile_constraints (bool, optional): records the construction time and counts the
+            number of expression nodes of each constraint when creating the instance, for
+            `constraint_report`. Defaults to False.
+        results_cache (ResultsCache or str, optional): cache (or cache folder) of solved runs.
+            If a run with the same parameters, input data and MIMOSA version is in the cache,
+            the model is only created when `concrete_model` is used: `solve` then takes the
+            solution from the cache, and `save` writes the cached output. Otherwise, `solve`
+            adds the solution to the cache. Defaults to None.
+        base_params (dict, optional): parameters previously returned by `check_params`, of
+            which `params` is a variation. Only the values that differ are parsed again,
+            see `check_params`. Defaults to None.
 
     Attributes:
         params (dict)
@@ -44,38 +79,112 @@ class MIMOSA:
         abstract_model (AbstractModel): the AbstractModel created using the chosen damage/objective modules
         data_store (DataStore): object used to access regional data from the input database
         m (ConcreteModel): concrete instance of `abstract_model`
+        results (SolverResults): results of the last call to `solve`
+        profiler (Profiler): durations of the phases of this run (config parsing, instance
+            creation, preprocessing, solving, saving). Use `profiler.durations()` for an
+            overview, or `profiler.save_trace(filename)` to save a JSON trace.
+        iterations (int or None): number of IPOPT iterations of the last call to `solve`,
+            only available if an `ipopt_output_file` was used
 
     """
 
-    def __init__(self, params: dict):
+    # Class property and not instance property: the AbstractModel only depends on the
+    # module combination, so it can be shared between all MIMOSA instances
+    abstract_models = {}
+
+    def __init__(
+        self,
+        params: dict,
+        cache_abstract_model: bool = True,
+        initial_values: dict = None,
+        profile_constraints: bool = False,
+        results_cache=None,
+        base_params: dict = None,
+    ):
+        self.profiler = Profiler()
+        self.profile_constraints = profile_constraints
+        self.expression_nodes = None
+
         # Check if input parameter dictionary is valid
-        params, parser_tree = check_params(params, True)
+        with self.profiler.phase("Config parsing"):
+            params, parser_tree = check_params(params, True, base_params=base_params)
         self.params = params
         self.param_parser_tree = parser_tree
         self.regions = params["regions"]
-
-        self.abstract_model = self.get_abstract_model()
+        self._persistent_solver = None
+        self._cache_abstract_model = cache_abstract_model
+        self._initial_values = initial_values
+        self._concrete_model = None
+
+        # Look up the run before creating the model, which is not needed for a cached run
+        self._cached_entry = None
+        if results_cache is not None and not isinstance(results_cache, ResultsCache):
+            results_cache = ResultsCache(results_cache)
+        self.results_cache = results_cache
+        if results_cache is not None:
+            with self.profiler.phase("Results cache"):
+                self._cached_entry = results_cache.get(results_cache.key(params))
+
+        if self._cached_entry is None:
+            self._create_model()
+        else:
+            self._load_cached_results(self._cached_entry)
+
+    @property
+    def concrete_model(self) -> ConcreteModel:
+        """The concrete model, created on first use if the run was taken from the results cache"""
+        if self._concrete_model is None:
+            self._create_model()
+        return self._concrete_model
+
+    @concrete_model.setter
+    def concrete_model(self, m: ConcreteModel) -> None:
+        self._concrete_model = m
+
+    def _create_model(self) -> None:
+        with self.profiler.phase("Abstract model"):
+            self.abstract_model = self.get_abstract_model(self._cache_abstract_model)
         self.concrete_model = self.create_instance()
+        if self._initial_values is not None:
+            self.set_variable_values(self._initial_values)
         self.preprocessing()
+        if self._cached_entry is not None:
+            self.set_variable_values(self._cached_entry["variable_values"])
 
-    def get_abstract_model(self) -> AbstractModel:
+    def get_abstract_model(self, use_cache: bool = True) -> AbstractModel:
         """
+        Args:
+            use_cache (bool, optional): re-use a previously built AbstractModel with the
+                same module combination. Defaults to True.
+
         Returns:
             AbstractModel: model corresponding to the damage/objective module combination
+                (and the compact formulation setting)
         """
-        damage_module = self.params["model"]["damage module"]
-        emissiontrade_module = self.params["model"]["emissiontrade module"]
-        financialtransfer_module = self.params["model"]["financialtransfer module"]
-        welfare_module = self.params["model"]["welfare module"]
-        objective_module = self.params["model"]["objective module"]
-
-        return create_abstract_model(
-            damage_module,
-            emissiontrade_module,
-            financialtransfer_module,
-            welfare_module,
-            objective_module,
+        return self.abstract_model_from_params(self.params, use_cache)
+
+    @classmethod
+    def abstract_model_from_params(
+        cls, params: dict, use_cache: bool = True
+    ) -> AbstractModel:
+        """Returns the AbstractModel of the module combination in the (parsed) `params`,
+        see `get_abstract_model`. Can be used without creating a MIMOSA object."""
+        modules = (
+            params["model"]["damage module"],
+            params["model"]["emissiontrade module"],
+            params["model"]["financialtransfer module"],
+            params["model"]["welfare module"],
+            params["model"]["objective module"],
         )
+        compact = params["model"]["compact formulation"]
+
+        if not use_cache:
+            return create_abstract_model(*modules, compact=compact)
+
+        key = modules + (compact,)
+        if key not in cls.abstract_models:
+            cls.abstract_models[key] = create_abstract_model(*modules, compact=compact)
+        return cls.abstract_models[key]
 
     @utils.timer("Concrete model creation")
     def create_instance(self) -> ConcreteModel:
@@ -90,57 +199,94 @@ class MIMOSA:
         """
 
         # Create the regional parameter store
-        self.regional_param_store = regional_params.RegionalParamStore(
-            self.params, self.param_parser_tree
-        )
+        with self.profiler.phase("Regional parameters"):
+            self.regional_param_store = regional_params.RegionalParamStore(
+                self.params, self.param_parser_tree
+            )
 
         # Create the data store
-        self.data_store = data.DataStore(self.params, self.regional_param_store)
+        with self.profiler.phase("Data store"):
+            self.data_store = data.DataStore(self.params, self.regional_param_store)
 
         # Using these help objects, create the instantiated model
-        instantiated_model = InstantiatedModel(
-            self.abstract_model, self.regional_param_store, self.data_store
-        )
-        m = instantiated_model.concrete_model
+        with self.profiler.phase("Instance data"):
+            instantiated_model = InstantiatedModel(
+                self.abstract_model,
+                self.regional_param_store,
+                self.data_store,
+                create_concrete_model=False,
+            )
+        with self.profiler.phase("Pyomo create_instance"):
+            if self.profile_constraints:
+                with self.profiler.pyomo_construction():
+                    m = instantiated_model.create_instance()
+            else:
+                m = instantiated_model.create_instance()
+        self.param_keys = instantiated_model.param_keys
+
+        if self.profile_constraints:
+            with self.profiler.phase("Count expression nodes"):
+                self.expression_nodes = count_expression_nodes(m)
+            logger.info(
+                "Slowest constraints to construct:\n{}".format(
+                    self.constraint_report(m).head(10).to_string(index=False)
+                )
+            )
 
         # When using simulation mode, add extra constraints to variables and disable other constraints
-        if (
-            self.params.get("simulation") is not None
-            and self.params["simulation"]["simulationmode"]
-        ):
-            simulation_mode.set_simulation_mode(m, self.params)
+        if self.is_simulation_mode:
+            with self.profiler.phase("Simulation mode"):
+                simulation_mode.set_simulation_mode(m, self.params)
 
         return m
 
+    @property
+    def is_simulation_mode(self) -> bool:
+        return (
+            self.params.get("simulation") is not None
+            and self.params["simulation"]["simulationmode"]
+        )
+
     def preprocessing(self) -> None:
         """
         Pyomo can apply certain pre-processing steps before sending the model
         to the solver. These include:
           - Aggregate variables that are linked by equality constraints
           - Initialise non-fixed variables to midpoint of their boundaries
+            (only variables without an initial value)
           - Fix variables that are de-facto fixed
           - Propagate variable fixing for equalities of type x = y
+          - In simulation mode with fixed variables: deactivate constraints
+            which only contain fixed variables
         """
 
-        if len(self.regions) > 1:
-            TransformationFactory("contrib.aggregate_vars").apply_to(
-                self.concrete_model
-            )
-        TransformationFactory("contrib.init_vars_midpoint").apply_to(
-            self.concrete_model
-        )
-        TransformationFactory("contrib.detect_fixed_vars").apply_to(self.concrete_model)
-        if len(self.regions) > 1:
-            TransformationFactory("contrib.propagate_fixed_vars").apply_to(
-                self.concrete_model
-            )
+        with self.profiler.phase("Preprocessing"):
+            if len(self.regions) > 1:
+                self._apply_transformation("contrib.aggregate_vars")
+            self._apply_transformation("contrib.init_vars_midpoint")
+            self._apply_transformation("contrib.detect_fixed_vars")
+            if len(self.regions) > 1:
+                self._apply_transformation("contrib.propagate_fixed_vars")
+            if (
+                self.is_simulation_mode
+                and self.params["simulation"]["fixing_method"] == "fix"
+            ):
+                # Infeasible constraints are kept, such that the solver reports them
+                self._apply_transformation(
+                    "contrib.deactivate_trivial_constraints", ignore_infeasible=True
+                )
+
+    def _apply_transformation(self, name: str, **kwargs) -> None:
+        with self.profiler.phase(name):
+            TransformationFactory(name).apply_to(self.concrete_model, **kwargs)
 
     def postprocessing(self) -> None:
         """Post-processing tasks to restore aggregate variables in pre-processing step"""
-        if len(self.regions) > 1:
-            TransformationFactory("contrib.aggregate_vars").update_variables(
-                self.concrete_model
-            )
+        with self.profiler.phase("Postprocessing"):
+            if len(self.regions) > 1:
+                TransformationFactory("contrib.aggregate_vars").update_variables(
+                    self.concrete_model
+                )
 
     @utils.timer("Model solve", True)
     def solve(
@@ -150,6 +296,11 @@ class MIMOSA:
         use_neos=False,
         neos_email=None,
         ipopt_output_file=None,
+        warm_start=False,
+        visualise_output=True,
+        solver_interface="nl",
+        symbolic_solver_labels=True,
+        results_cache=None,
     ) -> None:
         """Sends the concrete model to a solver.
 
@@ -159,32 +310,100 @@ class MIMOSA:
             use_neos (bool, optional): Uses the external NEOS server for solving. Defaults to False.
             neos_email (str or None, optional): E-mail address for NEOS server. Defaults to None.
             ipopt_output_file (str or None, optional): Filename for IPOPT intermediate output. Defaults to None.
+            warm_start (bool, optional): Starts IPOPT from the primal and dual values of the previous
+                warm-started solve of this model, and stores the dual values of this solve for the
+                next one. To warm start the first `resolve` as well, solve with `warm_start=True`.
+                Only used when solving locally, and only the primal values are used with the
+                "appsi" solver interface. Defaults to False.
+            visualise_output (bool, optional): Plots the IPOPT intermediate output, if an
+                `ipopt_output_file` is given. Defaults to True.
+            solver_interface (str, optional): How the model is passed to IPOPT when solving locally:
+                "nl" writes an NL file for the ipopt executable, "appsi" uses a persistent solver
+                which keeps the Pyomo representation of the model between solves (only changed
+                parameter values are updated, but it still writes an NL file and reads the
+                solution file), "cyipopt" calls IPOPT through cyipopt without any files.
+                Falls back to "nl" if the interface is not available. Defaults to "nl".
+            symbolic_solver_labels (bool, optional): Uses the Pyomo component names in the files
+                written for the solver. Only useful for debugging. Defaults to True.
+            results_cache (ResultsCache or str, optional): cache (or cache folder) of solved runs.
+                If this model was solved before with the same parameters, input data and
+                MIMOSA version, the solution is taken from the cache instead of solved again.
+                Successful solves are added to the cache. Defaults to the `results_cache` of
+                the MIMOSA object. To skip creating the model for a cached run as well, pass
+                the cache to the MIMOSA object instead.
 
         Raises:
             SolverException: raised if solver did not exit with status OK
         """
 
+        if self._cached_entry is not None:
+            # Already taken from the results cache
+            return
+
+        self.iterations = None
+        if results_cache is None:
+            results_cache = self.results_cache
+        if results_cache is not None:
+            if not isinstance(results_cache, ResultsCache):
+                results_cache = ResultsCache(results_cache)
+            cache_key = results_cache.key(self.params)
+            entry = results_cache.get(cache_key)
+            if entry is not None:
+                self._cached_entry = entry
+                with self.profiler.phase("Results cache"):
+                    self.set_variable_values(entry["variable_values"])
+                self._load_cached_results(entry)
+                return
+
         if use_neos:
             # Send concrete model to external solver on NEOS server
             # Requires authenticated email address
             os.environ["NEOS_EMAIL"] = neos_email
             solver_manager = SolverManagerFactory("neos")
             solver = "ipopt"  # or "conopt'
-            results = solver_manager.solve(self.concrete_model, opt=solver)
+            with self.profiler.phase("NEOS"):
+                results = solver_manager.solve(self.concrete_model, opt=solver)
         else:
             # Solve locally using ipopt
-            opt: OptSolver = SolverFactory("ipopt")
-            opt.options["halt_on_ampl_error"] = halt_on_ampl_error
-            # opt.options["max_iter"] = 5
+            opt, options, solver_interface = self._get_solver(solver_interface)
+            if solver_interface != "cyipopt":
+                # ASL option, not known to cyipopt
+                options["halt_on_ampl_error"] = halt_on_ampl_error
+            # The persistent interface doesn't pass dual values to IPOPT
+            self._set_warm_start(options, warm_start and solver_interface != "appsi")
+            # options["max_iter"] = 5
             if ipopt_output_file is not None:
-                opt.options["output_file"] = ipopt_output_file
-            results = opt.solve(
-                self.concrete_model, tee=verbose, symbolic_solver_labels=True
-            )
+                options["output_file"] = ipopt_output_file
+            if solver_interface == "cyipopt":
+                with self.profiler.phase("IPOPT"):
+                    results = opt.solve(self.concrete_model, tee=verbose)
+            elif solver_interface == "appsi":
+                with self.profiler.phase("IPOPT"):
+                    results = opt.solve(
+                        self.concrete_model,
+                        tee=verbose,
+                        symbolic_solver_labels=symbolic_solver_labels,
+                    )
+            else:
+                # Writing the NL file, running IPOPT and reading the solution are recorded
+                # as one phase. Within it, the IPOPT run itself is recorded with the solver
+                # time reported in the results.
+                with self.profiler.phase("NL solve"):
+                    results = opt.solve(
+                        self.concrete_model,
+                        tee=verbose,
+                        symbolic_solver_labels=symbolic_solver_labels,
+                    )
+                    solver_time = results.solver.time
+                    if isinstance(solver_time, (int, float)):
+                        self.profiler.add("IPOPT", solver_time)
             if ipopt_output_file is not None:
-                visualise_ipopt_output(ipopt_output_file)
+                self.iterations = get_ipopt_iterations(ipopt_output_file)
+                if visualise_output:
+                    visualise_ipopt_output(ipopt_output_file)
 
         self.postprocessing()
+        self.results = results
 
         logger.info("Status: {}".format(results.solver.status))
 
@@ -203,8 +422,302 @@ class MIMOSA:
             )
         )
 
-    def save(self, experiment=None, **kwargs):
-        save_output(self.params, self.concrete_model, experiment, **kwargs)
+        if results_cache is not None:
+            with self.profiler.phase("Results cache"):
+                results_cache.put(cache_key, self.cache_entry())
+
+    def simulate(self, tolerance: float = 1e-10) -> pd.DataFrame:
+        """Calculates all variables from the imposed relative abatement (or carbon price)
+        by evaluating the model equations forward in time in NumPy, instead of solving
+        the model with IPOPT. Only available in simulation mode, when exactly one of
+        `relative_abatement` or `carbonprice` is imposed, and for the module combinations
+        in `simulation_mode.forward.SUPPORTED_MODULES`. Inequality constraints
+        (carbon budget, inertia, etc.) are not checked.
+
+        Args:
+            tolerance (float, optional): relative tolerance of the iterations within a
+                time step. Defaults to 1e-10.
+
+        Returns:
+            pd.DataFrame: the output, as returned by `output_dataframe`
+        """
+        with self.profiler.phase("Forward simulation"):
+            simulation_mode.forward_simulation(
+                self.concrete_model, self.params, self.data_store, tolerance
+            )
+        logger.info(
+            "Final NPV: {}".format(
+                value(self.concrete_model.NPV[self.concrete_model.tf])
+            )
+        )
+        return output_dataframe(self.concrete_model)
+
+    def solve_reduced_space(
+        self,
+        tolerance: float = 1e-7,
+        constraint_tolerance: float = 1e-6,
+        max_iterations: int = 2000,
+    ) -> pd.DataFrame:
+        """Optimises the relative abatement without IPOPT: the NPV is calculated with the
+        forward simulation and its gradient with the adjoint of the simulation, and the
+        relative abatement is optimised with L-BFGS-B (see `concrete_model.reduced_space`).
+        Only available for cost-benefit runs without carbon budget, temperature target, global
+        inertia or effort sharing regime, and for the module combinations in
+        `simulation_mode.forward.SUPPORTED_MODULES`. If the solution violates the emission
+        constraints (like the global minimum emission level, which is only checked after
+        the optimisation) by more than `constraint_tolerance`, the solver status is `error`.
+
+        Args:
+            tolerance (float, optional): tolerance of L-BFGS-B on the projected gradient of
+                the scaled objective. Defaults to 1e-7.
+            constraint_tolerance (float, optional): maximum violation of the emission
+                constraints, relative to the baseline emissions of the first year.
+                Defaults to 1e-6.
+            max_iterations (int, optional): maximum number of L-BFGS-B iterations.
+                Defaults to 2000.
+
+        Returns:
+            pd.DataFrame: the output, as returned by `output_dataframe`
+        """
+        with self.profiler.phase("Reduced-space optimisation"):
+            result = optimise_abatement(
+                self.concrete_model,
+                self.params,
+                self.data_store,
+                tolerance=tolerance,
+                constraint_tolerance=constraint_tolerance,
+                max_iterations=max_iterations,
+            )
+
+        results = SolverResults()
+        if result.success:
+            results.solver.status = SolverStatus.ok
+            results.solver.termination_condition = TerminationCondition.optimal
+        elif result.max_violation > constraint_tolerance:
+            results.solver.status = SolverStatus.error
+            results.solver.termination_condition = TerminationCondition.infeasible
+        else:
+            results.solver.status = SolverStatus.warning
+            results.solver.termination_condition = TerminationCondition.maxIterations
+        self.results = results
+        self.iterations = result.iterations
+
+        logger.info(
+            "Status: {}, {} iterations".format(results.solver.status, result.iterations)
+        )
+        logger.info(
+            "Final NPV: {}".format(
+                value(self.concrete_model.NPV[self.concrete_model.tf])
+            )
+        )
+        return output_dataframe(self.concrete_model)
+
+    def cache_entry(self) -> dict:
+        """Returns the solution, output and solver status, as stored in a `ResultsCache`"""
+        if self._concrete_model is None:
+            return self._cached_entry
+        return {
+            "variable_values": self.get_variable_values(),
+            "output": output_dataframe(self.concrete_model),
+            "status": str(self.results.solver.status),
+            "termination_condition": str(self.results.solver.termination_condition),
+            "iterations": self.iterations,
+        }
+
+    def _load_cached_results(self, entry: dict) -> None:
+        results = SolverResults()
+        results.solver.status = SolverStatus(entry["status"])
+        results.solver.termination_condition = TerminationCondition(
+            entry["termination_condition"]
+        )
+        self.results = results
+        self.iterations = entry["iterations"]
+        logger.info(
+            "Status: {} (taken from results cache)".format(results.solver.status)
+        )
+
+    def resolve(self, updates: dict, **kwargs) -> None:
+        """Changes parameter values of the concrete model in place and solves it again,
+        warm-started from the previous solution. This avoids re-creating the model
+        for parameter sweeps.
+
+        Only parameters which are mutable in the model can be changed this way
+        (PRTP, elasmu, inequality aversion, TCRE, carbon budget, temperature target
+        and damage scale factor). Other changes (modules, regions, time, switching
+        a constraint on or off, etc.) require a new MIMOSA object.
+
+        Args:
+            updates (dict): nested dictionary with the same structure as `params`,
+                for example `{"economics": {"PRTP": 0.02}}`
+            **kwargs: passed on to `MIMOSA.solve`. `warm_start` defaults to True here.
+
+        Raises:
+            ValueError: raised if a parameter cannot be changed in place
+        """
+        m = self.concrete_model
+
+        # First check all updates, such that the model is not partially changed
+        parsed_updates = []
+        for keys, new_value in _nested_items(updates):
+            try:
+                parser = get_nested(self.param_parser_tree, keys)
+            except KeyError as exc:
+                raise ValueError(f"Unknown parameter {keys}") from exc
+            new_value = parser.parse(new_value)
+            old_value = get_nested(self.params, keys)
+
+            names = [
+                name
+                for name, param_keys in self.param_keys.items()
+                if param_keys == keys
+            ]
+            if len(names) == 0 or not all(getattr(m, name).mutable for name in names):
+                raise ValueError(
+                    f"Parameter {keys} cannot be changed in place, create a new MIMOSA object instead"
+                )
+            if isinstance(new_value, bool) or isinstance(old_value, bool):
+                # Switching a parameter from or to False changes the model structure
+                raise ValueError(
+                    f"Parameter {keys} cannot be changed in place from {old_value} to {new_value}, "
+                    "create a new MIMOSA object instead"
+                )
+            parsed_updates.append((keys, new_value, names))
+
+        with self.profiler.phase("Update parameters"):
+            for keys, new_value, names in parsed_updates:
+                set_nested(self.params, keys, new_value)
+                for name in names:
+                    getattr(m, name).set_value(
+                        get_param_value(self.params, self.param_parser_tree, keys)
+                    )
+        # The model no longer corresponds to the cached run
+        self._cached_entry = None
+
+        warm_start = kwargs.pop("warm_start", True)
+        self.solve(warm_start=warm_start, **kwargs)
+
+    def constraint_report(self, m=None, by: str = "constraint") -> pd.DataFrame:
+        """Ranks the constraints by the time needed to construct them in `create_instance`,
+        and reports their number of expression nodes. Only available if the model was
+        created with `profile_constraints=True`.
+
+        Args:
+            m (ConcreteModel, optional): Defaults to the concrete model.
+            by (str, optional): "constraint" for one row per constraint, "module" for one row
+                per component module (emissions, sealevelrise, etc.). Defaults to "constraint".
+        """
+        if not self.profile_constraints:
+            raise ValueError(
+                "The constraint report requires MIMOSA(params, profile_constraints=True)"
+            )
+        if m is None:
+            m = self.concrete_model
+        return constraint_report(self.profiler, m, self.expression_nodes, by)
+
+    def get_variable_values(self) -> dict:
+        """Returns the values of all variables, as a dictionary of
+        variable name -> {index: value}. Can be used as `initial_values` of a new MIMOSA object.
+        """
+        if self._concrete_model is None:
+            return self._cached_entry["variable_values"]
+        return {
+            var.name: var.extract_values()
+            for var in self.concrete_model.component_objects(Var)
+            if not var.name.startswith("_")
+        }
+
+    def set_variable_values(self, values: dict) -> None:
+        """Sets the values of the non-fixed variables. Variables or indices that do not
+        exist in this model are ignored.
+
+        Args:
+            values (dict): variable name -> {index: value}, as returned by `get_variable_values`
+        """
+        m = self.concrete_model
+        for name, var_values in values.items():
+            var = m.component(name)
+            if var is None or var.ctype is not Var:
+                continue
+            for index, var_value in var_values.items():
+                if var_value is None or index not in var or var[index].fixed:
+                    continue
+                var[index].set_value(var_value, skip_validation=True)
+
+    def save(self, experiment=None, **kwargs) -> str:
+        with self.profiler.phase("Save output"):
+            if self._concrete_model is None:
+                return write_output(
+                    self.params, self._cached_entry["output"], experiment, **kwargs
+                )
+            return save_output(self.params, self.concrete_model, experiment, **kwargs)
+
+    def save_to_store(self, store, experiment=None) -> str:
+        """Adds the output to a results store (a `ResultsStore` or the filename of one)
+        instead of saving separate files. Returns the hash which identifies this run."""
+        if not isinstance(store, ResultsStore):
+            store = ResultsStore(store)
+        with self.profiler.phase("Save output"):
+            if self._concrete_model is None:
+                return store.add(self.params, self._cached_entry["output"], experiment)
+            return store.add_model(self.params, self.concrete_model, experiment)
+
+    def _get_solver(self, solver_interface: str):
+        """Returns the IPOPT solver object for `solver_interface`, its options dictionary
+        and the interface that is actually used. The persistent solver is re-used for
+        all solves of this model.
+        """
+        if solver_interface not in ["nl", "appsi", "cyipopt"]:
+            raise ValueError(f"Unknown solver interface `{solver_interface}`")
+
+        if solver_interface == "appsi":
+            if self._persistent_solver is None:
+                opt = SolverFactory("appsi_ipopt")
+                if opt.available(exception_flag=False):
+                    self._persistent_solver = opt
+            if self._persistent_solver is not None:
+                # Start from empty options, as the same solver object is re-used
+                self._persistent_solver.options = {}
+                return self._persistent_solver, self._persistent_solver.options, "appsi"
+
+        if solver_interface == "cyipopt":
+            opt = SolverFactory("cyipopt")
+            if opt.available(exception_flag=False):
+                return opt, opt.config.options, "cyipopt"
+
+        if solver_interface != "nl":
+            logger.warning(
+                f"Solver interface `{solver_interface}` is not available, using NL file interface"
+            )
+        opt: OptSolver = SolverFactory("ipopt")
+        return opt, opt.options, "nl"
+
+    def _set_warm_start(self, options: dict, warm_start: bool) -> None:
+        """If `warm_start` is True, declares the suffixes to exchange dual values with IPOPT
+        and, if a previous solution is available, sets the IPOPT warm start options.
+        Without warm start, the model is left unchanged.
+        """
+        m = self.concrete_model
+
+        if not warm_start:
+            return
+
+        if not hasattr(m, "ipopt_zL_out"):
+            m.ipopt_zL_out = Suffix(direction=Suffix.IMPORT)
+            m.ipopt_zU_out = Suffix(direction=Suffix.IMPORT)
+            m.ipopt_zL_in = Suffix(direction=Suffix.EXPORT)
+            m.ipopt_zU_in = Suffix(direction=Suffix.EXPORT)
+            m.dual = Suffix(direction=Suffix.IMPORT_EXPORT)
+
+        if len(m.ipopt_zL_out) == 0:
+            # Nothing to warm start from (yet): the dual values of this solve are stored
+            return
+
+        m.ipopt_zL_in.update(m.ipopt_zL_out)
+        m.ipopt_zU_in.update(m.ipopt_zU_out)
+        options["warm_start_init_point"] = "yes"
+        options["warm_start_bound_push"] = 1e-9
+        options["warm_start_mult_bound_push"] = 1e-9
+        options["mu_init"] = 1e-6
 
 
 ###########################
@@ -216,3 +729,13 @@ class MIMOSA:
 
 class SolverException(Exception):
     """Raised when Pyomo solver does not exit with status OK"""
+
+
+def _nested_items(dictionary, curr_keys=()):
+    """Yields (list of keys, value) for each leaf of a nested dictionary"""
+    for key, node in dictionary.items():
+        keys = list(curr_keys) + [key]
+        if isinstance(node, dict):
+            yield from _nested_items(node, keys)
+        else:
+            yield keys, node
@@ -1,43 +1,75 @@
+"""
+Social cost of carbon (SCC)
+
+Calculates the damages of an emission path without solving the model: cumulative emissions,
+temperature, sea level rise and the (COACCH) damages are calculated with NumPy arrays of shape
+(..., years) or (..., years, regions). The leading batch dimensions (pulse years, parameter
+draws, ...) are broadcast against each other, such that the SCC of many samples is calculated
+in one call:
+
+    scc = SCC(params)
+    scc.scc([2030, 2050])  # SCC of a pulse in 2030 and in 2050
+    scc.scc(2030, TCRE=scc.data.TCRE * draws)  # SCC distribution, shape (number of draws, 1)
+"""
+
+from types import SimpleNamespace
+
 import numpy as np
 import pandas as pd
-from collections import namedtuple
 
 from mimosa.common import regional_params, data
+from mimosa.common.config.parseconfig import check_params
 from mimosa.concrete_model.instantiate_params import InstantiatedModel
 from mimosa.concrete_model.simulation_mode.set_constraints import _get_interp_data
+from mimosa.concrete_model.simulation_mode.forward import model_values
 from mimosa.components import sealevelrise
-from mimosa.components.damages.coacch import damage_fct
+from mimosa.components.damages import coacch
+from mimosa.mimosa import MIMOSA
 
 
 class SCC:
-    # pylint: disable=no-member
-    def __init__(self, params: dict):
-        self.params = params
-        self.regions = params["regions"]
+    """Damages and social cost of carbon of an emission path: the baseline emissions, or the
+    regional emissions given in `params["simulation"]["constraint_variables"]`.
 
-        # Create the regional parameter store
-        self.regional_param_store = regional_params.RegionalParamStore(self.params)
+    Args:
+        params (dict): the parameters. Only the COACCH damage module is supported.
 
-        # Create the data store
-        self.data_store = data.DataStore(self.params, self.regional_param_store)
+    Attributes:
+        years (np.ndarray): the years of the model
+        regions (list): the regions
+        data (SimpleNamespace): parameter values and data of the model, see `model_values`
+        regional_emissions (np.ndarray): the emission path, shape (years, regions)
+        gdp (np.ndarray): the baseline GDP, shape (years, regions)
+        output (dict): the damages of the emission path as DataFrames (regions x years)
+            or Series (years), see `calculate_damages`
+    """
 
-        self.data_functions = DataFunctions()
+    def __init__(self, params: dict):
+        params, parser_tree = check_params(params, True)
+        self.params = params
+        if params["model"]["damage module"] != "COACCH":
+            raise NotImplementedError(
+                "The SCC is only implemented for the COACCH damage module"
+            )
 
-        instantiated_model = InstantiatedModel(
-            self.data_functions,
-            self.regional_param_store,
-            self.data_store,
-            False,
-        )
+        # Create the regional parameter store and the data store
+        regional_param_store = regional_params.RegionalParamStore(params, parser_tree)
+        data_store = data.DataStore(params, regional_param_store)
 
-        # From the instantiated model, only the parameter data ("instance_data")
-        # is used. Note that we use the default namespace parameters, "None"
-        instance_data = instantiated_model.instance_data[None]
-        self.data = dict_to_object(instance_data)
+        # From the instantiated model, only the parameter values and data are used.
+        # The AbstractModel is shared with the MIMOSA objects of the same module combination.
+        abstract_model = MIMOSA.abstract_model_from_params(params)
+        m = InstantiatedModel(
+            abstract_model, regional_param_store, data_store
+        ).concrete_model
+        self.data = model_values(m, data_store)
 
         self.regions = self.data.regions
-        self.years_i = list(self.data.t)
-        self.years = [self.data_functions.year(i) for i in self.years_i]
+        self.years = self.data.years
+        self.gdp = self.data.GDP
+        self.damage_groups = {
+            is_slr: coacch.damage_groups(self.data, is_slr) for is_slr in [False, True]
+        }
 
         self.check_regional_emissions_input()
 
@@ -45,112 +77,186 @@ class SCC:
 
     def check_regional_emissions_input(self):
         # Check if regional_emissions is given in params["simulation"]["constraint_variables"],
-        # then use baseline regional emissions
-        try:
-            filepath_or_data = self.params["simulation"]["constraint_variables"][
-                "regional_emissions"
-            ]
-            self.override_regional_emissions = True
-            data_cache = {}
-            interp_data = _get_interp_data(
-                filepath_or_data, data_cache, "regional_emissions"
+        # otherwise use baseline regional emissions
+        filepath_or_data = self.params["simulation"]["constraint_variables"].get(
+            "regional_emissions"
+        )
+        self.override_regional_emissions = filepath_or_data is not None
+        if self.override_regional_emissions:
+            interp_data = _get_interp_data(filepath_or_data, {}, "regional_emissions")
+            self.regional_emissions = np.column_stack(
+                [interp_data.get(r, self.years) for r in self.regions]
             )
-            self.new_regional_emissions = pd.DataFrame(
-                {r: interp_data.get(r, self.years) for r in self.regions},
-                index=self.years,
-            ).T
-        except KeyError:
-            self.override_regional_emissions = False
+        else:
+            self.regional_emissions = self.data.baseline_emissions
 
     def calculate_damages(self):
-        out = {}
+        """Calculates the damages of the emission path and stores them in `output`"""
+        out = self.damages()
 
-        years = self.years
-        regions = self.regions
+        regional = lambda values: pd.DataFrame(
+            values.T, index=self.regions, columns=self.years
+        )
+        self.output = {
+            "regional_emissions": regional(self.regional_emissions),
+            "gdp": regional(self.gdp),
+            "global_emissions": pd.Series(out["global_emissions"], index=self.years),
+            "temperature": pd.Series(out["temperature"], index=self.years),
+            "total_SLR": pd.Series(out["total_SLR"], index=self.years),
+            "damages_temperature": regional(out["damages_temperature"]),
+            "damages_slr": regional(out["damages_slr"]),
+            "damages_total": regional(out["damages_total"]),
+            "damages_absolute": regional(out["damages_absolute"]),
+        }
 
-        # 1. Calculate regional emissions and GDP
-        if self.override_regional_emissions:
-            out["regional_emissions"] = self.new_regional_emissions
+    def damages(
+        self,
+        regional_emissions=None,
+        cumulative_pulse=0.0,
+        TCRE=None,
+        T0=None,
+        damage_scale_factor=None,
+    ) -> dict:
+        """Calculates the damages of an emission path. The leading (batch) dimensions of
+        all arguments are broadcast against each other.
 
-        else:
-            out["regional_emissions"] = pd.DataFrame(
-                {r: self.data_functions.baseline_emissions(years, r) for r in regions},
-                index=years,
-            ).T
-
-        out["gdp"] = pd.DataFrame(
-            {r: self.data_functions.GDP(years, r) for r in regions},
-            index=years,
-        ).T
-
-        # 2. Calculate global emissions (sum of regional emissions) and cumulative emissions
-        out["global_emissions"] = out["regional_emissions"].sum()
-        cumulative_emissions = pd.Series(
-            {
-                year: np.trapz(
-                    out["global_emissions"][:year],
-                    x=out["global_emissions"][:year].index,
-                )
-                for year in out["global_emissions"].index
-            }
+        Args:
+            regional_emissions (np.ndarray, optional): shape (..., years, regions).
+                Defaults to `regional_emissions`.
+            cumulative_pulse (np.ndarray, optional): extra cumulative emissions,
+                shape (..., years). Defaults to 0.
+            TCRE (float or np.ndarray, optional): shape (...). Defaults to the parameter value.
+            T0 (float or np.ndarray, optional): shape (...). Defaults to the parameter value.
+            damage_scale_factor (float or np.ndarray, optional): shape (...).
+                Defaults to the parameter value.
+
+        Returns:
+            dict: "global_emissions", "cumulative_emissions", "temperature" and "total_SLR"
+                of shape (..., years), and "damages_temperature", "damages_slr",
+                "damages_total" (fraction of GDP) and "damages_absolute" of shape
+                (..., years, regions)
+        """
+        v = self.data
+        if regional_emissions is None:
+            regional_emissions = self.regional_emissions
+        TCRE = np.asarray(v.TCRE if TCRE is None else TCRE, dtype=float)
+        T0 = np.asarray(v.T0 if T0 is None else T0, dtype=float)
+        scale_factor = np.asarray(
+            (
+                v.damage_scale_factor
+                if damage_scale_factor is None
+                else damage_scale_factor
+            ),
+            dtype=float,
+        )[..., None, None]
+
+        # 1. Global and cumulative emissions, temperature and sea level rise
+        global_emissions = regional_emissions.sum(axis=-1)
+        cumulative_emissions = (
+            cumulative_trapezoid(global_emissions, self.years) + cumulative_pulse
         )
+        temperature = T0[..., None] + TCRE[..., None] * cumulative_emissions
+        total_slr = self.total_slr(temperature, T0)
+
+        # 2. Regional damages
+        damages_temperature = scale_factor * self._regional_damages(
+            temperature - 0.6, T0[..., None] - 0.6, is_slr=False
+        )
+        damages_slr = scale_factor * self._regional_damages(
+            total_slr, total_slr[..., :1], is_slr=True
+        )
+        damages_total = damages_temperature + damages_slr
+
+        return {
+            "global_emissions": global_emissions,
+            "cumulative_emissions": cumulative_emissions,
+            "temperature": temperature,
+            "total_SLR": total_slr,
+            "damages_temperature": damages_temperature,
+            "damages_slr": damages_slr,
+            "damages_total": damages_total,
+            "damages_absolute": damages_total * self.gdp,
+        }
+
+    def total_slr(self, temperature, T0=None) -> np.ndarray:
+        """Total sea level rise for temperature paths of shape (..., years). The recursion
+        runs over the years, for all paths at once."""
+        v = self.data
+        if T0 is not None:
+            # The initial thermal expansion depends on the initial temperature
+            v = SimpleNamespace(**{**vars(v), "T0": T0})
+
+        slr_thermal = sealevelrise.slr_thermal_expansion_init(v)
+        slr_cumgsic = sealevelrise.SLR_GSIC_INIT
+        slr_cumgis = sealevelrise.SLR_GIS_INIT
+        total_slr = np.empty(
+            np.broadcast_shapes(temperature.shape, np.shape(T0) + (1,))
+        )
+        total_slr[..., 0] = slr_thermal + slr_cumgsic + slr_cumgis
+        for t in range(1, len(self.years)):
+            prev_temp = temperature[..., t - 1]
+            slr_thermal = sealevelrise.slr_thermal_expansion(slr_thermal, prev_temp, v)
+            slr_cumgsic = sealevelrise.slr_gsic(slr_cumgsic, prev_temp, v)
+            slr_cumgis = sealevelrise.slr_gis(slr_cumgis, prev_temp, v)
+            total_slr[..., t] = slr_thermal + slr_cumgsic + slr_cumgis
+        return total_slr
+
+    def _regional_damages(self, x, x0, is_slr):
+        """COACCH damages for `x` of shape (..., years), returns shape (..., years, regions)"""
+        shape = np.broadcast_shapes(np.shape(x), np.shape(x0)) + (len(self.regions),)
+        damages = np.empty(shape)
+        for regions, group in self.damage_groups[is_slr]:
+            damages[..., regions] = coacch.damage_fct(
+                x[..., None], x0[..., None], group, 0, is_slr
+            )
+        return damages
+
+    def scc(self, pulse_years, pulse_size=1.0, discount_rate=None, **parameters):
+        """Social cost of carbon: the discounted global damages caused by an extra emission
+        of `pulse_size` in the pulse year, per unit of emissions.
+
+        Args:
+            pulse_years (float or array-like): the year(s) of the emission pulse
+            pulse_size (float, optional): size of the pulse, in the emissions unit. Defaults to 1.
+            discount_rate (float or np.ndarray, optional): constant yearly discount rate,
+                shape (...). Defaults to the PRTP.
+            **parameters: values of TCRE, T0 and/or damage_scale_factor, shape (...),
+                in the units of the model (like `data.TCRE`), see `damages`
+
+        Returns:
+            np.ndarray: the SCC, shape (..., pulse years), in the unit of the carbon price
+                (currency unit per emissions unit)
+        """
+        v = self.data
+        pulse_years = np.atleast_1d(np.asarray(pulse_years, dtype=float))
+
+        # Add a dimension for the pulse years to the batch dimensions of the parameters
+        parameters = {
+            name: np.asarray(values, dtype=float)[..., None]
+            for name, values in parameters.items()
+        }
+        if discount_rate is None:
+            discount_rate = v.PRTP
+        discount_rate = np.asarray(discount_rate, dtype=float)[..., None, None]
+
+        after_pulse = self.years >= pulse_years[:, None]
+        reference = self.damages(**parameters)
+        with_pulse = self.damages(
+            cumulative_pulse=pulse_size * after_pulse, **parameters
+        )
+        extra_damages = (
+            with_pulse["damages_absolute"] - reference["damages_absolute"]
+        ).sum(axis=-1)
+
+        # Discounted to the pulse year, summed like the NPV in the objective
+        discount = np.exp(-discount_rate * (self.years - pulse_years[:, None]))
+        return (v.dt * discount * extra_damages * after_pulse).sum(axis=-1) / pulse_size
+
 
-        # 3. From this, calculate temperature increase
-        T0 = self.data.T0
-        TCRE = self.data.TCRE
-        out["temperature"] = T0 + TCRE * cumulative_emissions
-
-        # 4. And calculate SLR
-        total_slr = pd.Series()
-        for t in self.years_i:
-            if t == 0:
-                slr_thermal = sealevelrise.slr_thermal_expansion_init(self.data)
-                slr_cumgsic = 0.015
-                slr_cumgis = 0.006
-            else:
-                prev_temp = out["temperature"][years[t - 1]]
-                slr_thermal = sealevelrise.slr_thermal_expansion(
-                    slr_thermal, prev_temp, self.data
-                )
-                slr_cumgsic = sealevelrise.slr_gsic(slr_cumgsic, prev_temp, self.data)
-                slr_cumgis = sealevelrise.slr_gis(slr_cumgis, prev_temp, self.data)
-            total_slr[years[t]] = slr_thermal + slr_cumgsic + slr_cumgis
-
-        # 5. Calculate regional damages
-        out["damages_temperature"] = pd.DataFrame(
-            {
-                r: self.data.damage_scale_factor
-                * damage_fct(
-                    out["temperature"] - 0.6,
-                    out["temperature"].iloc[0] - 0.6,
-                    self.data,
-                    r,
-                    False,
-                )
-                for r in regions
-            }
-        ).T
-
-        out["damages_slr"] = pd.DataFrame(
-            {
-                r: self.data.damage_scale_factor
-                * damage_fct(total_slr, total_slr.iloc[0], self.data, r, True)
-                for r in regions
-            }
-        ).T
-
-        out["damages_total"] = out["damages_temperature"] + out["damages_slr"]
-        out["damages_absolute"] = out["damages_total"] * out["gdp"]
-
-        self.output = out
-
-
-class DataFunctions:
-    pass
-
-
-def dict_to_object(data_dict: dict, name="object"):
-    obj = namedtuple(name, data_dict.keys())(
-        *[v[None] if list(v.keys()) == [None] else v for v in data_dict.values()]
-    )
-    return obj
+def cumulative_trapezoid(values, years) -> np.ndarray:
+    """Integral of `values` (shape (..., years)) from the first year to every year,
+    using the trapezoidal rule"""
+    increments = np.diff(years) * (values[..., 1:] + values[..., :-1]) / 2
+    cumulative = np.zeros(values.shape)
+    cumulative[..., 1:] = np.cumsum(increments, axis=-1)
+    return cumulative
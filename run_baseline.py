@@ -9,6 +9,7 @@ for ignore_damages in [False, True]:
 
     if not ignore_damages:
         params["simulation"]["simulationmode"] = True
+        params["simulation"]["fixing_method"] = "fix"
         params["simulation"]["constraint_variables"] = {
             "relative_abatement": {
                 year: {region: 0.0 for region in params["regions"]}